@@ -0,0 +1,130 @@
+# bench_ai_paths.py - AI call paths of UnifiedChatbot measured against the local mock server
+#
+# Usage: python benchmarks/bench_ai_paths.py [--requests 200] [--concurrency 16]
+#        [--latency lognormal:0.05,0.5] [--token-interval 0.002] [--seed 1]
+# Needs no network or API key: every scenario runs against mock_openai_server on 127.0.0.1.
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chatbot import UnifiedChatbot
+from llm_backend import BackendRouter, HTTPBackend, StubBackend
+from mock_openai_server import LatencyModel, MockOpenAIServer
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from single_flight import SingleFlight
+
+def make_chatbot(backend, cache=False, coalesce=False, limiter=None):
+    """Chatbot on the given backend with only the requested features switched on"""
+    return UnifiedChatbot(ai_enabled=True, backend=backend,
+                          response_cache=ResponseCache(max_entries=10000) if cache else None,
+                          use_cache=cache, single_flight=SingleFlight() if coalesce else None,
+                          coalesce=coalesce, rate_limiter=limiter, rate_limit=limiter is not None)
+
+def prompt(index):
+    return [{"role": "system", "content": "You are a supportive journaling companion."},
+            {"role": "user", "content": f"Today I thought about thing number {index}."}]
+
+def run(bot, prompts, concurrency):
+    """Send prompts from a thread pool; returns (latencies of successes, failures, seconds)"""
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def call(messages):
+        started = time.perf_counter()
+        try:
+            bot._create_completion(messages, max_tokens=60, call_type='chat')
+        except Exception as e:
+            with lock:
+                failures.append(type(e).__name__)
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, prompts))
+    return latencies, failures, time.perf_counter() - started
+
+def report(label, latencies, failures, seconds, server):
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    total = len(latencies) + len(failures)
+    stats = server.stats()
+    print(f"{label:<34} {total / seconds:8.1f} req/s  p50 {quantiles[49] * 1000:7.1f} ms  "
+          f"p95 {quantiles[94] * 1000:7.1f} ms  failed {len(failures):4d}/{total:<4d}  "
+          f"upstream {stats['requests']:4d} (429s {stats['rate_limited']}, 500s {stats['errors']})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AI paths against the mock server")
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent callers')
+    parser.add_argument('--latency', default='lognormal:0.05,0.5',
+                        help='Mock time to first token, e.g. fixed:0.05')
+    parser.add_argument('--token-interval', type=float, default=0.002)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    latency = LatencyModel.parse(args.latency)
+    distinct = [prompt(i) for i in range(args.requests)]
+    repeated = [prompt(i % 10) for i in range(args.requests)]
+
+    def server(**overrides):
+        settings = dict(latency=latency, token_interval=args.token_interval, seed=args.seed)
+        settings.update(overrides)
+        return MockOpenAIServer(**settings)
+
+    print(f"{args.requests} requests per scenario, {args.concurrency} concurrent callers, "
+          f"mock latency {latency!r}\n")
+
+    # Baseline, then the response cache and request coalescing on a prompt mix with repeats
+    with server() as mock:
+        report("distinct prompts", *run(make_chatbot(HTTPBackend(mock.base_url)),
+                                        distinct, args.concurrency), mock)
+    for label, options in (("repeated prompts, no cache", {}),
+                           ("repeated prompts, coalescing", {'coalesce': True}),
+                           ("repeated prompts, cache+coalescing", {'cache': True, 'coalesce': True})):
+        with server() as mock:
+            bot = make_chatbot(HTTPBackend(mock.base_url), **options)
+            report(label, *run(bot, repeated, args.concurrency), mock)
+
+    # Provider concurrency limit: 429s without admission control, queueing with it
+    cap = max(1, args.concurrency // 4)
+    for label, limiter in ((f"provider cap {cap}, no limiter", None),
+                           (f"provider cap {cap}, in-flight limit {cap}",
+                            RateLimiter(max_in_flight=cap, timeout=30))):
+        with server(max_concurrent=cap) as mock:
+            bot = make_chatbot(HTTPBackend(mock.base_url), limiter=limiter)
+            report(label, *run(bot, distinct, args.concurrency), mock)
+
+    # Flaky provider: 5% 429s and 5% 500s, alone and with failover to the local stub
+    for label, routed in (("flaky provider", False), ("flaky provider, stub failover", True)):
+        with server(error_rate=0.05, rate_limit_rate=0.05) as mock:
+            backend = HTTPBackend(mock.base_url)
+            if routed:
+                backend = BackendRouter([backend, StubBackend()], max_error_rate=0.5)
+            report(label, *run(make_chatbot(backend), distinct, args.concurrency), mock)
+
+    # Streaming: time to first token versus the full reply
+    with server() as mock:
+        backend = HTTPBackend(mock.base_url)
+        first, full = [], []
+        for messages in distinct[:min(50, args.requests)]:
+            started = time.perf_counter()
+            for index, _ in enumerate(backend.stream(messages, call_type='chat', max_tokens=60)):
+                if index == 0:
+                    first.append(time.perf_counter() - started)
+            full.append(time.perf_counter() - started)
+        print(f"\nstreaming: first token p50 {statistics.median(first) * 1000:.1f} ms, "
+              f"full reply p50 {statistics.median(full) * 1000:.1f} ms")
+
+    print("\nNote: circuit breaking and request hedging are not implemented in this tree, "
+          "so they have no scenario yet.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# bench_categorize.py - Compiled message classifier vs. the original keyword scans
+#
+# Usage: python benchmarks/bench_categorize.py [--messages 100000]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chatbot import UnifiedChatbot
+
+SAMPLE_MESSAGES = [
+    "Hi there!",
+    "I'm feeling a bit anxious today",
+    "I wrote in my journal about my day",
+    "I need some support with something",
+    "I realized something important about myself",
+    "This week was long and I went to the park with my sister",
+    "What do you think I should do about work tomorrow?",
+    "Nothing much happened, just cooking dinner and watching a movie",
+]
+
+# No keyword at all, so the legacy classifier has to run every substring scan
+UNMATCHED_MESSAGES = [
+    "Went to the park today",
+    "Cooked pasta for dinner",
+    "Work was busy and the bus was late",
+    "Called my mom after work",
+]
+
+def legacy_categorize(message: str) -> str:
+    """The substring-based classifier this replaced, kept for comparison"""
+    message = message.lower()
+    if any(greet in message for greet in ['hi', 'hello', 'hey', 'greetings']):
+        return 'greeting'
+    feeling_words = ['feel', 'feeling', 'emotion', 'mood', 'sad', 'happy', 'angry',
+                     'anxious', 'stressed', 'overwhelmed', 'excited', 'nervous']
+    if any(word in message for word in feeling_words):
+        return 'feeling'
+    if any(word in message for word in ['journal', 'entry', 'entries', 'wrote', 'writ', 'reflect']):
+        return 'journal'
+    if any(word in message for word in ['help', 'support', 'need', 'struggle', 'hard', 'difficult', 'tough']):
+        return 'support'
+    if any(word in message for word in ['think', 'thought', 'realize', 'understand', 'learn', 'know']):
+        return 'reflection'
+    return 'general'
+
+def timed(label, fn, messages):
+    started = time.perf_counter()
+    results = fn(messages)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>28}: {elapsed * 1000:8.1f} ms  ({len(messages) / elapsed:12,.0f} msg/s, "
+          f"{elapsed / len(messages) * 1e6:5.2f} µs/msg)")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark message categorization")
+    parser.add_argument('--messages', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = [rng.choice(SAMPLE_MESSAGES) for _ in range(args.messages)]
+    bot = UnifiedChatbot(ai_enabled=False)
+
+    print("Mixed messages (legacy often exits early on a false 'hi' match):")
+    legacy = timed("legacy substring scans", lambda ms: [legacy_categorize(m) for m in ms], messages)
+    compiled = timed("compiled _categorize_message", lambda ms: [bot._categorize_message(m) for m in ms], messages)
+    timed("categorize_many", bot.categorize_many, messages)
+
+    unmatched = [rng.choice(UNMATCHED_MESSAGES) for _ in range(args.messages)]
+    print("\nMessages with no keyword (full scan for legacy):")
+    timed("legacy substring scans", lambda ms: [legacy_categorize(m) for m in ms], unmatched)
+    timed("categorize_many", bot.categorize_many, unmatched)
+
+    changed = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    print(f"\nLabels that differ from the legacy classifier: {changed:,} of {len(messages):,}")
+    for message in SAMPLE_MESSAGES:
+        old, new = legacy_categorize(message), bot._categorize_message(message)
+        if old != new:
+            print(f"  {message!r}: {old} -> {new}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# bench_chat_analytics.py - Throughput of vectorized chat analytics on a synthetic corpus
+#
+# Usage: python benchmarks/bench_chat_analytics.py [--lines 1000000] [--compare 100000]
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chat_analytics import ChatAnalytics, extract_chat_lines, ENTRY_SEPARATOR
+from chatbot import UnifiedChatbot
+
+WORDS = ("today work family walk dinner tired long week school friend music park "
+         "sleep morning call bus class game call mom dad sister brother").split()
+KEYWORDS = ("hi hello feel feeling sad happy anxious stressed journal wrote writing "
+            "help need hard tough think thought know learned").split()
+
+def synthetic_journal(lines: int, lines_per_session: int = 10, seed: int = 7) -> str:
+    """Build journal text with chat conversation entries totalling `lines` user lines"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2025, 1, 1, 9, 0)
+    parts = []
+    for session in range(0, lines, lines_per_session):
+        date = start + datetime.timedelta(hours=7 * (session // lines_per_session))
+        parts.append(f"\n{ENTRY_SEPARATOR}\nEntry Type: Chat Conversation\n"
+                     f"Date: {date.strftime('%m/%d/%Y %I:%M %p')}\n{ENTRY_SEPARATOR}\n")
+        for _ in range(min(lines_per_session, lines - session)):
+            words = rng.choices(WORDS, k=rng.randint(3, 12))
+            if rng.random() < 0.6:
+                words.insert(rng.randrange(len(words)), rng.choice(KEYWORDS))
+            parts.append(f"You: {' '.join(words)}\nCompanion: I hear you.\n")
+        parts.append(f"{ENTRY_SEPARATOR}\n")
+    return ''.join(parts)
+
+def timed(label, fn, count):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:>32}: {elapsed:7.2f} s  ({count / elapsed:12,.0f} lines/s)")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized chat analytics")
+    parser.add_argument('--lines', type=int, default=1_000_000)
+    parser.add_argument('--compare', type=int, default=100_000,
+                        help='Lines to run through the per-line Python categorizer for comparison')
+    args = parser.parse_args()
+
+    text = synthetic_journal(args.lines)
+    analytics = ChatAnalytics()
+
+    corpus = timed("extract_chat_lines", lambda: extract_chat_lines({'bench': text}), args.lines)
+    matrix = timed("term_matrix", lambda: analytics.term_matrix(corpus.lines), args.lines)
+    timed("categorize (vectorized)", lambda: analytics.categorize(matrix), args.lines)
+    result = timed("analyze (end to end)", lambda: analytics.analyze(corpus), args.lines)
+
+    subset = corpus.lines[:args.compare]
+    bot = UnifiedChatbot(ai_enabled=False)
+    timed("_categorize_message per line", lambda: [bot._categorize_message(l) for l in subset], len(subset))
+
+    print(f"\nTerm matrix: {matrix.shape[0]:,} x {matrix.shape[1]} ({matrix.nbytes / 1e6:.0f} MB)")
+    print(f"Sessions: {corpus.session_count:,}   Days: {len(result['trend']['days']):,}")
+    total = result['distribution'].sum()
+    for category, count in zip(result['categories'], result['distribution']):
+        print(f"  {category:>10}: {count:10,}  ({count / total:6.1%})")
+
+if __name__ == "__main__":
+    main()
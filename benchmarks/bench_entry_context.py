@@ -0,0 +1,74 @@
+# bench_entry_context.py - Recap prompt context: ranked token budget vs. first five entries
+#
+# Usage: python benchmarks/bench_entry_context.py [--entries 60] [--runs 200]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from entry_context import EntryContextBuilder, estimate_tokens
+
+QUESTIONS = ["Positive moment", "Challenge handled", "Connections", "Do differently",
+             "Current feelings"]
+ANSWERS = ["went for a long walk by the river and felt lighter afterwards",
+           "an argument with my manager about the schedule, I stayed calm",
+           "called my sister and we laughed about old photos", "sleep earlier",
+           "tired but hopeful", "Skipped", ""]
+
+def legacy_context(entries):
+    """The previous _build_entry_context: first five entries, 200 character cut"""
+    parts = [f"Total entries: {entries[0]['entry_count']}"]
+    for i, entry in enumerate(entries[:5], 1):
+        if 'mood' in entry:
+            parts.append(f"\nEntry {i}:")
+            parts.append(f"  Mood: {entry.get('mood', 'Not specified')}")
+        if 'content' in entry:
+            parts.append(f"  Content: {entry['content'][:200]}...")
+        if 'date' in entry:
+            parts.append(f"  Date: {entry['date']}")
+    return "\n".join(parts)
+
+def make_entries(count, rng):
+    """Synthetic parsed journal, oldest first, with a summary entry in front"""
+    entries = [{'entry_count': count}]
+    for day in range(count):
+        fields = [f"{question}: {rng.choice(ANSWERS)}".rstrip() for question in QUESTIONS]
+        entries.append({'type': 'Daily Reflection', 'date': f"day {day + 1}",
+                        'mood': rng.choice(['Low', 'Neutral', 'Good']),
+                        'fields': fields, 'content': ' '.join(fields)})
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare recap context builders")
+    parser.add_argument('--entries', type=int, default=60, help='Journal entries')
+    parser.add_argument('--runs', type=int, default=200, help='Timed builds')
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries, random.Random(7))
+    builder = EntryContextBuilder()
+
+    legacy = legacy_context(entries)
+    ranked = builder.build(entries)
+    newest = entries[-1]['date']
+    print(f"Entries: {args.entries}")
+    print(f"  legacy  {estimate_tokens(legacy):5d} tokens  entries: {legacy.count('Entry '):2d}  "
+          f"newest included: {legacy.endswith(newest)}  'Skipped' answers: {legacy.count('Skipped')}")
+    print(f"  ranked  {estimate_tokens(ranked):5d} tokens  entries: {ranked.count('- ['):2d}  "
+          f"newest included: {'[' + newest + ',' in ranked}  'Skipped' answers: {ranked.count('Skipped')}")
+
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        builder.build(entries)
+    cached = (time.perf_counter() - started) / args.runs * 1000
+
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        EntryContextBuilder().build(entries)
+    cold = (time.perf_counter() - started) / args.runs * 1000
+    print(f"  build time: {cold:.3f} ms cold, {cached:.3f} ms with cached digests")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench_entry_index.py - Build and query latency of the local journal retrieval index
+#
+# Usage: python benchmarks/bench_entry_index.py [--entries 10000] [--queries 500]
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from entry_index import EntryIndex
+
+WORDS = ("walk river sister work manager schedule sleep tired hopeful anxious interview "
+         "dinner friends gym run park rain coffee book movie family mom dad brother call "
+         "laugh cry stress deadline project weekend trip beach garden cook bake music "
+         "guitar church volunteer school class exam grade teacher dog cat vet doctor "
+         "therapy meditation yoga journal gratitude argument apology birthday gift").split()
+
+QUESTIONS = ["Positive moment", "Challenge handled", "Connections", "Do differently",
+             "Current feelings"]
+
+def make_entry(rng, day):
+    """Synthetic daily reflection with a handful of words per answer"""
+    fields = [f"{question}: {' '.join(rng.choices(WORDS, k=rng.randint(4, 14)))}"
+              for question in QUESTIONS]
+    return {'type': 'Daily Reflection', 'date': f"day {day}", 'mood': 'Good',
+            'fields': fields, 'content': ' '.join(fields)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the journal retrieval index")
+    parser.add_argument('--entries', type=int, default=10000, help='Indexed entries')
+    parser.add_argument('--queries', type=int, default=500, help='Timed queries')
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    entries = [make_entry(rng, day) for day in range(args.entries)]
+    index = EntryIndex()
+
+    started = time.perf_counter()
+    index.add_entries(entries)
+    build = time.perf_counter() - started
+
+    latencies = []
+    for _ in range(args.queries):
+        query = "I keep thinking about " + ' '.join(rng.choices(WORDS, k=rng.randint(3, 8)))
+        started = time.perf_counter()
+        index.search(query, k=3)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+
+    stats = index.stats()
+    print(f"Entries: {stats['documents']:,}  stored values: {stats['nnz']:,}  "
+          f"index size: {stats['bytes'] / 1024 / 1024:.1f} MiB")
+    print(f"  build: {build:.2f} s ({build / args.entries * 1e6:.0f} us per entry)")
+    print(f"  query: p50 {statistics.median(latencies):.2f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms  max {latencies[-1]:.2f} ms")
+
+if __name__ == "__main__":
+    main()
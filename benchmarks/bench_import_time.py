@@ -0,0 +1,45 @@
+# bench_import_time.py - Startup cost of importing the chatbot module
+#
+# Compares a plain import (the chatbot is built lazily) with an import that
+# also builds the shared chatbot, which is what every import used to pay.
+#
+# Usage: python benchmarks/bench_import_time.py [--runs 10]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+CASES = [
+    ("import chatbot (lazy)", ["-c", "import chatbot"]),
+    ("import + build chatbot (eager)", ["-c", "import chatbot; chatbot.get_chatbot()"]),
+    ("app.py --version", ["app.py", "--version"]),
+    ("app.py --show-scale", ["app.py", "--show-scale"]),
+]
+
+def time_command(args, runs):
+    """Median wall time in milliseconds of a fresh interpreter running args"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=SRC_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure chatbot import time")
+    parser.add_argument('--runs', type=int, default=10, help='Runs per case')
+    args = parser.parse_args()
+
+    baseline = time_command(["-c", "pass"], args.runs)
+    print(f"Interpreter startup: {baseline:.1f} ms (median of {args.runs})")
+    for label, command in CASES:
+        elapsed = time_command(command, args.runs)
+        print(f"  {label:<32} {elapsed:8.1f} ms  ({elapsed - baseline:+.1f} ms over startup)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# bench_load.py - Concurrent multi-user load on one host
+#
+# Simulates --users participants, --concurrency at a time, each running a scripted
+# session without input(): mood check-in, daily reflection, chat turns, chat save and
+# weekly recap. Journals are written by the app's own functions into a temporary
+# directory and chat goes through SessionManager, so the numbers include real file
+# and session I/O. Model calls go to mock_openai_server (or the rule-based replies).
+#
+# Usage: python benchmarks/bench_load.py [--users 200] [--concurrency 32] [--turns 5]
+#        [--backend mock|rules] [--latency lognormal:0.4,0.5] [--token-interval 0]
+#        [--no-speculate] [--trace-memory]
+import argparse
+import builtins
+import contextlib
+import datetime
+import io
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+MOOD_INPUTS = ["1", "2", "3", "4", "5", "sad", "okay", "happy", "great"]
+REFLECTION = [
+    "I finished a task I had been putting off",
+    "A long meeting drained me, I took a walk after",
+    "Called my sister in the evening, it was nice",
+    "Start earlier and take more breaks",
+    "calm, tired, hopeful",
+]
+CHAT_MESSAGES = [
+    "Hi there!",
+    "I'm feeling a bit anxious about tomorrow",
+    "I wrote in my journal about my day",
+    "Work has been stressful lately",
+    "I realized I need more rest",
+    "Thanks, that helps",
+    "I had a good conversation with a friend",
+]
+
+class IOCounter:
+    """Counts open() calls by mode while installed, process-wide"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._open = builtins.open
+
+    def _counting_open(self, file, mode='r', *args, **kwargs):
+        kind = 'write' if any(flag in mode for flag in 'wax+') else 'read'
+        with self._lock:
+            self.counts[kind] += 1
+        return self._open(file, mode, *args, **kwargs)
+
+    def __enter__(self):
+        builtins.open = self._counting_open
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.open = self._open
+
+def proc_io():
+    """Read/write syscall and byte counters of this process (Linux only, else empty)"""
+    try:
+        with open('/proc/self/io') as file:
+            return {key: int(value) for key, value in
+                    (line.split(': ') for line in file.read().splitlines())}
+    except OSError:
+        return {}
+
+def rss_mib():
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def run_session(app, manager, user, turns, rng, timings):
+    """
+    One participant's scripted session, recording the latency of every turn
+    Args:
+        app: The app module, providing journal I/O
+        manager: SessionManager holding per-user chat state
+        user: The participant's name (also their journal file name)
+        turns: Chat messages to send
+        rng: Per-user random source for the script
+        timings: Dict of turn kind -> list of seconds, appended to
+    """
+    def timed(kind, action, *args):
+        started = time.perf_counter()
+        result = action(*args)
+        timings[kind].append(time.perf_counter() - started)
+        return result
+
+    chatbot = manager.chatbot_for(user)
+    now = datetime.datetime.now()
+
+    # Initial mood check-in
+    mood = app.assess_mood(rng.choice(MOOD_INPUTS))
+    timed('check-in', chatbot.get_empathetic_response, mood['level'], mood['description'])
+
+    # Daily reflection, saved to the journal
+    later = app.assess_mood(rng.choice(MOOD_INPUTS))
+    timed('reflection', app.save_entry, "Daily Reflection", now.strftime("%m/%d/%Y"),
+          now.strftime("%I:%M %p"), REFLECTION, user, later)
+
+    # Chat turns, then the conversation is saved like chat_mode does on exit
+    history = [f"User: Hello {user}! Ready to chat?"]
+    for _ in range(turns):
+        message = rng.choice(CHAT_MESSAGES)
+        history.append(f"You: {message}")
+        reply = timed('chat', manager.chat, user, message, later)
+        history.append(f"Companion: {reply}")
+    timed('chat save', app.save_chat_conversation, user, history)
+
+    # Weekly recap from the journal, saved back to it
+    def recap():
+        entries, _ = app._load_recap_entries(user)
+        result = app.recap_speculator.take(user, entries)
+        if result is None:
+            result = app.get_chatbot().compose_weekly_recap(entries)
+        app.save_recap(user, result.text)
+        return result
+    timed('recap', recap)
+
+def percentiles(samples):
+    """p50, p95 and p99 of a list of seconds, in milliseconds"""
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent users on one host")
+    parser.add_argument('--users', type=int, default=200, help='Participants to simulate')
+    parser.add_argument('--concurrency', type=int, default=32, help='Sessions running at once')
+    parser.add_argument('--turns', type=int, default=5, help='Chat messages per session')
+    parser.add_argument('--backend', choices=('mock', 'rules'), default='mock',
+                        help='mock: local OpenAI-compatible server, rules: no model calls')
+    parser.add_argument('--latency', default='lognormal:0.4,0.5',
+                        help='Mock time to first token, e.g. fixed:0.2')
+    parser.add_argument('--token-interval', type=float, default=0.0,
+                        help='Mock seconds between streamed tokens')
+    parser.add_argument('--max-active', type=int, default=1024, help='Sessions kept in memory')
+    parser.add_argument('--no-speculate', action='store_true',
+                        help='Turn off speculative recaps after each save')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Measure Python heap per session with tracemalloc (slower)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault('JOURNAL_USAGE_LEDGER', 'off')
+    os.environ.setdefault('JOURNAL_RECAP_QUEUE_PATH', 'off')
+    if args.no_speculate:
+        os.environ['JOURNAL_SPECULATIVE_RECAP'] = 'off'
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app  # Prints the project banner
+    import chatbot as chatbot_module
+    from llm_backend import HTTPBackend
+    from mock_openai_server import LatencyModel, MockOpenAIServer
+    from session_manager import SessionManager
+
+    with contextlib.ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        if args.backend == 'mock':
+            server = stack.enter_context(MockOpenAIServer(
+                latency=LatencyModel.parse(args.latency), token_interval=args.token_interval,
+                seed=args.seed))
+            backend = HTTPBackend(server.base_url)
+        else:
+            server, backend = None, None
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            chatbot = chatbot_module.UnifiedChatbot(ai_enabled=backend is not None, backend=backend)
+        chatbot_module._chatbot = chatbot  # The app's journal functions use the shared chatbot
+        manager = SessionManager(chatbot, max_active=args.max_active,
+                                 db_path=os.path.join(directory, 'sessions.db'))
+
+        previous = os.getcwd()
+        os.chdir(directory)  # Journals are written to the working directory
+        stack.callback(os.chdir, previous)
+
+        timings = defaultdict(list)
+        errors = Counter()
+        lock = threading.Lock()
+
+        def participant(index):
+            local = defaultdict(list)
+            try:
+                run_session(app, manager, f"user{index:05d}", args.turns,
+                            random.Random(args.seed * 100003 + index), local)
+            except Exception as e:
+                with lock:
+                    errors[type(e).__name__] += 1
+            with lock:
+                for kind, samples in local.items():
+                    timings[kind].extend(samples)
+
+        if args.trace_memory:
+            tracemalloc.start()
+        rss_before = rss_mib()
+        io_before = proc_io()
+        with IOCounter() as opened, contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(participant, range(args.users)))
+            elapsed = time.perf_counter() - started
+        io_after = proc_io()
+        heap = tracemalloc.get_traced_memory()[0] if args.trace_memory else None
+        tracemalloc.stop()
+
+        turns = sum(len(samples) for samples in timings.values())
+        print(f"{args.users} users, {args.concurrency} concurrent, {args.turns} chat turns each, "
+              f"backend {args.backend}"
+              + (f" ({args.latency})" if server else "") + "\n")
+        print(f"sessions/s {args.users / elapsed:9.1f}   turns/s {turns / elapsed:9.1f}   "
+              f"wall {elapsed:.2f} s   failed sessions {sum(errors.values())}"
+              + (f" {dict(errors)}" if errors else ""))
+
+        print(f"\n{'turn':<12} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        everything = []
+        for kind in ('check-in', 'reflection', 'chat', 'chat save', 'recap'):
+            samples = timings.get(kind, [])
+            everything.extend(samples)
+            print(f"{kind:<12} {len(samples):>7} " + " ".join(f"{value:>9.1f}" for value in percentiles(samples)))
+        print(f"{'all':<12} {len(everything):>7} " + " ".join(f"{value:>9.1f}" for value in percentiles(everything)))
+
+        stats = manager.stats()
+        print(f"\nmemory: peak RSS {rss_mib():.1f} MiB, growth {rss_mib() - rss_before:.1f} MiB "
+              f"= {(rss_mib() - rss_before) * 1024 / args.users:.1f} KiB per session"
+              + (f", traced heap {heap / 1024 / args.users:.1f} KiB per session" if heap is not None else ""))
+        print(f"sessions: {stats['active']} active, {stats['stored']} spilled to sqlite")
+        print(f"file I/O: {opened.counts['read']} opens for reading, {opened.counts['write']} for writing "
+              f"({(opened.counts['read'] + opened.counts['write']) / args.users:.1f} per session)")
+        if io_before and io_after:
+            print(f"syscalls: {io_after['syscr'] - io_before['syscr']} reads, "
+                  f"{io_after['syscw'] - io_before['syscw']} writes, "
+                  f"{(io_after['wchar'] - io_before['wchar']) / 1024:.0f} KiB written")
+        if server is not None:
+            upstream = server.stats()
+            limits = chatbot.rate_limit_stats()
+            print(f"model calls: {upstream['requests']} upstream, max {upstream['max_in_flight']} "
+                  f"in flight, {limits.get('rejected', 0)} rejected by the rate limiter "
+                  f"(max wait {limits.get('max_wait', 0.0) * 1000:.0f} ms)")
+        manager.close()
+
+if __name__ == "__main__":
+    main()
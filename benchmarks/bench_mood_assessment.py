@@ -0,0 +1,140 @@
+# bench_mood_assessment.py - Precomputed, memoized mood lexicon vs. the per-call build
+#
+# Usage: python benchmarks/bench_mood_assessment.py [--inputs 200000]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from mood_assessment import assess_mood, assess_moods
+
+# What people type at the mood prompt, including misses
+SAMPLE_INPUTS = [
+    "3", "4", " 2 ", "happy", "Sad", "okay", "great", "very good", "a bit sad",
+    "slightly happy", "kind of down", "very low", "fine", "meh", "tired", "not sure",
+]
+
+def legacy_assess_mood(mood_input):
+    """The per-call lexicon build this replaced, kept for comparison"""
+    if not mood_input:
+        return None
+    
+    # Clean the input
+    mood_input = mood_input.strip().lower()
+    
+    mood_map = {
+        # Level 1: Very low mood
+        '1': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
+        'one': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
+        'very low': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
+        'terrible': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
+        'awful': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
+        'horrible': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
+        'depressed': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
+        'hopeless': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
+        
+        # Level 2: Low mood
+        '2': {'level': 2, 'description': 'Low', 'emoji': '😟'},
+        'two': {'level': 2, 'description': 'Low', 'emoji': '😟'},
+        'low': {'level': 2, 'description': 'Low', 'emoji': '😟'},
+        'down': {'level': 2, 'description': 'Low', 'emoji': '😟'},
+        'sad': {'level': 2, 'description': 'Low', 'emoji': '😟'},
+        'unhappy': {'level': 2, 'description': 'Low', 'emoji': '😟'},
+        'blue': {'level': 2, 'description': 'Low', 'emoji': '😟'},
+        'gloomy': {'level': 2, 'description': 'Low', 'emoji': '😟'},
+        
+        # Level 3: Neutral mood
+        '3': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
+        'three': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
+        'neutral': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
+        'okay': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
+        'fine': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
+        'meh': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
+        'alright': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
+        'so-so': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
+        
+        # Level 4: Good mood
+        '4': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
+        'four': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
+        'good': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
+        'happy': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
+        'content': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
+        'pleased': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
+        'satisfied': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
+        'cheerful': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
+        
+        # Level 5: Very good mood
+        '5': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+        'five': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+        'very good': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+        'excellent': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+        'great': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+        'fantastic': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+        'wonderful': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+        'amazing': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+        'ecstatic': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
+    }
+    
+    # Check if input is in mood map
+    if mood_input in mood_map:
+        return mood_map[mood_input]
+    
+    # Check for numeric input that might have spaces or special characters
+    if mood_input.isdigit():
+        mood_num = int(mood_input)
+        if 1 <= mood_num <= 5:
+            return mood_map[str(mood_num)]
+    
+    # Check for "very" patterns
+    if mood_input.startswith('very '):
+        base_mood = mood_input[5:]
+        if base_mood in mood_map:
+            result = mood_map[base_mood].copy()
+            result['level'] = min(5, result['level'] + 1)
+            result['description'] = 'Very ' + result['description']
+            return result
+    
+    # Check for "a bit" or "slightly" patterns
+    bit_patterns = ['a bit ', 'slightly ', 'kind of ', 'sort of ']
+    for pattern in bit_patterns:
+        if mood_input.startswith(pattern):
+            base_mood = mood_input[len(pattern):]
+            if base_mood in mood_map:
+                result = mood_map[base_mood].copy()
+                result['level'] = max(1, result['level'] - 1)
+                result['description'] = 'Slightly ' + result['description']
+                return result
+    
+    # If no match found
+    return None
+
+def timed(label, fn, inputs):
+    started = time.perf_counter()
+    results = fn(inputs)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>28}: {elapsed * 1000:8.1f} ms  ({len(inputs) / elapsed:12,.0f} inputs/s, "
+          f"{elapsed / len(inputs) * 1e6:5.2f} µs/input)")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mood assessment")
+    parser.add_argument('--inputs', type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    inputs = [rng.choice(SAMPLE_INPUTS) for _ in range(args.inputs)]
+
+    print("Per call:")
+    legacy = timed("legacy assess_mood", lambda xs: [legacy_assess_mood(x) for x in xs], inputs)
+    timed("assess_mood", lambda xs: [assess_mood(x) for x in xs], inputs)
+    print("\nBatch:")
+    batch = timed("assess_moods", assess_moods, inputs)
+
+    changed = sum(1 for a, b in zip(legacy, batch) if a != b)
+    print(f"\nResults that differ from the legacy lookup: {changed:,} of {len(inputs):,}")
+
+if __name__ == "__main__":
+    main()
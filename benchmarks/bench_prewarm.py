@@ -0,0 +1,49 @@
+# bench_prewarm.py - First-reply latency with and without the background prewarm
+#
+# Usage: OPENAI_API_KEY=... python benchmarks/bench_prewarm.py [--trials 5] [--think-time 2]
+# Set OPENAI_BASE_URL to point at an OpenAI-compatible server instead of the real API.
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chatbot import UnifiedChatbot
+import openai_client
+
+def first_reply_latency(prewarm: bool, think_time: float) -> float:
+    """Time the first chat completion of a fresh session"""
+    openai_client.reset_client()
+    bot = UnifiedChatbot(ai_enabled=True, use_cache=False)
+
+    if prewarm:
+        thread = threading.Thread(target=bot.prewarm, daemon=True)
+        thread.start()
+    # Stand-in for the user answering the startup prompts
+    time.sleep(think_time)
+
+    started = time.perf_counter()
+    bot._create_completion([{"role": "user", "content": "Hello, how are you?"}], max_tokens=20)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure first-reply latency with and without prewarm")
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--think-time', type=float, default=2.0,
+                        help='Seconds the simulated user spends on the startup prompts')
+    args = parser.parse_args()
+
+    if not os.getenv('OPENAI_API_KEY'):
+        print("OPENAI_API_KEY is not set - nothing to measure.")
+        return
+
+    for label, prewarm in (("without prewarm", False), ("with prewarm", True)):
+        samples = [first_reply_latency(prewarm, args.think_time) for _ in range(args.trials)]
+        print(f"{label:>16}: median {statistics.median(samples) * 1000:7.1f} ms   "
+              f"min {min(samples) * 1000:7.1f} ms   max {max(samples) * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
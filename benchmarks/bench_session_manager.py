@@ -0,0 +1,71 @@
+# bench_session_manager.py - Memory of the session manager as registered users grow
+#
+# Every user sends a few messages; only --max-active sessions stay in memory and
+# the rest spill to sqlite snapshots. Traced Python memory should stay flat.
+#
+# Usage: python benchmarks/bench_session_manager.py [--users 100000] [--max-active 1000]
+import argparse
+import contextlib
+import io
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chatbot import UnifiedChatbot
+from session_manager import SessionManager
+
+MESSAGES = [
+    "Hi there!",
+    "I'm feeling a bit anxious today",
+    "I wrote in my journal about my day",
+    "I need some support",
+    "I realized something important about myself",
+]
+
+def rss_mib():
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark session manager memory")
+    parser.add_argument('--users', type=int, default=100000, help='Registered users')
+    parser.add_argument('--max-active', type=int, default=1000, help='Sessions kept in memory')
+    parser.add_argument('--messages', type=int, default=3, help='Messages per user')
+    parser.add_argument('--revisit', type=float, default=0.1,
+                        help='Chance a message goes to an earlier user (forces rehydration)')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False)
+    rng = random.Random(42)
+    checkpoints = {args.users // 100, args.users // 10, args.users // 2, args.users}
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = SessionManager(chatbot, max_active=args.max_active,
+                                 db_path=os.path.join(directory, 'sessions.db'))
+        tracemalloc.start()
+        started = time.perf_counter()
+        print(f"{'users':>9} {'traced MiB':>11} {'peak RSS MiB':>13} {'active':>7} "
+              f"{'stored':>8} {'rehydrated':>11} {'msg/s':>9}")
+        for user in range(1, args.users + 1):
+            for _ in range(args.messages):
+                target = rng.randrange(user) if rng.random() < args.revisit else user - 1
+                manager.chat(f"user-{target}", rng.choice(MESSAGES))
+            if user in checkpoints:
+                stats = manager.stats()
+                traced = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+                rate = user * args.messages / (time.perf_counter() - started)
+                print(f"{user:>9,} {traced:>11.1f} {rss_mib():>13.1f} {stats['active']:>7,} "
+                      f"{stats['stored']:>8,} {stats['rehydrated']:>11,} {rate:>9,.0f}")
+        tracemalloc.stop()
+        manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bench_session_memory.py - Memory per chat session with the shared response corpus
+#
+# Usage: python benchmarks/bench_session_memory.py [--sessions 5000] [--turns 4]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import response_corpus
+from chatbot import ChatSession, UnifiedChatbot
+
+def thaw(value):
+    """Mutable copy of a frozen corpus value, as each instance used to build it"""
+    if isinstance(value, (dict, type(response_corpus.MOOD_RESPONSES))):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+def legacy_corpus():
+    """The per-instance dicts UnifiedChatbot.__init__ used to rebuild"""
+    return [thaw(response_corpus.MOOD_RESPONSES), thaw(response_corpus.FOLLOWUP_QUESTIONS),
+            thaw(response_corpus.CHAT_RESPONSES), thaw(response_corpus.RECAP_TEMPLATES),
+            thaw(response_corpus.RECAP_ELEMENTS)]
+
+def measure(factory, count):
+    """Average traced bytes held per object built by factory"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del objects
+    return used / count
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory per chat session")
+    parser.add_argument('--sessions', type=int, default=5000, help='Sessions to create')
+    parser.add_argument('--turns', type=int, default=4, help='Chat exchanges per session')
+    args = parser.parse_args()
+
+    def session():
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False, session=ChatSession())
+        for _ in range(args.turns):
+            chatbot.get_chat_response("I feel a bit tired today")
+        return chatbot.session
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [
+            ("ChatSession (history only)", measure(session, args.sessions)),
+            ("UnifiedChatbot per user", measure(
+                lambda: UnifiedChatbot(ai_enabled=False, use_cache=False), args.sessions)),
+            ("Legacy per-instance corpus", measure(legacy_corpus, args.sessions)),
+        ]
+
+    print(f"Sessions: {args.sessions:,}  Turns per session: {args.turns}")
+    for label, per_object in results:
+        print(f"  {label:<28} {per_object / 1024:8.2f} KiB each  "
+              f"{per_object * args.sessions / 1024 / 1024:8.1f} MiB total")
+
+if __name__ == "__main__":
+    main()
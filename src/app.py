@@ -1,15 +1,19 @@
 import justice_navigator_info
-import pandas as pd
-import numpy as np
 import os
 import datetime
 import time
+import threading
 from colorama import init, Fore, Back, Style      # type: ignore   
 import colorama                                   # type: ignore
 from rules import validate_choice, parse_cli_args, process_cli_args
 from decision_table import decision_table
 from mood_assessment import assess_mood, display_mood_scale
-from chatbot import chatbot   
+from chatbot import get_chatbot
+from openai_client import get_client_error
+from recap_speculator import RecapSpeculator
+from recap_queue import recap_queue_from_env
+from entry_index import EntryIndex
+from mood_series import MoodSeries, entry_timestamp
                    
 
 init(autoreset=True)
@@ -17,6 +21,52 @@ init(autoreset=True)
 # New version, added AI and Chat Mode feature
 __version__ = "1.3.0"  
 
+# Background weekly recap generation (see speculate_recap); quiet, as it runs
+# while the user is at a prompt
+recap_speculator = RecapSpeculator(
+    lambda entries: get_chatbot().compose_weekly_recap(entries, quiet=True),
+    max_wasted=int(os.getenv('JOURNAL_SPECULATIVE_RECAP_MAX_WASTED', '3'))
+)
+
+# AI recaps that failed, completed in the background once the API is back (see start_recap_drain)
+recap_queue = None
+
+# Per-user mood time series, read from the journal once and extended by save_entry
+mood_series = {}
+_mood_series_lock = threading.Lock()
+
+# One lock per journal file, so recaps written by background threads never
+# interleave with the user's own entries
+_journal_locks = {}
+_journal_locks_lock = threading.Lock()
+
+def journal_lock(name):
+    """Lock serializing writes to a user's journal file"""
+    with _journal_locks_lock:
+        return _journal_locks.setdefault(name, threading.Lock())
+
+def start_prewarm(enabled=True):
+    """
+    Warm up the AI connection in a background thread while the user answers startup prompts
+    JOURNAL_PREWARM=off disables it, JOURNAL_PREWARM=request also sends a minimal request
+    Args:
+        enabled: False when --no-prewarm was given
+    Returns:
+        The started thread, or None when prewarm is disabled
+    """
+    mode = os.getenv('JOURNAL_PREWARM', 'connect').strip().lower()
+    if not enabled or mode in ('off', '0', 'false', 'no') or not get_chatbot().ai_enabled:
+        return None
+    
+    thread = threading.Thread(
+        target=get_chatbot().prewarm,
+        kwargs={'send_request': mode == 'request'},
+        name="ai-prewarm",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
 def welcome_message():
     """introduction to journal"""
     print(f"\n{'='*14}Welcome to your Journal Companion{'='*15}\n")
@@ -24,6 +74,19 @@ def welcome_message():
     print(f"All entries will be securely saved on your device.")
     print(f"Take your time, there's no rush.\n")
 
+# Corrected keywords below this confidence are confirmed with the user first
+CONFIRM_CONFIDENCE = 0.85
+
+def confirm_mood(mood_input, mood_result):
+    """check a mood read from a misspelled keyword, returning None if the user declines"""
+    if not mood_result or 'matched' not in mood_result:
+        return mood_result
+    if mood_result['confidence'] >= CONFIRM_CONFIDENCE:
+        print(f"{Fore.YELLOW}(Reading \"{mood_input}\" as \"{mood_result['matched']}\"){Style.RESET_ALL}")
+        return mood_result
+    answer = input(f"{Fore.CYAN}Did you mean \"{mood_result['matched']}\"? (yes/no): {Style.RESET_ALL}").strip().lower()
+    return mood_result if answer in ['yes', 'y'] else None
+
 def initial_mood_assessment():
     """
     Assess user's mood immediately upon opening the application
@@ -39,7 +102,7 @@ def initial_mood_assessment():
     
     while True:
         mood_input = input(f"\n{Fore.GREEN}How are you feeling? (1-5 or keyword): ").strip()
-        mood_result = assess_mood(mood_input)
+        mood_result = confirm_mood(mood_input, assess_mood(mood_input))
         
         if mood_result:
             mood_level = mood_result['level']
@@ -49,7 +112,7 @@ def initial_mood_assessment():
             
             # Chatbot response
             print(f"\n{Fore.CYAN}Journal Companion:{Style.RESET_ALL}")
-            response = chatbot.get_empathetic_response(mood_level, mood_description)
+            response = get_chatbot().get_empathetic_response(mood_level, mood_description)
             print(f"{Fore.GREEN}{response}{Style.RESET_ALL}")
             
             return mood_result
@@ -94,7 +157,7 @@ def daily_reflection(name, initial_mood=None):
     
     while True:
         mood_input = input(f"\n{Fore.GREEN}How are you feeling right now? (1-5 or keyword): ").strip()
-        current_mood = assess_mood(mood_input)
+        current_mood = confirm_mood(mood_input, assess_mood(mood_input))
         
         if current_mood:
             current_level = current_mood['level']
@@ -120,17 +183,17 @@ def daily_reflection(name, initial_mood=None):
             
             # Chatbot response
             print(f"\n{Fore.CYAN}Journal Companion:{Style.RESET_ALL}")
-            response = chatbot.get_empathetic_response(current_level, current_description)
+            response = get_chatbot().get_empathetic_response(current_level, current_description)
             print(f"{Fore.GREEN}{response}{Style.RESET_ALL}")
             
             # Optional: Offer additional support
-            support_offer = chatbot.offer_support(current_level)
+            support_offer = get_chatbot().offer_support(current_level)
             print(f"\n{Fore.CYAN}{support_offer} (yes/no){Style.RESET_ALL}")
             user_choice = input().strip().lower()
             if user_choice in ['yes', 'y', 'yeah']:
                 print(f"\n{Fore.GREEN}Let's explore that together...{Style.RESET_ALL}")
                 # Offer follow-up questions
-                questions = chatbot.get_followup_questions(current_level)
+                questions = get_chatbot().get_followup_questions(current_level)
                 print(f"\n{Fore.YELLOW}Here are some questions for reflection:{Style.RESET_ALL}")
                 for i, question in enumerate(questions[:3], 1):  # Show first 3 questions
                     print(f"\n{i}. {question}")
@@ -226,6 +289,7 @@ def chat_mode(name, initial_mood=None):
     if initial_mood:
         mood_context = f"User's current mood: {initial_mood['description']}"
         conversation_history.append(mood_context)
+    get_chatbot().user_context['mood_trend'] = load_mood_series(name).describe()
     
     print(f"\n{Fore.YELLOW}Journal Companion:{Style.RESET_ALL} Hi {name}! How are you feeling today?")
     
@@ -269,7 +333,7 @@ def chat_mode(name, initial_mood=None):
             time.sleep(0.5)
             
             # Get response based on conversation history
-            response = chatbot.get_chat_response(user_input, conversation_history, initial_mood)
+            response = get_chatbot().get_chat_response(user_input, conversation_history, initial_mood)
             print(f"{Fore.GREEN}{response}{Style.RESET_ALL}")
             
             # Add response to conversation history
@@ -302,7 +366,7 @@ def quick_mood_check(name):
     print(display_mood_scale())
     
     mood_input = input(f"\n{Fore.GREEN}How are you feeling? (1-5 or keyword): {Style.RESET_ALL}").strip()
-    mood_result = assess_mood(mood_input)
+    mood_result = confirm_mood(mood_input, assess_mood(mood_input))
     
     if mood_result:
         print(f"\n{Fore.YELLOW}✓ Mood noted: {mood_result['description']}{Style.RESET_ALL}")
@@ -355,7 +419,7 @@ def save_chat_conversation(name, conversation_history):
     current_time = datetime.datetime.now().strftime("%m/%d/%Y %I:%M %p")
     
     try:
-        with open(filename, "a") as file:
+        with journal_lock(name), open(filename, "a") as file:
             file.write(f"\n{'='*64}\n")
             file.write(f"Entry Type: Chat Conversation\n")
             file.write(f"Date: {current_time}\n")
@@ -367,6 +431,9 @@ def save_chat_conversation(name, conversation_history):
             file.write(f"{'='*64}\n")
         
         print(f"\n{Fore.GREEN}✓ Chat conversation saved to your journal!{Style.RESET_ALL}")
+        index_entry({'type': "Chat Conversation", 'date': current_time,
+                     'fields': [str(line) for line in conversation_history[-10:]]})
+        speculate_recap(name)
         return True
     except Exception as e:
         print(f"\n{Fore.RED}Error saving conversation: {e}{Style.RESET_ALL}")
@@ -375,8 +442,10 @@ def save_chat_conversation(name, conversation_history):
 def save_entry(entry_type, date, time, content, name, mood=None):
     """Create file for Journal Entries"""
     filename = f"{name}_journal.txt"
+    fields = []  # Lines as written, for the chat retrieval index
+    series = load_mood_series(name) if mood else None  # Read before this entry is written
 
-    with open(filename, "a") as file:
+    with journal_lock(name), open(filename, "a") as file:
         file.write(f"\n{'='*64}\n")
         file.write(f"Entry Type: {entry_type}\n")
         file.write(f"Date: {date} | Time: {time}\n")
@@ -395,6 +464,7 @@ def save_entry(entry_type, date, time, content, name, mood=None):
 
             for e, (question, answer) in enumerate(zip(daily_questions, content)):
                 file.write(f"{question}{answer}\n")
+                fields.append(f"{question}{answer}")
 
         elif entry_type == "Weekly Check-in":
             weekly_questions = [
@@ -407,67 +477,73 @@ def save_entry(entry_type, date, time, content, name, mood=None):
 
             for e, (question, answer) in enumerate(zip(weekly_questions, content)):
                 file.write(f"{question}{answer}\n")
+                fields.append(f"{question}{answer}")
         
         elif entry_type == "Chat Conversation":
             for line in content:
                 file.write(f"{line}\n")
+                fields.append(str(line))
     
     print(f"\n{Fore.GREEN}✓ Your entry has been saved to {filename}")
+    # Day resolution, like the check-ins read back from the journal (which skips unreadable dates)
+    timestamp = entry_timestamp(date) if series is not None else None
+    if timestamp is not None:
+        series.append(timestamp, mood['level'])
+    index_entry({'type': entry_type, 'date': date, 'mood': mood['description'] if mood else None,
+                 'fields': fields})
+    speculate_recap(name)
 
 def _parse_journal_entries(content: str) -> list:
     """
     Parse journal file content into structured entries
+    Each entry is a header block (type, date, mood) followed by its body block
     Args:
         content: Raw journal file content
     Returns:
-        List of parsed entry dictionaries
+        List of parsed entry dictionaries, oldest first
     """
     entries = []
+    entry_dict = None
     
     # Split by entry separators
     raw_entries = content.split('=' * 64)
     
     for raw_entry in raw_entries:
-        if not raw_entry.strip():
+        lines = [line.strip() for line in raw_entry.split('\n') if line.strip()]
+        if not lines:
             continue
-            
-        entry_dict = {}
-        
-        # Extract entry type
-        if "Entry Type:" in raw_entry:
-            type_line = [line for line in raw_entry.split('\n') if "Entry Type:" in line]
-            if type_line:
-                entry_dict['type'] = type_line[0].replace("Entry Type:", "").strip()
         
-        # Extract date
-        if "Date:" in raw_entry:
-            date_line = [line for line in raw_entry.split('\n') if "Date:" in line]
-            if date_line:
-                entry_dict['date'] = date_line[0].replace("Date:", "").split('|')[0].strip()
+        # A header block starts a new entry
+        if any(line.startswith("Entry Type:") for line in lines):
+            entry_dict = {}
+            entries.append(entry_dict)
+            for line in lines:
+                if line.startswith("Entry Type:"):
+                    entry_dict['type'] = line.replace("Entry Type:", "").strip()
+                elif line.startswith("Date:"):
+                    entry_dict['date'] = line.replace("Date:", "").split('|')[0].strip()
+                elif line.startswith("Mood:"):
+                    entry_dict['mood'] = line.replace("Mood:", "").strip()
+            continue
         
-        # Extract mood
-        if "Mood:" in raw_entry:
-            mood_line = [line for line in raw_entry.split('\n') if "Mood:" in line]
-            if mood_line:
-                entry_dict['mood'] = mood_line[0].replace("Mood:", "").strip()
+        # Otherwise this is the body of the current entry
+        if entry_dict is None or 'content' in entry_dict:
+            entry_dict = {}
+            entries.append(entry_dict)
         
-        # Extract content (questions and answers)
+        # Extract content (questions and answers), stopping at a saved weekly recap
         content_lines = []
-        for line in raw_entry.split('\n'):
-            # Skip header lines
-            if any(skip in line for skip in ['Entry Type:', 'Date:', 'Time:', 'Mood:', '===', '---']):
-                continue
-            if line.strip():
-                content_lines.append(line.strip())
+        for line in lines:
+            if line.startswith('-' * 64):
+                break
+            content_lines.append(line)
         
         if content_lines:
-            entry_dict['content'] = ' '.join(content_lines[:300])  # Limit content length
-        
-        # Only add entries that have meaningful data
-        if any(key in entry_dict for key in ['type', 'mood', 'content']):
-            entries.append(entry_dict)
+            entry_dict['fields'] = content_lines[:300]  # Limit content length
+            entry_dict['content'] = ' '.join(entry_dict['fields'])
     
-    return entries
+    # Only keep entries that have meaningful data
+    return [entry for entry in entries if any(key in entry for key in ['type', 'mood', 'content'])]
 
 def view_previous_entries(name):
     """Review previous journal entries"""
@@ -480,6 +556,175 @@ def view_previous_entries(name):
     else:
         print(f"\nUnfortunately you have not saved a file yet. Your Journal is ready to listen when you are ready to say.")
 
+def _load_recap_entries(name):
+    """
+    Read the journal and build the entries used for a weekly recap
+    Args:
+        name: User's name
+    Returns:
+        Tuple of (entries, counts) - entries is empty if the journal can't be read
+    """
+    filename = f"{name}_journal.txt"
+    
+    with open(filename, 'r') as file:
+        content = file.read()
+        
+    # Count entries
+    daily_count = content.count("Entry Type: Daily Reflection")
+    weekly_count = content.count("Entry Type: Weekly Check-in")
+    chat_count = content.count("Entry Type: Chat Conversation")
+    total_entries = daily_count + weekly_count + chat_count
+    
+    # Parse individual entries for AI context
+    parsed_entries = _parse_journal_entries(content)
+    
+    # Create summary entry
+    summary_entry = {
+        'date': datetime.datetime.now().strftime("%m/%d/%Y"),
+        'entry_count': total_entries,
+        'daily_count': daily_count,
+        'weekly_count': weekly_count,
+        'chat_count': chat_count,
+        'note': f"User has {total_entries} journal entries."
+    }
+    series = load_mood_series(name, parsed_entries)
+    mood_trend = series.describe()
+    if mood_trend:
+        summary_entry['mood_trend'] = mood_trend                 # Statistics for the AI prompt
+        summary_entry['mood_reflection'] = series.reflect()     # Wording for the rule-based recap
+    
+    # Combine summary with parsed entries
+    # The chatbot ranks entries and packs them into its prompt budget
+    entries = [summary_entry] + parsed_entries
+    counts = {'total': total_entries, 'daily': daily_count, 'weekly': weekly_count, 'chat': chat_count}
+    return entries, counts
+
+def load_mood_series(name, entries=None):
+    """
+    Get the user's mood time series, reading it from the journal on first use
+    Args:
+        name: User's name
+        entries: Already parsed journal entries, to avoid reading the file again
+    Returns:
+        The user's MoodSeries (empty if there is no journal yet)
+    """
+    with _mood_series_lock:
+        series = mood_series.get(name)
+        if series is None:
+            if entries is None:
+                entries = []
+                filename = f"{name}_journal.txt"
+                if os.path.exists(filename):
+                    try:
+                        with open(filename, 'r') as file:
+                            entries = _parse_journal_entries(file.read())
+                    except Exception as e:
+                        print(f"{Fore.YELLOW}Could not read past moods: {e}{Style.RESET_ALL}")
+            series = mood_series[name] = MoodSeries.from_entries(entries)
+        return series
+
+def load_entry_index(name):
+    """
+    Build the retrieval index chat mode uses to bring up related past entries
+    Only AI chat reads it, so nothing is built in rule-based mode
+    Args:
+        name: User's name
+    """
+    chatbot = get_chatbot()
+    if not chatbot.ai_enabled:
+        return
+    
+    index = EntryIndex()
+    filename = f"{name}_journal.txt"
+    if os.path.exists(filename):
+        try:
+            with open(filename, 'r') as file:
+                index.add_entries(_parse_journal_entries(file.read()))
+        except Exception as e:
+            print(f"{Fore.YELLOW}Could not index past entries for chat: {e}{Style.RESET_ALL}")
+    chatbot.entry_index = index
+
+def index_entry(entry):
+    """
+    Add a newly saved entry to the chat retrieval index, if one is loaded
+    Args:
+        entry: Entry dictionary in the _parse_journal_entries format
+    """
+    index = get_chatbot().entry_index
+    if index is not None:
+        index.add_entry(entry)
+
+def save_recap(name, recap, title="Weekly Recap", when=None):
+    """
+    Append a recap to the user's journal
+    Args:
+        name: User's name
+        recap: Recap text
+        title: Heading written above the recap
+        when: Datetime shown in the heading (defaults to now)
+    """
+    when = when or datetime.datetime.now()
+    with journal_lock(name), open(f"{name}_journal.txt", 'a') as file:
+        file.write(f"\n\n{'-'*64}\n")
+        file.write(f"{title} - {when.strftime('%m/%d/%Y %I:%M %p')}\n")
+        file.write(f"{'-'*64}\n")
+        file.write(f"{recap}\n")
+        file.write(f"{'-'*64}\n")
+
+def _complete_deferred_recap(entries):
+    """Generate a queued recap with the AI, raising so the queue retries while it is down"""
+    # Runs on the drain thread, so failures go to the queue rather than the screen
+    result = get_chatbot().compose_weekly_recap(entries, quiet=True)
+    if result.source != 'ai':
+        raise RuntimeError(result.error or "AI recap unavailable")
+    return result.text
+
+def _deliver_deferred_recap(job, recap):
+    """Add a recap completed by the drain worker to the journal it was requested for"""
+    save_recap(job.journal, recap, title="Weekly Recap (AI, completed later)",
+               when=datetime.datetime.fromtimestamp(job.requested))
+
+def start_recap_drain():
+    """
+    Open the deferred recap queue and start completing queued recaps in the background
+    JOURNAL_RECAP_QUEUE_PATH=off disables deferral, JOURNAL_RECAP_RETRY_INTERVAL sets
+    the seconds between drains
+    Returns:
+        The queue, or None when AI or deferral is off
+    """
+    global recap_queue
+    if recap_queue is None and get_chatbot().ai_enabled:
+        try:
+            recap_queue = recap_queue_from_env()
+        except Exception as e:
+            print(f"{Fore.YELLOW}Deferred recaps unavailable: {e}{Style.RESET_ALL}")
+            return None
+        if recap_queue is not None:
+            recap_queue.start(_complete_deferred_recap, _deliver_deferred_recap,
+                              interval=float(os.getenv('JOURNAL_RECAP_RETRY_INTERVAL', '60')))
+    return recap_queue
+
+def speculate_recap(name):
+    """
+    Start computing the weekly recap in the background so option 4 returns instantly
+    Called once the journal is loaded and after every saved entry (which supersedes
+    the previous speculation). JOURNAL_SPECULATIVE_RECAP=off disables it.
+    Args:
+        name: User's name
+    """
+    if os.getenv('JOURNAL_SPECULATIVE_RECAP', 'on').strip().lower() in ('off', '0', 'false', 'no'):
+        return
+    # Rule-based recaps are instant, only the model call is worth speculating on
+    if not get_chatbot().ai_enabled or not os.path.exists(f"{name}_journal.txt"):
+        return
+    
+    try:
+        entries, _ = _load_recap_entries(name)
+    except Exception:
+        recap_speculator.invalidate(name)
+        return
+    recap_speculator.schedule(name, entries)
+
 def generate_weekly_recap(name):
     """Generate weekly recap from journal entries"""
     print(f"\n{Fore.CYAN}Generating your weekly recap, {name}...{Style.RESET_ALL}")
@@ -493,39 +738,19 @@ def generate_weekly_recap(name):
     # Read and parse journal entries
     entries = []
     try:
-        with open(filename, 'r') as file:
-            content = file.read()
-            
-        # Count entries
-        daily_count = content.count("Entry Type: Daily Reflection")
-        weekly_count = content.count("Entry Type: Weekly Check-in")
-        chat_count = content.count("Entry Type: Chat Conversation")
-        total_entries = daily_count + weekly_count + chat_count
-        
-        print(f"\n{Fore.GREEN}Found {total_entries} journal entries ({daily_count} daily, {weekly_count} weekly, {chat_count} chat).{Style.RESET_ALL}")
-        
-        # Parse individual entries for AI context
-        parsed_entries = _parse_journal_entries(content)
-        
-        # Create summary entry
-        summary_entry = {
-            'date': datetime.datetime.now().strftime("%m/%d/%Y"),
-            'entry_count': total_entries,
-            'daily_count': daily_count,
-            'weekly_count': weekly_count,
-            'chat_count': chat_count,
-            'note': f"User has {total_entries} journal entries."
-        }
-        
-        # Combine summary with parsed entries
-        entries = [summary_entry] + parsed_entries[:5]  # Include summary + up to 5 recent entries
+        entries, counts = _load_recap_entries(name)
+        print(f"\n{Fore.GREEN}Found {counts['total']} journal entries ({counts['daily']} daily, {counts['weekly']} weekly, {counts['chat']} chat).{Style.RESET_ALL}")
         
     except Exception as e:
         print(f"{Fore.RED}Error reading journal file: {e}{Style.RESET_ALL}")
         entries = []
     
-    # Generate recap using chatbot/ a great way for user to 
-    recap = chatbot.generate_weekly_recap(entries)
+    # Use the speculative recap if it matches the current journal, otherwise generate now
+    result = recap_speculator.take(name, entries) if entries else None
+    if result is None:
+        # Generate recap using chatbot/ a great way for user to 
+        result = get_chatbot().compose_weekly_recap(entries)
+    recap = result.text
     
     print(f"\n{Fore.CYAN}{'='*64}")
     print(f"{'='*22}WEEKLY RECAP{'='*22}")
@@ -533,15 +758,15 @@ def generate_weekly_recap(name):
     print(f"\n{recap}")
     print(f"\n{Fore.CYAN}{'='*64}{Style.RESET_ALL}")
     
+    # The AI was unreachable - queue the full recap to be added to the journal later
+    if result.source == 'fallback' and entries and recap_queue is not None:
+        recap_queue.enqueue(name, entries)
+        print(f"{Fore.YELLOW}Your full AI recap will be added to your journal once the connection is back.{Style.RESET_ALL}")
+    
     # Ask if user wants to save the recap
     save = input(f"\n{Fore.YELLOW}Save this recap to your journal? (yes/no): {Style.RESET_ALL}").strip().lower()
     if save in ['yes', 'y']:
-        with open(filename, 'a') as file:
-            file.write(f"\n\n{'-'*64}\n")
-            file.write(f"Weekly Recap - {datetime.datetime.now().strftime('%m/%d/%Y %I:%M %p')}\n")
-            file.write(f"{'-'*64}\n")
-            file.write(f"{recap}\n")
-            file.write(f"{'-'*64}\n")
+        save_recap(name, recap)
         print(f"{Fore.GREEN}✓ Recap saved to your journal!{Style.RESET_ALL}")
 
 def main():
@@ -562,6 +787,11 @@ def main():
         print(display_mood_scale())
         return
     
+    if cli_results['action'] == 'usage_report':
+        from usage_ledger import UsageLedger, ledger_from_env, format_usage_report
+        print(format_usage_report(ledger_from_env() or UsageLedger()))
+        return
+    
     if cli_results['action'] == 'test':
         print("Running unit tests...")
         # Try to import and run chatbot tests
@@ -583,14 +813,20 @@ def main():
     
     # Show chatbot status
     print(f"\n{Fore.CYAN}Journal Companion Chatbot: ")
-    if hasattr(chatbot, 'ai_enabled') and chatbot.ai_enabled:
+    if get_chatbot().ai_enabled:
         print(f"{Fore.GREEN}✓ AI Chatbot enabled - I'm here to support you!{Style.RESET_ALL}")
     else:
+        # The client is created lazily, possibly on the prewarm thread, so its errors are reported here
+        if get_client_error():
+            print(f"{Fore.YELLOW}{get_client_error()}{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}✓ Empathetic responses enabled - Ready to listen{Style.RESET_ALL}")
     
     # Highlight New Feautre
     print(f"\n{Fore.MAGENTA}✨ NEW: Chat Mode available! Select option 6 to have a conversation. ✨{Style.RESET_ALL}")
     
+    # Warm up the AI connection while the user answers the startup prompts
+    start_prewarm(cli_results.get('prewarm', True))
+    
     # Initial mood assessment
     if not initial_mood:
         initial_mood = initial_mood_assessment()
@@ -598,13 +834,19 @@ def main():
         print(f"\n{Fore.CYAN}Initial mood from command line: {initial_mood['description']}{Style.RESET_ALL}")
         # Provide response to CLI mood
         print(f"\n{Fore.CYAN}Journal Companion:{Style.RESET_ALL}")
-        response = chatbot.get_empathetic_response(initial_mood['level'], initial_mood['description'])
+        response = get_chatbot().get_empathetic_response(initial_mood['level'], initial_mood['description'])
         print(f"{Fore.GREEN}{response}{Style.RESET_ALL}")
     
     welcome_message()
 
     # Gather user information 
     name, date = user_info()
+    get_chatbot().user_context['user_id'] = name  # Attributes AI usage in the ledger
+    
+    # Journal is known now - index it for chat and start on the weekly recap before it's requested
+    load_entry_index(name)
+    speculate_recap(name)
+    start_recap_drain()
 
     # Personalization of welcome
     print(f"\nWelcome, {name}! I am glad you are here.")
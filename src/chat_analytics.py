@@ -0,0 +1,297 @@
+import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .chatbot import CATEGORY_KEYWORDS
+except ImportError:
+    from chatbot import CATEGORY_KEYWORDS
+
+ENTRY_SEPARATOR = '=' * 64
+
+# Bytes that form words, matching the chatbot's [a-z0-9'] tokenizer; anything else is a break
+_WORD_BYTES = np.zeros(256, dtype=bool)
+_WORD_BYTES[np.frombuffer(b"abcdefghijklmnopqrstuvwxyz0123456789'", dtype=np.uint8)] = True
+
+# Words are compared on their first KEY_BYTES bytes, packed into two uint64 columns
+KEY_BYTES = 16
+_WORDS_PER_CHUNK = 1 << 20
+_LENGTH_MASKS = np.tril(np.full((KEY_BYTES + 1, KEY_BYTES), 0xFF, dtype=np.uint8), k=-1)
+
+
+def _hash_keys(packed: np.ndarray) -> np.ndarray:
+    """Fold packed (n, 2) uint64 word keys into one uint64 per word"""
+    return packed[:, 0] ^ (packed[:, 1] * np.uint64(0x9E3779B97F4A7C15))
+
+
+class ChatCorpus:
+    """User chat lines from one or more journals, grouped into chat sessions"""
+
+    def __init__(self, lines: List[str], session_ids: np.ndarray, session_dates: List[Optional[datetime.datetime]],
+                 session_users: List[str]):
+        self.lines = lines
+        self.session_ids = session_ids              # session index of every line
+        self.session_dates = session_dates          # one per session
+        self.session_users = session_users          # one per session
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    @property
+    def session_count(self) -> int:
+        return len(self.session_dates)
+
+
+def _parse_chat_date(value: str) -> Optional[datetime.datetime]:
+    """Parse the 'Date:' value written by save_chat_conversation"""
+    for fmt in ("%m/%d/%Y %I:%M %p", "%m/%d/%Y"):
+        try:
+            return datetime.datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def extract_chat_lines(journals: Dict[str, str], speakers: Sequence[str] = ('You', 'User')) -> ChatCorpus:
+    """
+    Collect the user's lines from every "Chat Conversation" entry
+    Args:
+        journals: Mapping of user name to raw journal file content
+        speakers: Line prefixes that mark the user's messages
+    Returns:
+        ChatCorpus with one session per saved chat conversation
+    """
+    prefixes = tuple(f"{speaker}: " for speaker in speakers)
+    lines: List[str] = []
+    line_sessions: List[int] = []
+    session_dates: List[Optional[datetime.datetime]] = []
+    session_users: List[str] = []
+
+    for user, content in journals.items():
+        blocks = content.split(ENTRY_SEPARATOR)
+        # A chat entry is a header block followed by a body block
+        for header, body in zip(blocks, blocks[1:]):
+            if "Entry Type: Chat Conversation" not in header:
+                continue
+            date = None
+            for header_line in header.split('\n'):
+                if header_line.startswith("Date:"):
+                    date = _parse_chat_date(header_line[5:])
+            session = len(session_dates)
+            session_dates.append(date)
+            session_users.append(user)
+            for line in body.split('\n'):
+                if line.startswith(prefixes):
+                    lines.append(line.split(': ', 1)[1])
+                    line_sessions.append(session)
+
+    return ChatCorpus(lines, np.asarray(line_sessions, dtype=np.int32), session_dates, session_users)
+
+
+class ChatAnalytics:
+    """Vectorized categorization and statistics over chat lines"""
+
+    def __init__(self, vocabularies=CATEGORY_KEYWORDS):
+        """
+        Build the term vocabulary from the chatbot's category keywords
+        Args:
+            vocabularies: Sequence of (category, keywords) pairs in priority order
+        """
+        self.categories = tuple(category for category, _ in vocabularies) + ('general',)
+        self.general = len(self.categories) - 1
+
+        terms: List[str] = []
+        term_categories: List[int] = []
+        for rank, (_, keywords) in enumerate(vocabularies):
+            for word in keywords:
+                if word not in terms:
+                    terms.append(word)
+                    term_categories.append(rank)
+
+        self.terms = tuple(terms)
+        self.term_categories = np.asarray(term_categories, dtype=np.int8)
+
+        # Packed key of every term, grouped by how it is compared: exact words, then stems by length
+        unsupported = [word for word in terms if not 2 <= len(word.rstrip('*')) <= KEY_BYTES]
+        if unsupported:
+            raise ValueError(f"Keywords must be 2-{KEY_BYTES} characters long: {', '.join(unsupported)}")
+        term_keys = np.zeros((len(terms), KEY_BYTES), dtype=np.uint8)
+        for index, word in enumerate(terms):
+            raw = word.rstrip('*').encode('utf-8')
+            term_keys[index, :len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+        self._term_keys = term_keys.view(np.uint64)
+
+        groups = {}
+        for index, word in enumerate(terms):
+            stem_length = len(word) - 1 if word.endswith('*') else None
+            groups.setdefault(stem_length, []).append(index)
+        self._term_groups = []
+        for stem_length, members in groups.items():
+            members = np.asarray(members, dtype=np.int32)
+            hashes = _hash_keys(self._term_keys[members])
+            order = np.argsort(hashes)
+            self._term_groups.append((stem_length, hashes[order], members[order]))
+
+        # Two-byte prefixes of every term, for pre-filtering words
+        self._term_prefixes = np.zeros(1 << 16, dtype=bool)
+        self._term_prefixes[term_keys[:, 0].astype(np.int32) << 8 | term_keys[:, 1]] = True
+
+        # Term -> category indicator, used to fold term counts into category counts
+        self._category_matrix = np.zeros((len(terms), self.general), dtype=np.int32)
+        self._category_matrix[np.arange(len(terms)), self.term_categories] = 1
+
+    def _match_terms(self, keys: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Term index of each word key (-1 if none), preferring the highest priority category"""
+        packed = keys.view(np.uint64)
+        result = np.full(len(keys), -1, dtype=np.int32)
+        best_rank = np.full(len(keys), self.general, dtype=np.int8)
+
+        for stem_length, group_hashes, group_terms in self._term_groups:
+            if stem_length is None:
+                candidate_keys = packed
+                eligible = lengths <= KEY_BYTES
+            else:
+                candidate_keys = packed & _LENGTH_MASKS[stem_length].view(np.uint64)
+                eligible = lengths >= stem_length
+
+            hashes = _hash_keys(candidate_keys)
+            slots = np.minimum(np.searchsorted(group_hashes, hashes), len(group_hashes) - 1)
+            hits = np.flatnonzero(eligible & (group_hashes[slots] == hashes))
+            # Confirm on the full key so a hash collision can never produce a match
+            terms = group_terms[slots[hits]]
+            hits_terms = (candidate_keys[hits] == self._term_keys[terms]).all(axis=1)
+            hits, terms = hits[hits_terms], terms[hits_terms]
+
+            ranks = self.term_categories[terms]
+            better = ranks < best_rank[hits]
+            result[hits[better]] = terms[better]
+            best_rank[hits[better]] = ranks[better]
+        return result
+
+    def _tokenize(self, lines: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Term index of every word plus the line it came from, without per-word Python work"""
+        data = np.frombuffer('\n'.join(lines).lower().encode('utf-8'), dtype=np.uint8)
+        if data.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty.astype(np.int32), empty
+
+        is_word = _WORD_BYTES[data].astype(np.int8)
+        edges = np.diff(is_word, prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts
+        line_index = np.searchsorted(np.flatnonzero(data == ord('\n')), starts)
+
+        # Every word's first KEY_BYTES bytes as a row, with bytes past the word zeroed
+        windows = np.lib.stride_tricks.sliding_window_view(
+            np.concatenate([data, np.zeros(KEY_BYTES, dtype=np.uint8)]), KEY_BYTES)
+        # Cheap pre-filter: only words sharing a two-byte prefix with some term can match
+        pairs = windows[starts, 0].astype(np.int32) << 8 | windows[starts, 1]
+        candidates = np.flatnonzero(self._term_prefixes[pairs] & (lengths >= 2))
+
+        terms = np.full(len(starts), -1, dtype=np.int32)
+        for chunk in range(0, len(candidates), _WORDS_PER_CHUNK):
+            chunk_words = candidates[chunk:chunk + _WORDS_PER_CHUNK]
+            keys = self._word_keys(windows, starts[chunk_words], lengths[chunk_words])
+            terms[chunk_words] = self._match_terms(keys, lengths[chunk_words])
+        return terms, line_index
+
+    @staticmethod
+    def _word_keys(windows: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """First KEY_BYTES bytes of each word, zeroed past the end of the word"""
+        keys = windows[starts]
+        keys &= _LENGTH_MASKS[np.minimum(lengths, KEY_BYTES)]
+        return keys
+
+    def term_matrix(self, lines: Sequence[str]) -> np.ndarray:
+        """
+        Count vocabulary terms per line
+        Args:
+            lines: Chat lines
+        Returns:
+            Array of shape (len(lines), len(self.terms)) with term counts
+        """
+        terms, line_index = self._tokenize(lines)
+        matched = terms >= 0
+        flat = line_index[matched] * len(self.terms) + terms[matched]
+        cells, counts = np.unique(flat, return_counts=True)
+
+        matrix = np.zeros((len(lines), len(self.terms)), dtype=np.uint16)
+        matrix.flat[cells] = np.minimum(counts, np.iinfo(np.uint16).max)
+        return matrix
+
+    def category_counts(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Fold a term matrix into keyword hits per category
+        Args:
+            matrix: Output of term_matrix
+        Returns:
+            Array of shape (lines, categories excluding 'general')
+        """
+        return matrix.astype(np.int32) @ self._category_matrix
+
+    def categorize(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Categorize every line, matching UnifiedChatbot._categorize_message
+        Args:
+            matrix: Output of term_matrix
+        Returns:
+            int8 array of indexes into self.categories
+        """
+        hits = self.category_counts(matrix) > 0
+        first = hits.argmax(axis=1)
+        return np.where(hits.any(axis=1), first, self.general).astype(np.int8)
+
+    def analyze(self, corpus: ChatCorpus) -> Dict[str, Any]:
+        """
+        Category distribution, per-session statistics and daily trend of a corpus
+        Args:
+            corpus: Chat lines from extract_chat_lines
+        Returns:
+            Dictionary with 'categories', 'line_categories', 'distribution',
+            'sessions' and 'trend' entries
+        """
+        matrix = self.term_matrix(corpus.lines)
+        line_categories = self.categorize(matrix)
+        n_categories = len(self.categories)
+
+        distribution = np.bincount(line_categories, minlength=n_categories)
+
+        # Lines per (session, category)
+        session_counts = np.bincount(
+            corpus.session_ids.astype(np.int64) * n_categories + line_categories,
+            minlength=corpus.session_count * n_categories
+        ).reshape(corpus.session_count, n_categories)
+        session_lines = session_counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            session_shares = np.where(session_lines[:, None] > 0,
+                                      session_counts / session_lines[:, None], 0.0)
+
+        # Lines per (day, category), days as proleptic ordinals
+        known = np.array([date is not None for date in corpus.session_dates], dtype=bool)
+        session_days = np.array([date.toordinal() if date else 0 for date in corpus.session_dates],
+                                dtype=np.int64)
+        line_known = known[corpus.session_ids] if len(corpus) else np.zeros(0, dtype=bool)
+        days, day_index = np.unique(session_days[corpus.session_ids][line_known], return_inverse=True)
+        trend = np.bincount(
+            day_index * n_categories + line_categories[line_known],
+            minlength=len(days) * n_categories
+        ).reshape(len(days), n_categories)
+
+        return {
+            'categories': self.categories,
+            'line_categories': line_categories,
+            'distribution': distribution,
+            'sessions': {
+                'users': corpus.session_users,
+                'dates': corpus.session_dates,
+                'line_counts': session_lines,
+                'category_counts': session_counts,
+                'category_shares': session_shares,
+                'dominant': session_counts.argmax(axis=1),
+            },
+            'trend': {
+                'days': [datetime.date.fromordinal(int(day)) for day in days],
+                'category_counts': trend,
+            },
+        }
@@ -1,232 +1,306 @@
+import copy
 import random
-from typing import Dict, List, Optional, Any
-import json
-import datetime
+import re
+from typing import Dict, List, NamedTuple, Optional, Any
 import os
+import threading
+import time
 
-# OpenAI imports - only import if available
 try:
-    import openai
-    OPENAI_AVAILABLE = True
+    from .response_cache import ResponseCache, cache_from_env
+    from .openai_client import OPENAI_AVAILABLE, get_openai_client
+    from .single_flight import SingleFlight, shared_single_flight
+    from .rate_limiter import (RateLimiter, RateLimitExceeded, estimate_request_tokens,
+                               shared_rate_limiter)
+    from .usage_ledger import UsageLedger, ledger_from_env
+    from .llm_backend import (BackendRouter, ChatBackend, Completion, backend_from_env,
+                              openai_backend_from_env)
+    from .response_corpus import (MOOD_RESPONSES, FOLLOWUP_QUESTIONS, CHAT_RESPONSES,
+                                  RECAP_TEMPLATES, RECAP_ELEMENTS, GENERIC_RESPONSES,
+                                  SUPPORT_OFFERS, CRISIS_RESPONSES, GROUNDING_PROMPTS)
+    from .crisis_detector import detect_crisis
+    from .conversation_history import DEFAULT_MAX_TURNS, ConversationHistory
+    from .entry_context import SUMMARY_FIELDS, EntryContextBuilder
+    from .hierarchical_recap import HierarchicalRecap, get_recap_pipeline
+    from .entry_index import EntryIndex
 except ImportError:
-    OPENAI_AVAILABLE = False
+    from response_cache import ResponseCache, cache_from_env
+    from openai_client import OPENAI_AVAILABLE, get_openai_client
+    from single_flight import SingleFlight, shared_single_flight
+    from rate_limiter import (RateLimiter, RateLimitExceeded, estimate_request_tokens,
+                              shared_rate_limiter)
+    from usage_ledger import UsageLedger, ledger_from_env
+    from llm_backend import (BackendRouter, ChatBackend, Completion, backend_from_env,
+                             openai_backend_from_env)
+    from response_corpus import (MOOD_RESPONSES, FOLLOWUP_QUESTIONS, CHAT_RESPONSES,
+                                 RECAP_TEMPLATES, RECAP_ELEMENTS, GENERIC_RESPONSES,
+                                 SUPPORT_OFFERS, CRISIS_RESPONSES, GROUNDING_PROMPTS)
+    from crisis_detector import detect_crisis
+    from conversation_history import DEFAULT_MAX_TURNS, ConversationHistory
+    from entry_context import SUMMARY_FIELDS, EntryContextBuilder
+    from hierarchical_recap import HierarchicalRecap, get_recap_pipeline
+    from entry_index import EntryIndex
+
+# OpenAI client is shared and created lazily - see openai_client.py
+if not OPENAI_AVAILABLE:
     print("Warning: OpenAI package not installed. AI features will be disabled.")
 
+# Keyword vocabularies for rule-based chat, in category priority order.
+# A trailing '*' matches any word starting with the stem (e.g. 'feel*' -> feels, feeling).
+CATEGORY_KEYWORDS = (
+    ('greeting', ('hi', 'hello', 'hey', 'greetings')),
+    ('feeling', ('feel*', 'emotion*', 'mood*', 'sad', 'happy', 'angry', 'anxious',
+                 'stressed', 'overwhelmed', 'excited', 'nervous')),
+    ('journal', ('journal*', 'entry', 'entries', 'wrote', 'writ*', 'reflect*')),
+    ('support', ('help*', 'support*', 'need*', 'struggl*', 'hard', 'difficult*', 'tough')),
+    ('reflection', ('think*', 'thought*', 'realiz*', 'understand*', 'learn*', 'know*')),
+)
+
+class _KeywordMatcher:
+    """
+    Precompiled whole-word keyword table for single-pass message categorization
+    The message is tokenized once; each token resolves to its best category rank
+    through exact and stem lookups, memoized per distinct token
+    """
+    
+    _WORD_PATTERN = re.compile(r"[a-z0-9']+")
+    _TOKEN_CACHE_LIMIT = 20000
+    
+    def __init__(self, vocabularies):
+        self.categories = tuple(category for category, _ in vocabularies)
+        self.no_match = len(self.categories)
+        self._exact = {}
+        self._stems = {}
+        for rank, (_, keywords) in enumerate(vocabularies):
+            for word in keywords:
+                if word.endswith('*'):
+                    self._stems.setdefault(word[:-1], rank)
+                else:
+                    self._exact.setdefault(word, rank)
+        self._stem_lengths = tuple(sorted({len(stem) for stem in self._stems}))
+        self._token_ranks = {}
+    
+    def _rank_token(self, token: str) -> int:
+        """Best (lowest) category rank of a single token"""
+        rank = self._exact.get(token, self.no_match)
+        for length in self._stem_lengths:
+            if length > len(token):
+                break
+            stem_rank = self._stems.get(token[:length])
+            if stem_rank is not None and stem_rank < rank:
+                rank = stem_rank
+        return rank
+    
+    def categorize(self, message: str) -> str:
+        """Return the highest priority category with a whole-word match, or 'general'"""
+        token_ranks = self._token_ranks
+        best = self.no_match
+        for token in self._WORD_PATTERN.findall(message.lower()):
+            rank = token_ranks.get(token)
+            if rank is None:
+                if len(token_ranks) >= self._TOKEN_CACHE_LIMIT:
+                    token_ranks.clear()
+                rank = token_ranks[token] = self._rank_token(token)
+            if rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self.categories[best] if best < self.no_match else 'general'
+
+def as_history(history) -> ConversationHistory:
+    """
+    Coerce a conversation history argument to a ConversationHistory
+    Args:
+        history: ConversationHistory (used as is), list of transcript lines, or None
+    Returns:
+        ConversationHistory holding at most DEFAULT_MAX_TURNS recent turns
+    """
+    if isinstance(history, ConversationHistory):
+        return history
+    if not history:
+        return ConversationHistory()
+    return ConversationHistory.from_lines(history[-DEFAULT_MAX_TURNS:])
+
+class RecapResult(NamedTuple):
+    """A weekly recap and where it came from"""
+    text: str
+    source: str                   # 'ai', 'rules', or 'fallback' when the AI recap failed
+    error: Optional[str] = None   # Why the AI recap failed
+
+class ChatSession:
+    """
+    Per-user mutable chat state: conversation history, context, random source
+    and the optional retrieval index over the user's journal
+    Kept to a few slots so many concurrent sessions stay cheap; the response
+    corpus itself is shared through response_corpus.py
+    """
+    
+    __slots__ = ('conversation_history', 'user_context', 'rng', 'entry_index')
+    
+    def __init__(self, conversation_history: Optional[ConversationHistory] = None,
+                 user_context: Optional[Dict] = None, seed: Optional[int] = None,
+                 entry_index: Optional[EntryIndex] = None):
+        self.conversation_history = as_history(conversation_history)
+        self.user_context = user_context if user_context is not None else {}
+        # Unseeded sessions share the module generator instead of carrying their own state
+        self.rng = random.Random(seed) if seed is not None else random
+        # Rebuilt from the journal rather than kept in session snapshots
+        self.entry_index = entry_index
+
 class UnifiedChatbot:
     """A chatbot for journal companion with empathetic responses and chat mode support"""
     
-    def __init__(self, ai_enabled: bool = False):
-        self.ai_enabled = ai_enabled and OPENAI_AVAILABLE
-        self.conversation_history = []
-        self.user_context = {}
-        
-        # Initialize OpenAI client if enabled
-        self.openai_client = None
-        if self.ai_enabled:
-            api_key = os.getenv('OPENAI_API_KEY')
-            if api_key:
-                try:
-                    self.openai_client = openai.OpenAI(api_key=api_key)
-                    print("OpenAI client initialized successfully")
-                except Exception as e:
-                    print(f"Failed to initialize OpenAI client: {e}")
-                    self.ai_enabled = False
-            else:
-                print("OPENAI_API_KEY not found. AI features disabled.")
-                self.ai_enabled = False
-        
-        # Empathetic responses based on mood levels (1-5)
-        self.mood_responses = {
-            1: {  # Very low mood
-                'empathetic': [
-                    "I hear you're having a really tough time. That sounds incredibly hard.",
-                    "I'm so sorry you're feeling this way. Thank you for sharing with me.",
-                    "It takes courage to acknowledge when things are this difficult. I'm here with you.",
-                    "This sounds really heavy to carry. Would you like to talk more about what's coming up?"
-                ],
-                'supportive': [
-                    "Would it help to take a few deep breaths together?",
-                    "Sometimes just naming the feeling can help a little. Would you like to try?",
-                    "I want you to know that your feelings are valid, no matter how dark they seem.",
-                    "You don't have to go through this alone. Would you like some grounding techniques?"
-                ]
-            },
-            2: {  # Low mood
-                'empathetic': [
-                    "I can sense you're going through a challenging time. That sounds really difficult.",
-                    "Thank you for being honest about how you're feeling. That's not easy to do.",
-                    "It sounds like things feel heavy right now. Would you like to unpack that a bit?",
-                    "I'm here to listen, without judgment, whenever you're ready to share more."
-                ],
-                'supportive': [
-                    "Would it help to focus on one small, kind thing you can do for yourself right now?",
-                    "Sometimes writing down what's bothering us can make it feel more manageable.",
-                    "Remember that feelings come in waves - this one will pass too.",
-                    "Would you like me to suggest some gentle self-care ideas?"
-                ]
-            },
-            3: {  # Neutral mood
-                'empathetic': [
-                    "Thanks for checking in with yourself. Being aware is the first step.",
-                    "It's okay to feel neutral sometimes - not every day has to be high or low.",
-                    "How interesting that you're noticing this middle ground. What's that like for you?",
-                    "Sometimes neutrality can be a sign of balance. What do you think?"
-                ],
-                'supportive': [
-                    "This might be a good time to check in with what you need right now.",
-                    "Would you like to explore what might bring a little more lightness to your day?",
-                    "Sometimes neutral moments are opportunities for gentle reflection.",
-                    "Is there something small that might bring you a bit of comfort or joy?"
-                ]
-            },
-            4: {  # Good mood
-                'empathetic': [
-                    "It's wonderful to hear you're feeling good! That's something to acknowledge.",
-                    "I'm genuinely happy to hear you're in a positive space today!",
-                    "This sounds lovely! Would you like to savor this feeling a bit more?",
-                    "It's great that you're recognizing and enjoying this positive moment!"
-                ],
-                'supportive': [
-                    "Would you like to explore what's contributing to this good feeling?",
-                    "This might be a perfect time for some positive journaling or gratitude practice.",
-                    "How can you nurture this good feeling?",
-                    "Would you like to set a small intention to carry this feeling forward?"
-                ]
-            },
-            5: {  # Very good mood
-                'empathetic': [
-                    "WOW! That's amazing to hear! I'm smiling just knowing you're feeling so good!",
-                    "This is wonderful! Thank you for sharing this positive energy!",
-                    "I'm genuinely thrilled to hear you're feeling fantastic!",
-                    "What fantastic news! Would you like to celebrate this feeling with me?"
-                ],
-                'supportive': [
-                    "This is a perfect moment to practice gratitude for this feeling.",
-                    "Would you like to capture this moment in your journal to remember later?",
-                    "How can you share this positive energy with yourself or others?",
-                    "This great feeling is something to acknowledge and honor. Well done!"
-                ]
-            }
-        }
-        
-        # Follow-up questions for each mood level
-        self.followup_questions = {
-            1: [
-                "What does this heavy feeling feel like in your body?",
-                "Is there one small thing that might feel slightly less heavy today?",
-                "What would feel supportive right now, even if it's very small?",
-                "Can you remember a time when you felt slightly better, even briefly?"
-            ],
-            2: [
-                "What's one thing that might help shift this feeling, even a tiny bit?",
-                "Is there a person or memory that usually brings you comfort?",
-                "What does your body need right now - rest, movement, nourishment?",
-                "What would you tell a friend who was feeling this way?"
-            ],
-            3: [
-                "What might help you move toward feeling a bit more positive?",
-                "Is there something you've been curious about trying?",
-                "What small pleasure could you add to your day?",
-                "How do you feel about this neutral space?"
-            ],
-            4: [
-                "What's contributing to this good feeling?",
-                "How can you savor or extend this positive moment?",
-                "What would you like to do with this good energy?",
-                "Is there someone you'd like to share this feeling with?"
-            ],
-            5: [
-                "What's making today so wonderful?",
-                "How can you capture this feeling to remember on harder days?",
-                "Is there a way to pay this positive feeling forward?",
-                "What does this fantastic feeling make you want to do?"
-            ]
-        }
-        
-        # Chat mode responses for different conversation types
-        self.chat_responses = {
-            'greeting': [
-                "Hi there! I'm here to listen. How's your day going?",
-                "Hello! I'm glad you're here. What's on your mind today?",
-                "Hi! I'm ready to chat whenever you are. How are things?",
-                "Hello! I'm here to talk about anything you'd like. What's up?"
-            ],
-            'feeling': [
-                "I hear you. Tell me more about what that feels like for you.",
-                "That sounds significant. Would you like to explore that feeling further?",
-                "Thank you for sharing that. How long have you been feeling this way?",
-                "I understand. What's been coming up for you with this feeling?"
-            ],
-            'journal': [
-                "Your journal is a safe space for all your thoughts and feelings.",
-                "It's great that you're reflecting on your journal. What stands out to you?",
-                "Journaling can be such a powerful tool. What brings you to it today?",
-                "Your reflections matter. Would you like to explore any particular entry?"
-            ],
-            'support': [
-                "I'm here to support you. What do you need right now?",
-                "You're not alone in this. I'm listening.",
-                "Whatever you're going through, your feelings are valid.",
-                "Take your time. I'm right here with you."
-            ],
-            'reflection': [
-                "That's an interesting perspective. What makes you think that?",
-                "I appreciate you sharing that reflection. How did you come to that insight?",
-                "That's a powerful observation. How does that feel to acknowledge?",
-                "Thank you for that reflection. What's next for you with this realization?"
-            ]
-        }
-        
-        # Weekly recap templates
-        self.recap_templates = [
-            "Looking back at your journal entries, I notice {observation}. This week, you showed {quality}. Remember: {encouragement}",
-            "Your reflections this week revealed {theme}. You demonstrated {strength} in how you approached things. A reminder: {insight}",
-            "Based on your entries, you've been exploring {topic}. Your journey shows {growth}. Keep in mind: {advice}",
-            "This week's journaling highlights {focus}. I see {progress} in your reflections. Consider this: {suggestion}"
-        ]
-        
-        # Observations, qualities, and encouragement phrases
-        self.recap_elements = {
-            'observations': [
-                "a mix of different emotions and experiences",
-                "some meaningful reflections",
-                "progress in your self-awareness",
-                "moments of insight and growth"
-            ],
-            'qualities': [
-                "courage in being honest with yourself",
-                "resilience in facing challenges",
-                "thoughtfulness in your reflections",
-                "self-compassion in your journey"
-            ],
-            'encouragements': [
-                "every entry is a step forward, no matter how small",
-                "your willingness to reflect is itself a form of growth",
-                "there's no right or wrong way to feel - only your authentic experience",
-                "each day brings new opportunities for understanding"
-            ],
-            'themes': [
-                "self-discovery and personal growth",
-                "emotional awareness and processing",
-                "daily experiences and their meanings",
-                "personal challenges and triumphs"
-            ],
-            'strengths': [
-                "honesty and vulnerability",
-                "persistence and dedication",
-                "insight and self-awareness",
-                "courage and openness"
-            ],
-            'insights': [
-                "growth often happens in small, daily moments",
-                "your feelings are valuable messengers",
-                "reflection is a powerful tool for understanding",
-                "every emotion has something to teach us"
-            ]
-        }
+    # Built once at class load and shared by every instance
+    _KEYWORD_MATCHER = _KeywordMatcher(CATEGORY_KEYWORDS)
+    
+    # Recap context builder; its digest cache is shared by every instance
+    context_builder = EntryContextBuilder.from_env()
+    
+    # Read-only response corpus, shared by every instance
+    mood_responses = MOOD_RESPONSES
+    followup_questions = FOLLOWUP_QUESTIONS
+    chat_responses = CHAT_RESPONSES
+    recap_templates = RECAP_TEMPLATES
+    recap_elements = RECAP_ELEMENTS
+    
+    def __init__(self, ai_enabled: bool = False, response_cache: Optional[ResponseCache] = None,
+                 use_cache: bool = True, single_flight: Optional[SingleFlight] = None,
+                 coalesce: bool = True, session: Optional[ChatSession] = None,
+                 rate_limiter: Optional[RateLimiter] = None, rate_limit: bool = True,
+                 usage_ledger: Optional[UsageLedger] = None,
+                 backend: Optional[ChatBackend] = None):
+        # A configured backend (local server, stub, router) does not need the openai package
+        self.backend = backend
+        self.ai_enabled = ai_enabled and (backend is not None or OPENAI_AVAILABLE)
+        # Per-user state lives in the session; conversation_history/user_context delegate to it
+        self.session = session if session is not None else ChatSession()
+        
+        # Response cache for identical prompts (opt out with use_cache=False)
+        self.use_cache = use_cache
+        self.response_cache = response_cache if response_cache is not None else (
+            cache_from_env() if use_cache else None)
+        
+        # Identical in-flight requests share one API call (process-wide by default)
+        self.single_flight = None
+        if coalesce:
+            self.single_flight = single_flight if single_flight is not None else shared_single_flight
+        
+        # API calls are admitted by RPM/TPM budgets and an in-flight cap (process-wide by default)
+        self.rate_limiter = None
+        if rate_limit:
+            self.rate_limiter = rate_limiter if rate_limiter is not None else shared_rate_limiter
+        
+        # Every model call is appended here when set (get_chatbot() uses JOURNAL_USAGE_LEDGER, opt-in)
+        self.usage_ledger = usage_ledger
+        
+        # OpenAI client is fetched from the shared factory on each AI use; this is
+        # only set to override it on one instance
+        self._openai_client = None
+        # Backend over that client, built on first use when no backend is configured
+        self._openai_backend = None
+        # Map-reduce recap pipeline; only set to override the shared one on one instance
+        self._recap_pipeline = None
+        
+        # Network latency measurements (seconds), e.g. to compare with and without prewarm
+        self.latency_stats = {'prewarm': None, 'first_call': None, 'last_call': None}
+        if self.ai_enabled and backend is None and not os.getenv('OPENAI_API_KEY'):
+            print("OPENAI_API_KEY not found. AI features disabled.")
+            self.ai_enabled = False
         
         print(f"Chatbot initialized: {'AI Mode Enabled' if ai_enabled else 'Rule-based Mode'}")
 
+    @property
+    def openai_client(self):
+        """
+        OpenAI client for this instance
+        Not kept on the instance, so a client rebuilt by configure_client() or
+        reset_client() is picked up on the next call
+        Returns:
+            The client set on this instance, else the shared client (created
+            lazily), or None if AI is unavailable
+        """
+        if self._openai_client is not None:
+            return self._openai_client
+        if not self.ai_enabled:
+            return None
+        client = get_openai_client()
+        if client is None:
+            self.ai_enabled = False
+        return client
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+    
+    @property
+    def llm_backend(self) -> ChatBackend:
+        """Backend model calls go to (the shared OpenAI client unless one was configured)"""
+        if self.backend is not None:
+            return self.backend
+        if self._openai_backend is None:
+            self._openai_backend = openai_backend_from_env(lambda: self.openai_client)
+        return self._openai_backend
+    
+    @property
+    def recap_pipeline(self) -> HierarchicalRecap:
+        """
+        Map-reduce pipeline for recaps of long journals
+        Returns:
+            The pipeline set on this instance, else the one shared by every
+            instance (one worker pool and summary cache, built on first use)
+        """
+        if self._recap_pipeline is not None:
+            return self._recap_pipeline
+        return get_recap_pipeline()
+    
+    @recap_pipeline.setter
+    def recap_pipeline(self, pipeline):
+        self._recap_pipeline = pipeline
+    
+    def _ai_available(self) -> bool:
+        """Whether AI calls can be attempted"""
+        return self.ai_enabled and (self.backend is not None or bool(self.openai_client))
+    
+    @property
+    def conversation_history(self) -> ConversationHistory:
+        """Conversation history of the current session"""
+        return self.session.conversation_history
+    
+    @conversation_history.setter
+    def conversation_history(self, history):
+        # Transcript lists are converted, keeping only the most recent turns
+        self.session.conversation_history = as_history(history)
+    
+    @property
+    def user_context(self) -> Dict:
+        """User context of the current session"""
+        return self.session.user_context
+    
+    @user_context.setter
+    def user_context(self, context: Dict):
+        self.session.user_context = context
+    
+    @property
+    def entry_index(self) -> Optional[EntryIndex]:
+        """Retrieval index over the current user's journal entries, if loaded"""
+        return self.session.entry_index
+    
+    @entry_index.setter
+    def entry_index(self, index: Optional[EntryIndex]):
+        self.session.entry_index = index
+    
+    def for_session(self, session: ChatSession) -> 'UnifiedChatbot':
+        """
+        Get a chatbot bound to another user's session
+        Args:
+            session: The user's ChatSession
+        Returns:
+            Shallow copy sharing this chatbot's settings, cache and client
+        """
+        bound = copy.copy(self)
+        bound.session = session
+        return bound
+
     def get_empathetic_response(self, mood_level: int, mood_description: str = "") -> str:
         """
         Get an empathetic response based on mood level
@@ -244,18 +318,14 @@ class UnifiedChatbot:
         supportive_list = self.mood_responses[mood_level]['supportive']
         
         # Combine or choose randomly
-        if random.random() > 0.3:  # 70% chance of empathetic, 30% of supportive
-            response = random.choice(empathetic_list)
+        rng = self.session.rng
+        if rng.random() > 0.3:  # 70% chance of empathetic, 30% of supportive
+            response = rng.choice(empathetic_list)
         else:
-            response = random.choice(supportive_list)
+            response = rng.choice(supportive_list)
         
         # Add to conversation history
-        self.conversation_history.append({
-            'type': 'mood_response',
-            'mood_level': mood_level,
-            'response': response,
-            'timestamp': datetime.datetime.now().isoformat()
-        })
+        self.conversation_history.add_assistant(response, mood_level)
         
         return response
     
@@ -267,15 +337,7 @@ class UnifiedChatbot:
         Returns:
             Support offer string
         """
-        offers = {
-            1: "Would you like some gentle guidance through this difficult moment?",
-            2: "Would you like to explore some coping strategies together?",
-            3: "Would you like to reflect a bit more on what you need right now?",
-            4: "Would you like to build on this positive feeling?",
-            5: "Would you like to celebrate and explore this fantastic feeling?"
-        }
-        
-        return offers.get(mood_level, "Would you like to explore this further?")
+        return SUPPORT_OFFERS.get(mood_level, "Would you like to explore this further?")
     
     def get_followup_questions(self, mood_level: int, count: int = 3) -> List[str]:
         """
@@ -289,53 +351,77 @@ class UnifiedChatbot:
         mood_level = max(1, min(5, mood_level))
         questions = self.followup_questions[mood_level]
         
-        # Return random selection of questions
+        # Return random selection of questions (a fresh list; the corpus is read-only)
         if len(questions) <= count:
-            return questions
+            return list(questions)
         else:
-            return random.sample(questions, count)
+            return self.session.rng.sample(questions, count)
     
     def get_chat_response(self, user_message: str, conversation_history: Optional[List[str]] = None, 
                          mood_context: Optional[Dict] = None) -> str:
         """
         Get a conversational response for chat mode
-        Uses OpenAI API first, falls back to rule-based responses
+        Crisis signals get an immediate local reply; otherwise uses OpenAI API
+        first, falls back to rule-based responses (everyday distress wording
+        gets a grounding line in front of the reply)
         Args:
             user_message: The user's message
-            conversation_history: List of previous messages
+            conversation_history: Previous messages ("You: ..."/"Companion: ..." lines
+                                  or a ConversationHistory)
             mood_context: Current mood context    
         Returns:
             Chat response string
         """
-        # Update conversation history
+        # Update conversation history (bounded, only the most recent turns are kept)
         if conversation_history:
-            self.conversation_history = conversation_history[-10:]  # Keep last 10 messages
+            self.conversation_history = conversation_history
         
         # Add mood context if available
         if mood_context:
             self.user_context['current_mood'] = mood_context
         
+        # Crisis signals are answered locally with grounding and resources, never
+        # waiting on a model call that may be slow or down
+        signal = detect_crisis(user_message)
+        if signal is not None and signal.category in CRISIS_RESPONSES:
+            response = CRISIS_RESPONSES[signal.category]
+            self._record_exchange(user_message, response, mood_context)
+            return response
+        
+        response = None
         # Try OpenAI API first if enabled
-        if self.ai_enabled and self.openai_client:
+        if self._ai_available():
             try:
                 response = self._get_ai_chat_response(user_message, mood_context)
-                # Track in history
-                self.conversation_history.append(f"User: {user_message}")
-                self.conversation_history.append(f"Companion: {response}")
-                return response
             except Exception as e:
                 print(f"OpenAI API error, falling back to rule-based: {e}")
                 # Fall through to rule-based response
         
         # Fallback: Rule-based responses
-        response = self._get_rule_based_chat_response(user_message, mood_context)
+        if response is None:
+            response = self._get_rule_based_chat_response(user_message, mood_context)
+        
+        # Everyday distress keeps the normal reply, with a grounding line first
+        if signal is not None:
+            response = f"{GROUNDING_PROMPTS[signal.category]} {response}"
         
         # Track in history
-        self.conversation_history.append(f"User: {user_message}")
-        self.conversation_history.append(f"Companion: {response}")
+        self._record_exchange(user_message, response, mood_context)
         
         return response
     
+    def _ends_with_user_message(self, user_message: str) -> bool:
+        """True if the history already ends with this user message (app.py adds it first)"""
+        last = self.conversation_history.last()
+        return last is not None and last.role == 'user' and last.text == user_message
+    
+    def _record_exchange(self, user_message: str, response: str, mood_context: Optional[Dict] = None):
+        """Add a user message and the companion's reply to the history"""
+        mood_level = mood_context.get('level') if mood_context else None
+        if not self._ends_with_user_message(user_message):
+            self.conversation_history.add_user(user_message, mood_level)
+        self.conversation_history.add_assistant(response, mood_level)
+    
     def _get_ai_chat_response(self, user_message: str, mood_context: Optional[Dict] = None) -> str:
         """
         Get AI-powered chat response using OpenAI
@@ -365,25 +451,199 @@ Never give medical, legal, or diagnostic instructions."""
                 "content": f"The user's current mood is: {mood_desc}"
             })
         
-        # Add recent conversation history for context
-        for msg in self.conversation_history[-6:]:  # Last 6 messages
-            if msg.startswith("User: "):
-                messages.append({"role": "user", "content": msg[6:]})
-            elif msg.startswith("Companion: "):
-                messages.append({"role": "assistant", "content": msg[11:]})
+        # Add the mood trend from past check-ins (see mood_series.py)
+        mood_trend = self.user_context.get('mood_trend')
+        if mood_trend:
+            messages.append({
+                "role": "system",
+                "content": f"The user's recent mood trend: {mood_trend}"
+            })
+        
+        # Add the most relevant past journal entries, retrieved locally
+        snippets = self._relevant_entries(user_message)
+        if snippets:
+            messages.append({
+                "role": "system",
+                "content": "Relevant past journal entries:\n" + "\n".join(snippets)
+            })
+        
+        # Add recent conversation history for context (last 6 messages plus the current one)
+        pending = self._ends_with_user_message(user_message)
+        messages.extend(self.conversation_history.to_openai_messages(limit=7 if pending else 6))
         
         # Add current user message
-        messages.append({"role": "user", "content": user_message})
+        if not pending:
+            messages.append({"role": "user", "content": user_message})
         
         # Make OpenAI API call
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=150  # Keep responses concise
-        )
+        return self._create_completion(messages, max_tokens=150, call_type='chat')  # Keep responses concise
+    
+    def _relevant_entries(self, user_message: str, count: int = 3) -> List[str]:
+        """
+        Find journal entries related to a chat message
+        Args:
+            user_message: The user's message
+            count: Maximum number of entries
+        Returns:
+            Entry snippets, most relevant first (empty without an index)
+        """
+        index = self.entry_index
+        if index is None or len(index) == 0:
+            return []
+        return [f"- {hit.snippet}" for hit in index.search(user_message, k=count)]
+    
+    def _create_completion(self, messages: List[Dict[str, str]], max_tokens: int,
+                           temperature: float = 0.7, model: Optional[str] = None,
+                           use_cache: Optional[bool] = None, call_type: str = 'other') -> str:
+        """
+        Run a chat completion, serving identical requests from the response cache
+        Args:
+            messages: OpenAI style message list
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+            model: Model name (defaults to the backend's model for the call type)
+            use_cache: Per-call override of the instance cache setting
+            call_type: Purpose of the call; picks the model and is recorded in the usage ledger
+        Returns:
+            Stripped response text
+        Raises:
+            RateLimitExceeded: If the call is not admitted before the limiter deadline
+        """
+        if use_cache is None:
+            use_cache = self.use_cache
+        cache = self.response_cache if use_cache else None
+        backend = self.llm_backend
+        
+        key_model = model or backend.model_for(call_type)
+        key = ResponseCache.make_key(messages, key_model, temperature, max_tokens)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self._log_usage(call_type, key_model, outcome='cached')
+                return cached
+        
+        def send() -> Completion:
+            started = time.perf_counter()
+            try:
+                completion = backend.complete(messages, call_type=call_type, model=model,
+                                              temperature=temperature, max_tokens=max_tokens)
+            except Exception:
+                self._log_usage(call_type, key_model, latency=time.perf_counter() - started,
+                                outcome='error')
+                raise
+            latency = time.perf_counter() - started
+            self._record_latency(latency)
+            self._log_usage(call_type, completion.model, completion, latency)
+            return completion
+        
+        def call_api() -> str:
+            if self.rate_limiter is None:
+                completion = send()
+            else:
+                try:
+                    permit = self.rate_limiter.acquire(estimate_request_tokens(messages, max_tokens))
+                except RateLimitExceeded:
+                    self._log_usage(call_type, key_model, outcome='rate_limited')
+                    raise
+                with permit:
+                    completion = send()
+                    if completion.total_tokens:
+                        permit.settle(completion.total_tokens)
+            text = completion.text.strip()
+            
+            if cache is not None:
+                cache.set(key, text)
+            return text
+        
+        # Identical requests already in flight share one API call
+        if self.single_flight is not None:
+            return self.single_flight.do(key, call_api)
+        return call_api()
+    
+    def _log_usage(self, call_type: str, model: str, completion: Optional[Completion] = None,
+                   latency: float = 0.0, outcome: str = 'ok'):
+        """Append a model call to the usage ledger, if one is configured"""
+        ledger = self.usage_ledger
+        if ledger is None:
+            return
+        user = self.user_context.get('user_id')
+        try:
+            if completion is not None:
+                ledger.record_response(call_type, model, completion, latency, user, outcome)
+            else:
+                ledger.record(call_type, model, latency=latency, outcome=outcome, user=user)
+        except OSError as e:
+            # Accounting must never break a reply
+            print(f"Warning: could not write usage ledger: {e}")
+    
+    def backend_stats(self) -> Dict[str, Any]:
+        """
+        Get per-backend latency and error figures
+        Returns:
+            Stats dictionary (empty unless calls are routed across several backends)
+        """
+        return self.backend.stats() if isinstance(self.backend, BackendRouter) else {}
+    
+    def _record_latency(self, seconds: float):
+        """Record the latency of a completed API call"""
+        if self.latency_stats['first_call'] is None:
+            self.latency_stats['first_call'] = seconds
+        self.latency_stats['last_call'] = seconds
+    
+    def prewarm(self, send_request: bool = False) -> bool:
+        """
+        Open the pooled connection ahead of the first AI call
+        Pays for DNS, TLS and the handshake in the background so the first reply is faster
+        Args:
+            send_request: Also send a minimal one-token completion
+        Returns:
+            True if the connection was warmed, False otherwise
+        """
+        # Only the shared OpenAI client keeps a connection pool worth warming
+        if not self.ai_enabled or self.backend is not None:
+            return False
         
-        return response.choices[0].message.content.strip()
+        started = time.perf_counter()
+        try:
+            client = self.openai_client
+            if client is None:
+                return False
+            if send_request:
+                # Same backend and chat model as the first real call
+                self.llm_backend.complete([{"role": "user", "content": "Hi"}],
+                                          call_type='chat', max_tokens=1)
+            else:
+                client.models.list()
+        except Exception:
+            # Prewarm is best effort - the real call will report any error
+            return False
+        
+        self.latency_stats['prewarm'] = time.perf_counter() - started
+        return True
+    
+    def coalescing_stats(self) -> Dict[str, int]:
+        """
+        Get counters for deduplicated in-flight requests
+        Returns:
+            Stats dictionary (empty when coalescing is disabled)
+        """
+        return self.single_flight.stats() if self.single_flight is not None else {}
+    
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth, admission counts and wait times of the rate limiter
+        Returns:
+            Stats dictionary (empty when rate limiting is disabled)
+        """
+        return self.rate_limiter.stats() if self.rate_limiter is not None else {}
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache hit/miss metrics
+        Returns:
+            Stats dictionary (empty when caching is disabled)
+        """
+        return self.response_cache.stats() if self.response_cache is not None else {}
     
     def _get_rule_based_chat_response(self, user_message: str, mood_context: Optional[Dict] = None) -> str:
         """
@@ -400,16 +660,8 @@ Never give medical, legal, or diagnostic instructions."""
         message_type = self._categorize_message(msg_lower)
         
         # Get appropriate response
-        if message_type == 'greeting':
-            response = random.choice(self.chat_responses['greeting'])
-        elif message_type == 'feeling':
-            response = random.choice(self.chat_responses['feeling'])
-        elif message_type == 'journal':
-            response = random.choice(self.chat_responses['journal'])
-        elif message_type == 'support':
-            response = random.choice(self.chat_responses['support'])
-        elif message_type == 'reflection':
-            response = random.choice(self.chat_responses['reflection'])
+        if message_type in self.chat_responses:
+            response = self.session.rng.choice(self.chat_responses[message_type])
         else:
             # Generic empathetic response
             response = self._get_generic_chat_response(msg_lower)
@@ -423,52 +675,35 @@ Never give medical, legal, or diagnostic instructions."""
         return response
     
     def _categorize_message(self, message: str) -> str:
-        """Categorize the type of message for appropriate response"""
-        message = message.lower()
-        
-        # Check for greetings
-        greetings = ['hi', 'hello', 'hey', 'greetings']
-        if any(greet in message for greet in greetings):
-            return 'greeting'
-        
-        # Check for feelings
-        feeling_words = ['feel', 'feeling', 'emotion', 'mood', 'sad', 'happy', 'angry', 
-                        'anxious', 'stressed', 'overwhelmed', 'excited', 'nervous']
-        if any(word in message for word in feeling_words):
-            return 'feeling'
-        
-        # Check for journal references
-        journal_words = ['journal', 'entry', 'entries', 'wrote', 'writ', 'reflect']
-        if any(word in message for word in journal_words):
-            return 'journal'
-        
-        # Check for support requests
-        support_words = ['help', 'support', 'need', 'struggle', 'hard', 'difficult', 'tough']
-        if any(word in message for word in support_words):
-            return 'support'
-        
-        # Check for reflections
-        reflection_words = ['think', 'thought', 'realize', 'understand', 'learn', 'know']
-        if any(word in message for word in reflection_words):
-            return 'reflection'
-        
-        return 'general'
+        """
+        Categorize the type of message for appropriate response
+        Matches whole words in a single pass; when several categories match,
+        the earliest in CATEGORY_KEYWORDS wins
+        Args:
+            message: The user's message
+        Returns:
+            Category name, or 'general' if no keyword matched
+        """
+        return self._KEYWORD_MATCHER.categorize(message)
+    
+    def categorize_many(self, messages: List[str]) -> List[str]:
+        """
+        Categorize a batch of messages
+        Args:
+            messages: Iterable of user messages
+        Returns:
+            List of category names in the same order
+        """
+        categorize = self._KEYWORD_MATCHER.categorize
+        return [categorize(message) for message in messages]
     
     def _get_generic_chat_response(self, message: str) -> str:
         """Get a generic response for uncategorized messages"""
-        generic_responses = [
-            "I hear you. Tell me more about that.",
-            "Thank you for sharing that. What comes up for you as you say that?",
-            "I'm listening. Would you like to explore that further?",
-            "That's interesting. What makes you bring that up?",
-            "I appreciate you sharing that. How does that feel to talk about?"
-        ]
-        
         # Check if it's a question
         if '?' in message:
             return "That's a thoughtful question. What are your thoughts on it?"
         
-        return random.choice(generic_responses)
+        return self.session.rng.choice(GENERIC_RESPONSES)
     
     def generate_weekly_recap(self, entries: List[Dict]) -> str:
         """
@@ -478,45 +713,63 @@ Never give medical, legal, or diagnostic instructions."""
         Returns:
             Weekly recap string
         """
+        return self.compose_weekly_recap(entries).text
+    
+    def compose_weekly_recap(self, entries: List[Dict], quiet: bool = False) -> RecapResult:
+        """
+        Generate a weekly recap and report whether the AI produced it
+        Args:
+            entries: List of journal entry dictionaries
+            quiet: Don't print AI failures (for background callers, which get
+                   them in RecapResult.error)
+        Returns:
+            RecapResult; source 'fallback' means the AI recap failed and can be retried later
+        """
         if not entries:
-            return "It looks like this was a quiet week for journaling. That's okay! Every season has its rhythm. Sometimes, the space between entries is just as meaningful as the writing itself."
+            return RecapResult("It looks like this was a quiet week for journaling. That's okay! Every season has its rhythm. Sometimes, the space between entries is just as meaningful as the writing itself.", 'rules')
         
         # Use OpenAI if enabled, otherwise fall back to rule-based
-        if self.ai_enabled and self.openai_client:
+        source, error = 'rules', None
+        if self._ai_available():
             try:
-                return self._generate_ai_recap(entries)
+                return RecapResult(self._generate_ai_recap(entries), 'ai')
             except Exception as e:
-                print(f"OpenAI API call failed: {e}. Falling back to rule-based recap.")
+                if not quiet:
+                    print(f"OpenAI API call failed: {e}. Falling back to rule-based recap.")
+                source, error = 'fallback', str(e)
                 # Fall through to rule-based method
         
         # Rule-based recap (original implementation)
-        template = random.choice(self.recap_templates)
+        choice = self.session.rng.choice
+        template = choice(self.recap_templates)
         
         recap = template.format(
-            observation=random.choice(self.recap_elements['observations']),
-            quality=random.choice(self.recap_elements['qualities']),
-            encouragement=random.choice(self.recap_elements['encouragements']),
-            theme=random.choice(self.recap_elements['themes']),
-            strength=random.choice(self.recap_elements['strengths']),
-            insight=random.choice(self.recap_elements['insights']),
-            topic=random.choice(self.recap_elements['themes']),
-            growth=random.choice(self.recap_elements['qualities']),
-            advice=random.choice(self.recap_elements['encouragements']),
-            focus=random.choice(self.recap_elements['observations']),
-            progress=random.choice(self.recap_elements['strengths']),
-            suggestion=random.choice(self.recap_elements['insights'])
+            observation=choice(self.recap_elements['observations']),
+            quality=choice(self.recap_elements['qualities']),
+            encouragement=choice(self.recap_elements['encouragements']),
+            theme=choice(self.recap_elements['themes']),
+            strength=choice(self.recap_elements['strengths']),
+            insight=choice(self.recap_elements['insights']),
+            topic=choice(self.recap_elements['themes']),
+            growth=choice(self.recap_elements['qualities']),
+            advice=choice(self.recap_elements['encouragements']),
+            focus=choice(self.recap_elements['observations']),
+            progress=choice(self.recap_elements['strengths']),
+            suggestion=choice(self.recap_elements['insights'])
         )
         
         if entries and 'entry_count' in entries[0]:
             entry_count = entries[0]['entry_count']
             if entry_count > 0:
                 recap += f"\n\nYou completed {entry_count} journal entries this week. That's a meaningful commitment to your self-reflection practice!"
+            if entries[0].get('mood_reflection'):
+                recap += f"\n\n{entries[0]['mood_reflection']}"
         
-        return recap
+        return RecapResult(recap, source, error)
     
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.conversation_history.clear()
         print("Conversation history cleared.")
 
     def _generate_ai_recap(self, entries: List[Dict]) -> str:
@@ -527,8 +780,13 @@ Never give medical, legal, or diagnostic instructions."""
         Returns:
             AI-generated recap string
         """
-        # Build context from entries
-        entry_summary = self._build_entry_context(entries)
+        # Build context from entries - journals too long for one prompt are summarized per week first
+        if self.recap_pipeline.should_summarize(entries, self.context_builder.fits):
+            entry_summary = self._build_period_context(entries)
+            scope = "the user's journal, summarized by period with the most recent last,"
+        else:
+            entry_summary = self._build_entry_context(entries)
+            scope = "this week's journal entries"
         
         # System prompt as specified
         system_prompt = """You are a supportive, emotionally intelligent journal companion. Your tone is warm, concise, and non-judgmental.
@@ -536,7 +794,7 @@ Use reflective questions, motivational nudges, and strengths-based language.
 If the user expresses distress or crisis signals (self-harm, harm to others, panic, hopelessness), respond with grounding techniques and advise seeking real-world support. Never give medical, legal, or diagnostic instructions."""
         
         # User prompt with entry context
-        user_prompt = f"""Please review this week's journal entries and provide a thoughtful, supportive recap:
+        user_prompt = f"""Please review {scope} and provide a thoughtful, supportive recap:
 
 {entry_summary}
 
@@ -550,18 +808,15 @@ Focus on their resilience and any insights they've shared."""
 
         # Make OpenAI API call
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",  # Cost-effective model
-                messages=[
+            recap = self._create_completion(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                temperature=0.7,
-                max_tokens=400  # Keep responses concise
+                max_tokens=400,  # Keep responses concise
+                call_type='recap'
             )
             
-            recap = response.choices[0].message.content.strip()
-            
             # Add entry count if available
             if entries and 'entry_count' in entries[0]:
                 entry_count = entries[0]['entry_count']
@@ -576,53 +831,119 @@ Focus on their resilience and any insights they've shared."""
     def _build_entry_context(self, entries: List[Dict]) -> str:
         """
         Build context string from journal entries
+        Entries are ranked by recency and informativeness and packed into
+        the context builder's token budget (see entry_context.py)
         Args:
             entries: List of entry dictionaries
         Returns:
             Formatted context string
         """
+        return self.context_builder.build(entries)
+    
+    def _build_period_context(self, entries: List[Dict]) -> str:
+        """
+        Build context string from per-period summaries (map step of the recap)
+        Args:
+            entries: List of entry dictionaries spanning several weeks
+        Returns:
+            Summary statistics followed by one summary line per period
+        """
         context_parts = []
-        
-        # Add summary statistics if available
-        if entries and len(entries) > 0:
-            first_entry = entries[0]
-            
-            if 'entry_count' in first_entry:
-                context_parts.append(f"Total entries: {first_entry['entry_count']}")
-                
-            if 'daily_count' in first_entry:
-                context_parts.append(f"Daily reflections: {first_entry['daily_count']}")
-                
-            if 'weekly_count' in first_entry:
-                context_parts.append(f"Weekly check-ins: {first_entry['weekly_count']}")
-            
-            if 'chat_count' in first_entry:
-                context_parts.append(f"Chat conversations: {first_entry['chat_count']}")
-        
-        # Add individual entry details if provided
-        for i, entry in enumerate(entries[:5], 1):  # Limit to 5 entries to control token usage
-            if 'mood' in entry:
-                context_parts.append(f"\nEntry {i}:")
-                context_parts.append(f"  Mood: {entry.get('mood', 'Not specified')}")
-                
-            if 'content' in entry:
-                context_parts.append(f"  Content: {entry['content'][:200]}...")  # Truncate long content
-            
-            if 'date' in entry:
-                context_parts.append(f"  Date: {entry['date']}")
-        
-        if not context_parts:
-            return "The user has made journal entries this week but detailed content is not available."
-        
+        if entries:
+            context_parts.extend(f"{label}: {entries[0][key]}"
+                                 for key, label in SUMMARY_FIELDS if key in entries[0])
+        context_parts.append("\nSummaries by period:")
+        # Cached summaries are only reused for the same backend and models
+        backend = self.llm_backend
+        source = f"{backend.name}:{backend.model_for('recap_chunk')}:{backend.model_for('recap_merge')}"
+        context_parts.extend(f"- {label}: {summary}"
+                             for label, summary in self.recap_pipeline.summarize(
+                                 entries, self._summarize_chunk, self._merge_summaries, source))
         return "\n".join(context_parts)
+    
+    def _summarize_chunk(self, label: str, entries: List[Dict]) -> str:
+        """
+        Summarize the entries of one period
+        Args:
+            label: Period label, e.g. "Week of 12/08/2025"
+            entries: Entries written in that period
+        Returns:
+            Short summary text
+        """
+        digests = self.context_builder.select(entries)
+        if not digests:
+            return f"{len(entries)} entries without written details."
+        
+        prompt = f"""Summarize these journal entries from {label} in 2-3 sentences.
+Note the mood, notable events, recurring themes and strengths. Write in the third person.
 
-# Create a global instance for easy import
-# Enable AI if OpenAI API key is available
-ai_enabled = bool(os.getenv('OPENAI_API_KEY')) and OPENAI_AVAILABLE
-chatbot = UnifiedChatbot(ai_enabled=ai_enabled)
+""" + "\n".join(digest.text for digest in digests)
+        return self._create_completion(
+            [
+                {"role": "system", "content": "You summarize private journal entries accurately and kindly."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=120,
+            temperature=0.3,
+            call_type='recap_chunk'
+        )
+    
+    def _merge_summaries(self, label: str, summaries: List[tuple]) -> str:
+        """
+        Merge consecutive period summaries into one
+        Args:
+            label: Label of the combined period
+            summaries: (label, summary) pairs, oldest first
+        Returns:
+            Combined summary text
+        """
+        prompt = f"""Combine these summaries of journal periods ({label}) into one summary of 3-4 sentences.
+Keep how the mood and themes changed over time. Write in the third person.
+
+""" + "\n".join(f"- {period}: {summary}" for period, summary in summaries)
+        return self._create_completion(
+            [
+                {"role": "system", "content": "You summarize private journal entries accurately and kindly."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=160,
+            temperature=0.3,
+            call_type='recap_merge'
+        )
+
+# Shared instance, built on first use rather than at import
+_chatbot = None
+_chatbot_lock = threading.Lock()
+
+def get_chatbot() -> UnifiedChatbot:
+    """
+    Get the shared chatbot, creating it on first call
+    AI is enabled if the OpenAI package and OPENAI_API_KEY are available, or if
+    JOURNAL_LLM_BACKENDS configures other backends (see llm_backend.backend_from_env);
+    model calls are recorded in the usage ledger (see usage_ledger.ledger_from_env)
+    Returns:
+        The process-wide UnifiedChatbot instance
+    """
+    global _chatbot
+    if _chatbot is None:
+        with _chatbot_lock:
+            if _chatbot is None:
+                backend = backend_from_env(get_openai_client)
+                ai_enabled = backend is not None or (bool(os.getenv('OPENAI_API_KEY')) and OPENAI_AVAILABLE)
+                _chatbot = UnifiedChatbot(ai_enabled=ai_enabled, usage_ledger=ledger_from_env(),
+                                          backend=backend)
+    return _chatbot
+
+def __getattr__(name: str):
+    """Keep `from chatbot import chatbot` working by building it on access"""
+    if name == 'chatbot':
+        return get_chatbot()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Example usage
 if __name__ == "__main__":
+    chatbot = get_chatbot()
+    
     # Test the chatbot
     print("Testing Unified Chatbot:")
     print(f"\n{'-'*64}")
@@ -0,0 +1,142 @@
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+# Turns kept per session; older turns drop off the front
+DEFAULT_MAX_TURNS = 20
+
+# Transcript prefixes used by app.py and older chatbot history, mapped to roles
+LINE_PREFIXES = (
+    ("You: ", 'user'),
+    ("User: ", 'user'),
+    ("Companion: ", 'assistant'),
+)
+
+
+class Turn(NamedTuple):
+    """One conversation turn"""
+    role: str                    # 'user', 'assistant' or 'system'
+    text: str
+    timestamp: float             # Seconds since the epoch
+    mood: Optional[int] = None   # Mood level (1-5) the turn relates to, if known
+
+
+def parse_line(line, timestamp: Optional[float] = None) -> Turn:
+    """
+    Convert a transcript line into a Turn
+    Args:
+        line: "You: ..."/"User: ..."/"Companion: ..." string, a legacy mood
+              response dict, or any other string (kept as a system note)
+        timestamp: Time to record, defaults to now
+    Returns:
+        The parsed Turn
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    if isinstance(line, dict):
+        return Turn('assistant', line.get('response', ''), timestamp, line.get('mood_level'))
+    for prefix, role in LINE_PREFIXES:
+        if line.startswith(prefix):
+            return Turn(role, line[len(prefix):], timestamp)
+    return Turn('system', line, timestamp)
+
+
+class ConversationHistory:
+    """
+    Fixed-capacity conversation history of typed turns
+    Backed by a deque, so appends are O(1) and memory stays constant however
+    long the session runs
+    """
+
+    __slots__ = ('_turns',)
+
+    def __init__(self, turns: Iterable[Turn] = (), max_turns: int = DEFAULT_MAX_TURNS):
+        if max_turns < 1:
+            raise ValueError("max_turns must be at least 1")
+        self._turns = deque(turns, maxlen=max_turns)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable, max_turns: int = DEFAULT_MAX_TURNS) -> 'ConversationHistory':
+        """
+        Build a history from transcript lines (see parse_line)
+        Args:
+            lines: Transcript lines, oldest first
+            max_turns: Capacity; only the most recent lines are kept
+        Returns:
+            New ConversationHistory
+        """
+        now = time.time()
+        return cls((parse_line(line, now) for line in lines), max_turns)
+
+    @property
+    def max_turns(self) -> int:
+        """Capacity of the history"""
+        return self._turns.maxlen
+
+    def append(self, role: str, text: str, mood: Optional[int] = None,
+               timestamp: Optional[float] = None) -> Turn:
+        """
+        Add a turn, dropping the oldest one when full
+        Args:
+            role: 'user', 'assistant' or 'system'
+            text: Message text
+            mood: Optional mood level the turn relates to
+            timestamp: Time of the turn, defaults to now
+        Returns:
+            The stored Turn
+        """
+        turn = Turn(role, text, time.time() if timestamp is None else timestamp, mood)
+        self._turns.append(turn)
+        return turn
+
+    def add_user(self, text: str, mood: Optional[int] = None) -> Turn:
+        """Add a user turn"""
+        return self.append('user', text, mood)
+
+    def add_assistant(self, text: str, mood: Optional[int] = None) -> Turn:
+        """Add a companion turn"""
+        return self.append('assistant', text, mood)
+
+    def recent(self, count: int) -> List[Turn]:
+        """
+        Get the most recent turns
+        Args:
+            count: Maximum number of turns
+        Returns:
+            Up to count turns, oldest first
+        """
+        if count <= 0:
+            return []
+        return list(islice(self._turns, max(0, len(self._turns) - count), None))
+
+    def to_openai_messages(self, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Convert turns to OpenAI chat messages
+        Args:
+            limit: Only convert the last limit turns
+        Returns:
+            List of {"role": ..., "content": ...} dictionaries
+        """
+        turns = self._turns if limit is None else self.recent(limit)
+        return [{"role": turn.role, "content": turn.text} for turn in turns]
+
+    def last(self) -> Optional[Turn]:
+        """Most recent turn, or None when empty"""
+        return self._turns[-1] if self._turns else None
+
+    def clear(self):
+        """Remove every turn"""
+        self._turns.clear()
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __iter__(self) -> Iterator[Turn]:
+        return iter(self._turns)
+
+    def __getitem__(self, index: int) -> Turn:
+        return self._turns[index]
+
+    def __repr__(self) -> str:
+        return f"ConversationHistory({len(self._turns)}/{self._turns.maxlen} turns)"
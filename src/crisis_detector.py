@@ -0,0 +1,172 @@
+import itertools
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Crisis phrases by category, in priority order (the first category found wins).
+# Each pattern is space separated word slots; a slot lists alternatives with '|',
+# and '_' joins the words of a multi-word alternative. Apostrophes are dropped
+# from messages before matching, so "can't" is written "cant".
+CRISIS_PATTERNS = (
+    ('self_harm', (
+        'suicide', 'suicidal', 'selfharm', 'self harm|harming', 'overdose',
+        'kill|killing|hurt|hurting|harm|harming|cut|cutting myself|my_self',
+        'end|ending|take|taking my|my_own life',
+        'end|ending it_all',
+        'want|wanted|wanting|going to die', 'wanna|gonna die',
+        'wish|wished i was|were dead',
+        'better off dead|without_me',
+        'no|nothing reason|left to live', 'nothing|nothing_left to_live_for',
+        'dont|do_not|not want|wanting to live|exist|be_alive|wake_up',
+    )),
+    ('harm_to_others', (
+        'want_to|wanna|going_to|gonna|will kill|hurt|shoot|stab|attack '
+        'him|her|them|someone|somebody|people|everyone|everybody',
+        'kill|hurt someone|somebody',
+    )),
+    ('panic', (
+        'panic attack|attacks',
+        'cant|cannot|couldnt breathe',
+        'heart is|keeps racing|pounding',
+    )),
+    # Everyday wording for acute stress: the normal reply is kept, with a grounding
+    # line in front (see response_corpus.GROUNDING_PROMPTS)
+    ('distress', (
+        'panicking', 'freaking out',
+    )),
+)
+
+# Words that negate the harm verb right after them ("I would never hurt myself",
+# "I'm not going to kill myself", "I don't want to die")
+_NEGATIONS = 'dont|never|wont|wouldnt|not'
+_HARM_VERBS = 'die|kill|killing|hurt|hurting|harm|harming|cut|cutting|end|ending|take|taking'
+
+# Phrases that cancel any crisis phrase they overlap: a negation in front of it,
+# or a figure of speech built on it
+CRISIS_EXCLUSIONS = (
+    f'{_NEGATIONS} {_HARM_VERBS}',
+    f'{_NEGATIONS} want_to|wanna|going_to|gonna {_HARM_VERBS}',
+    'hurt|hurting him|her|them|someone|somebody|people|everyone|everybody feelings',
+)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_APOSTROPHES = str.maketrans('', '', "'’")
+
+
+class CrisisSignal(NamedTuple):
+    """A crisis phrase found in a message"""
+    category: str     # 'self_harm', 'harm_to_others', 'panic' or 'distress'
+    phrase: str       # The matched words
+
+
+def expand_pattern(pattern: str) -> List[Tuple[str, ...]]:
+    """
+    Expand a slot pattern into every word sequence it matches
+    Args:
+        pattern: Space separated slots of '|' alternatives ('_' joins words)
+    Returns:
+        List of word tuples
+    """
+    slots = [[alternative.split('_') for alternative in slot.split('|')]
+             for slot in pattern.split()]
+    return [tuple(word for part in combination for word in part)
+            for combination in itertools.product(*slots)]
+
+
+class CrisisDetector:
+    """
+    Precompiled phrase matcher for crisis signals in chat messages
+    Phrases are stored in a word-level trie; the message is tokenized once and
+    the trie is walked from each token for at most the longest phrase length,
+    so a scan is linear in the message with no model or network call.
+    A match overlapped by an exclusion phrase ("don't want to die") is ignored
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Iterable[str]]] = CRISIS_PATTERNS,
+                 exclusions: Iterable[str] = CRISIS_EXCLUSIONS):
+        """
+        Compile the phrase tries
+        Args:
+            patterns: (category, slot patterns) pairs in priority order
+            exclusions: Slot patterns that cancel overlapping matches
+        """
+        self.categories = []
+        self._root: Dict = {}
+        self._exclusions: Dict = {}
+        self.max_phrase_words = 0
+        self._max_exclusion_words = 0
+        for rank, (category, category_patterns) in enumerate(patterns):
+            self.categories.append(category)
+            for pattern in category_patterns:
+                for words in expand_pattern(pattern):
+                    node = self._insert(self._root, words)
+                    # None marks the end of a phrase; keep the highest priority category
+                    node[None] = min(node.get(None, rank), rank)
+                    self.max_phrase_words = max(self.max_phrase_words, len(words))
+        for pattern in exclusions:
+            for words in expand_pattern(pattern):
+                self._insert(self._exclusions, words)[None] = True
+                self._max_exclusion_words = max(self._max_exclusion_words, len(words))
+        self.categories = tuple(self.categories)
+
+    @staticmethod
+    def _insert(root: Dict, words: Tuple[str, ...]) -> Dict:
+        """Add a word sequence to a trie, returning its last node"""
+        node = root
+        for word in words:
+            node = node.setdefault(word, {})
+        return node
+
+    def _excluded(self, words: List[str], start: int, end: int) -> bool:
+        """True if an exclusion phrase overlaps words[start:end]"""
+        for first in range(max(0, start - self._max_exclusion_words + 1), end):
+            node, position = self._exclusions.get(words[first]), first + 1
+            while node is not None:
+                if None in node and position > start:
+                    return True
+                if position == len(words):
+                    break
+                node = node.get(words[position])
+                position += 1
+        return False
+
+    def detect(self, message: str) -> Optional[CrisisSignal]:
+        """
+        Find the highest priority crisis phrase in a message
+        Args:
+            message: The user's message
+        Returns:
+            CrisisSignal, or None if the message has no crisis phrase
+        """
+        words = _WORD_PATTERN.findall(message.lower().translate(_APOSTROPHES))
+        root = self._root
+        best_rank, best_span = len(self.categories), None
+        for start, word in enumerate(words):
+            node = root.get(word)
+            end = start + 1
+            while node is not None:
+                rank = node.get(None)
+                if rank is not None and rank < best_rank and not self._excluded(words, start, end):
+                    best_rank, best_span = rank, (start, end)
+                    if rank == 0:
+                        return CrisisSignal(self.categories[0], ' '.join(words[start:end]))
+                if end == len(words):
+                    break
+                node = node.get(words[end])
+                end += 1
+        if best_span is None:
+            return None
+        return CrisisSignal(self.categories[best_rank], ' '.join(words[best_span[0]:best_span[1]]))
+
+
+# Shared detector, compiled once at import
+shared_crisis_detector = CrisisDetector()
+
+def detect_crisis(message: str) -> Optional[CrisisSignal]:
+    """
+    Check a chat message for crisis signals with the shared detector
+    Args:
+        message: The user's message
+    Returns:
+        CrisisSignal, or None if the message has no crisis phrase
+    """
+    return shared_crisis_detector.detect(message)
@@ -0,0 +1,239 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Answers that carry no signal for a recap
+EMPTY_ANSWERS = frozenset({'', 'skipped', 'skip', 'n/a', 'na', 'none', '-'})
+
+# Summary fields of the first (summary) entry, in prompt order
+SUMMARY_FIELDS = (
+    ('entry_count', "Total entries"),
+    ('daily_count', "Daily reflections"),
+    ('weekly_count', "Weekly check-ins"),
+    ('chat_count', "Chat conversations"),
+    ('mood_trend', "Mood trend"),
+)
+
+# Chat transcripts: only the user's own lines are worth prompt tokens
+CHAT_USER_PREFIXES = ("You:", "User:")
+CHAT_COMPANION_PREFIX = "Companion:"
+
+_WORD_PATTERN = re.compile(r"[a-z']{3,}")
+_FIELD_PATTERN = re.compile(r"^([^:]{1,40}):\s*(.*)$")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for budget packing (about four characters per token)
+    Args:
+        text: Prompt text
+    Returns:
+        Estimated token count
+    """
+    return len(text) // 4 + 1
+
+
+class EntryDigest(NamedTuple):
+    """Compact, prompt-ready form of one journal entry"""
+    text: str
+    tokens: int
+    informativeness: float   # 0-1, share of distinct words up to a cap
+
+
+class EntryContextBuilder:
+    """
+    Builds the journal context sent with AI recap requests
+    Entries are reduced to compact digests (empty and skipped answers dropped),
+    ranked by recency and informativeness, and packed greedily into a token
+    budget. Digests are cached per entry, so unchanged entries are not
+    reformatted on every recap.
+    """
+
+    def __init__(self, token_budget: int = 250, max_answer_chars: int = 240,
+                 recency_decay: float = 0.85, max_cached: int = 2048):
+        """
+        Create a context builder
+        Args:
+            token_budget: Estimated tokens available for entry digests
+            max_answer_chars: Longest single answer kept before truncation
+            recency_decay: Score multiplier per step back from the newest entry
+            max_cached: Number of entry digests kept in the cache
+        """
+        self.token_budget = max(1, token_budget)
+        self.max_answer_chars = max(20, max_answer_chars)
+        self.recency_decay = recency_decay
+        self.max_cached = max(1, max_cached)
+        self._digests: "OrderedDict[Tuple, Optional[EntryDigest]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.digest_hits = 0
+        self.digest_misses = 0
+
+    @classmethod
+    def from_env(cls) -> 'EntryContextBuilder':
+        """Builder with JOURNAL_RECAP_TOKEN_BUDGET applied"""
+        return cls(token_budget=int(os.getenv('JOURNAL_RECAP_TOKEN_BUDGET', '250')))
+
+    def _shorten(self, answer: str) -> str:
+        """Cut an answer at a word boundary once it exceeds max_answer_chars"""
+        if len(answer) <= self.max_answer_chars:
+            return answer
+        cut = answer[:self.max_answer_chars].rsplit(' ', 1)[0]
+        return cut.rstrip(' ,;.') + "..."
+
+    def _answers(self, entry: Dict) -> List[str]:
+        """Meaningful "Question: answer" parts of an entry, in order"""
+        lines = entry.get('fields')
+        if lines is None:
+            content = entry.get('content', '')
+            lines = [content] if content else []
+
+        is_chat = 'chat' in entry.get('type', '').lower()
+        answers = []
+        for line in lines:
+            line = line.strip()
+            if is_chat:
+                if line.startswith(CHAT_COMPANION_PREFIX):
+                    continue
+                for prefix in CHAT_USER_PREFIXES:
+                    if line.startswith(prefix):
+                        line = line[len(prefix):].strip()
+                        break
+                if line:
+                    answers.append(self._shorten(line))
+                continue
+
+            match = _FIELD_PATTERN.match(line)
+            if match:
+                question, answer = match.group(1).strip(), match.group(2).strip()
+                if answer.lower() in EMPTY_ANSWERS:
+                    continue
+                answers.append(f"{question}: {self._shorten(answer)}")
+            elif line.lower() not in EMPTY_ANSWERS:
+                answers.append(self._shorten(line))
+        return answers
+
+    def _make_digest(self, entry: Dict) -> Optional[EntryDigest]:
+        """Format one entry; None when nothing meaningful is left"""
+        answers = self._answers(entry)
+        if not answers:
+            return None
+
+        header = [value for value in (entry.get('date'), entry.get('type')) if value]
+        mood = entry.get('mood')
+        if mood:
+            header.append(f"mood {mood}")
+        text = f"- [{', '.join(header)}] " if header else "- "
+        text += "; ".join(answers)
+
+        distinct = len(set(_WORD_PATTERN.findall(' '.join(answers).lower())))
+        return EntryDigest(text, estimate_tokens(text), min(1.0, distinct / 40))
+
+    def digest(self, entry: Dict) -> Optional[EntryDigest]:
+        """
+        Get the cached digest of an entry, building it on first use
+        Args:
+            entry: Parsed journal entry dictionary
+        Returns:
+            EntryDigest, or None if the entry has no meaningful content
+        """
+        fields = entry.get('fields')
+        key = (entry.get('type'), entry.get('date'), entry.get('mood'),
+               tuple(fields) if fields is not None else entry.get('content'))
+        with self._lock:
+            if key in self._digests:
+                self._digests.move_to_end(key)
+                self.digest_hits += 1
+                return self._digests[key]
+
+        result = self._make_digest(entry)
+        with self._lock:
+            self.digest_misses += 1
+            self._digests[key] = result
+            while len(self._digests) > self.max_cached:
+                self._digests.popitem(last=False)
+        return result
+
+    def select(self, entries: List[Dict]) -> List[EntryDigest]:
+        """
+        Pick the digests that fit the token budget
+        Args:
+            entries: Parsed journal entries, oldest first
+        Returns:
+            Selected digests, oldest first
+        """
+        scored = []
+        newest = len(entries) - 1
+        for position, entry in enumerate(entries):
+            result = self.digest(entry)
+            if result is None:
+                continue
+            recency = self.recency_decay ** (newest - position)
+            scored.append((recency * (0.5 + 0.5 * result.informativeness), position, result))
+
+        chosen = []
+        remaining = self.token_budget
+        for _, position, result in sorted(scored, key=lambda item: item[0], reverse=True):
+            if result.tokens <= remaining:
+                chosen.append((position, result))
+                remaining -= result.tokens
+        return [result for _, result in sorted(chosen, key=lambda item: item[0])]
+
+    def fits(self, entries: List[Dict]) -> bool:
+        """
+        Whether every entry's digest fits the token budget, so none would be dropped
+        Args:
+            entries: Parsed journal entries (a summary entry with entry_count is ignored)
+        Returns:
+            True if the digests total at most token_budget tokens
+        """
+        remaining = self.token_budget
+        for entry in entries:
+            if 'entry_count' in entry:
+                continue
+            result = self.digest(entry)
+            if result is not None:
+                remaining -= result.tokens
+                if remaining < 0:
+                    return False
+        return True
+
+    def build(self, entries: List[Dict]) -> str:
+        """
+        Build the recap context string
+        Args:
+            entries: Optional summary entry (with entry_count) followed by parsed entries
+        Returns:
+            Summary statistics and the selected entry digests
+        """
+        context_parts = []
+        if entries:
+            summary = entries[0]
+            context_parts.extend(f"{label}: {summary[key]}"
+                                 for key, label in SUMMARY_FIELDS if key in summary)
+            if 'entry_count' in summary:
+                entries = entries[1:]
+
+        selected = self.select(entries)
+        if selected:
+            context_parts.append(f"\nMost relevant entries ({len(selected)} of {len(entries)}):")
+            context_parts.extend(result.text for result in selected)
+
+        if not context_parts:
+            return "The user has made journal entries this week but detailed content is not available."
+        return "\n".join(context_parts)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get digest cache counters
+        Returns:
+            Dictionary with cache hits, misses and size
+        """
+        with self._lock:
+            return {
+                'hits': self.digest_hits,
+                'misses': self.digest_misses,
+                'size': len(self._digests),
+            }
@@ -0,0 +1,176 @@
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .entry_context import EntryContextBuilder
+except ImportError:
+    from entry_context import EntryContextBuilder
+
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z']+")
+
+# Common words that only add noise to similarity scores
+STOP_WORDS = frozenset("""
+a about after all also am an and any are as at be been but by can could did do does
+for from had has have he her him his how i i'm if in into is it it's its just me more
+my no not of on or our out over she so some than that the their them then there they
+this to too up us very was we were what when which who will with would you your
+""".split())
+
+
+class SearchHit(NamedTuple):
+    """One retrieved journal entry"""
+    doc_id: int
+    score: float      # Cosine similarity, 0-1
+    snippet: str
+
+
+class EntryIndex:
+    """
+    Local TF-IDF retrieval over journal entries
+    The document-term matrix is kept column-major (a postings list per hashed
+    word feature, in typed arrays read by NumPy without copying), so a query
+    only touches the documents that share its words. Documents use log term
+    frequency and are cosine normalized when added; IDF is applied to the
+    query from live document frequencies (SMART lnc.ltc), so adding an entry
+    never touches earlier documents.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, snippet_chars: int = 240):
+        """
+        Create an empty index
+        Args:
+            n_features: Hashed feature space size (rounded up to a power of two)
+            snippet_chars: Longest answer kept in a stored snippet
+        """
+        self.n_features = 1 << max(8, (n_features - 1).bit_length())
+        self._mask = self.n_features - 1
+        self._builder = EntryContextBuilder(max_answer_chars=snippet_chars, max_cached=1)
+        self._lock = threading.Lock()
+
+        # feature -> (document ids, weights); the list length is the document frequency
+        self._postings: Dict[int, Tuple[array, array]] = {}
+        self._nnz = 0
+        self._snippets: List[str] = []
+
+    def _features(self, text: str) -> Counter:
+        """Hashed feature counts of a text"""
+        mask = self._mask
+        return Counter(hash(token) & mask for token in _TOKEN_PATTERN.findall(text.lower())
+                       if token not in STOP_WORDS)
+
+    def add(self, text: str, snippet: Optional[str] = None) -> Optional[int]:
+        """
+        Index a document
+        Args:
+            text: Text to index
+            snippet: Text returned for this document by search (defaults to text)
+        Returns:
+            Document id, or None if the text has no indexable words
+        """
+        counts = self._features(text)
+        if not counts:
+            return None
+        weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+        weights /= np.linalg.norm(weights)
+
+        with self._lock:
+            doc_id = len(self._snippets)
+            postings = self._postings
+            for feature, weight in zip(counts, weights.tolist()):
+                posting = postings.get(feature)
+                if posting is None:
+                    posting = postings[feature] = (array('i'), array('f'))
+                posting[0].append(doc_id)
+                posting[1].append(weight)
+            self._nnz += len(counts)
+            self._snippets.append(text if snippet is None else snippet)
+        return doc_id
+
+    def add_entry(self, entry: Dict) -> Optional[int]:
+        """
+        Index a parsed journal entry (empty and skipped answers are left out)
+        Args:
+            entry: Entry dictionary as produced by app._parse_journal_entries
+        Returns:
+            Document id, or None if the entry has no meaningful content
+        """
+        digest = self._builder.digest(entry)
+        if digest is None:
+            return None
+        text = digest.text[2:]  # Drop the "- " list marker
+        return self.add(text, text)
+
+    def add_entries(self, entries: Iterable[Dict]) -> int:
+        """
+        Index several parsed journal entries
+        Args:
+            entries: Entry dictionaries (summary entries without content are skipped)
+        Returns:
+            Number of entries indexed
+        """
+        return sum(1 for entry in entries if self.add_entry(entry) is not None)
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.1) -> List[SearchHit]:
+        """
+        Find the entries most similar to a query
+        Args:
+            query: Free text, e.g. the user's chat message
+            k: Maximum number of hits
+            min_score: Minimum cosine similarity of a hit
+        Returns:
+            Hits ordered from most to least similar
+        """
+        counts = self._features(query)
+        if not counts or k < 1:
+            return []
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+
+        with self._lock:
+            n_docs = len(self._snippets)
+            if n_docs == 0:
+                return []
+            postings = [self._postings.get(feature) for feature in counts]
+            df = np.array([len(posting[0]) if posting else 0 for posting in postings])
+
+            # Query weights: log tf times smoothed idf, cosine normalized
+            query_weights = (1.0 + np.log(tf)) * (np.log((1 + n_docs) / (1 + df)) + 1.0)
+            query_weights /= np.linalg.norm(query_weights)
+
+            matched = [(posting, weight) for posting, weight in zip(postings, query_weights)
+                       if posting]
+            if not matched:
+                return []
+            # Concatenating copies the postings, so no array view outlives the lock
+            docs = np.concatenate([np.frombuffer(posting[0], dtype=np.int32)
+                                   for posting, _ in matched])
+            values = np.concatenate([np.frombuffer(posting[1], dtype=np.float32) * weight
+                                     for posting, weight in matched])
+            snippets = self._snippets
+
+        scores = np.bincount(docs, weights=values, minlength=n_docs)
+
+        k = min(k, n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [SearchHit(int(doc), float(scores[doc]), snippets[doc])
+                for doc in top if scores[doc] >= min_score]
+
+    def __len__(self) -> int:
+        return len(self._snippets)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get index size figures
+        Returns:
+            Dictionary with document, stored value and feature counts and posting bytes
+        """
+        with self._lock:
+            used = sum(posting[0].itemsize * len(posting[0]) + posting[1].itemsize * len(posting[1])
+                       for posting in self._postings.values())
+            return {'documents': len(self._snippets), 'nnz': self._nnz,
+                    'features': len(self._postings), 'bytes': used}
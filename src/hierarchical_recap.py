@@ -0,0 +1,256 @@
+import datetime
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from .response_cache import ResponseCache
+except ImportError:
+    from response_cache import ResponseCache
+
+# Date formats written by app.py ("12/14/2025" and "12/14/2025 05:38 PM")
+DATE_FORMAT = "%m/%d/%Y"
+
+UNDATED = "undated"
+
+
+def entry_day(entry: Dict) -> Optional[datetime.date]:
+    """
+    Day an entry was written
+    Args:
+        entry: Parsed journal entry
+    Returns:
+        The date, or None when the entry has no readable date
+    """
+    try:
+        return datetime.datetime.strptime(str(entry.get('date', ''))[:10], DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def chunk_key(day: Optional[datetime.date], period: str = 'week') -> str:
+    """
+    Label of the chunk a day belongs to
+    Args:
+        day: Entry date, or None
+        period: 'week' (weeks start on Monday) or 'day'
+    Returns:
+        Chunk label, e.g. "Week of 12/08/2025"
+    """
+    if day is None:
+        return UNDATED
+    if period == 'day':
+        return day.strftime(DATE_FORMAT)
+    return "Week of " + (day - datetime.timedelta(days=day.weekday())).strftime(DATE_FORMAT)
+
+
+def chunk_entries(entries: List[Dict], period: str = 'week') -> "OrderedDict[str, List[Dict]]":
+    """
+    Group entries into day or week chunks
+    Args:
+        entries: Parsed journal entries (summary entries with entry_count are skipped)
+        period: 'week' or 'day'
+    Returns:
+        Chunk label -> entries, oldest chunk first, undated entries last
+    """
+    dated = []
+    undated = []
+    for position, entry in enumerate(entries):
+        if 'entry_count' in entry:
+            continue
+        day = entry_day(entry)
+        if day is None:
+            undated.append(entry)
+        else:
+            dated.append((day, position, entry))
+
+    chunks: "OrderedDict[str, List[Dict]]" = OrderedDict()
+    for day, _, entry in sorted(dated, key=lambda item: (item[0], item[1])):
+        chunks.setdefault(chunk_key(day, period), []).append(entry)
+    if undated:
+        chunks[UNDATED] = undated
+    return chunks
+
+
+def content_hash(*parts) -> str:
+    """Stable digest of JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class HierarchicalRecap:
+    """
+    Map-reduce summarization for long journals
+    Entries are split into day or week chunks, each chunk is summarized in a
+    bounded worker pool, and summaries are cached by content hash and the
+    model that wrote them, so a new entry only costs a call for its own chunk. When there are more summaries
+    than fit one reduce prompt, the oldest are merged group by group (also
+    cached) until they fit. One pipeline (pool and cache) can serve many
+    chatbots, each passing its own map and merge steps to summarize().
+    """
+
+    def __init__(self, summarize_chunk: Optional[Callable[[str, List[Dict]], str]] = None,
+                 merge_summaries: Optional[Callable[[str, List[Tuple[str, str]]], str]] = None,
+                 max_workers: int = 4, period: str = 'week', max_reduce_inputs: int = 12,
+                 cache: Optional[ResponseCache] = None, min_chunks: int = 2):
+        """
+        Create a pipeline
+        Args:
+            summarize_chunk: Default map step, (label, entries) -> summary
+            merge_summaries: Default merge step, combining (label, summary) pairs
+                             into one summary for a label
+            max_workers: Concurrent summarization calls
+            period: Chunk size, 'week' or 'day'
+            max_reduce_inputs: Most summaries handed to the final reduce step
+            cache: Summary cache (defaults to a non-expiring in-memory cache)
+            min_chunks: Fewest periods a journal must span to be worth summarizing
+                        per period (see should_summarize)
+        """
+        if period not in ('week', 'day'):
+            raise ValueError("period must be 'week' or 'day'")
+        self.summarize_chunk = summarize_chunk
+        self.merge_summaries = merge_summaries
+        self.period = period
+        self.max_reduce_inputs = max(2, max_reduce_inputs)
+        self.min_chunks = max(2, min_chunks)
+        self.cache = cache if cache is not None else ResponseCache(max_entries=1024, ttl_seconds=0)
+        self.max_workers = max(1, max_workers)
+        # Worker pool, started by the first summary that is not cached
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        # Work counters
+        self.summarized = 0
+        self.reused = 0
+
+    @classmethod
+    def from_env(cls, summarize_chunk=None, merge_summaries=None) -> 'HierarchicalRecap':
+        """
+        Pipeline configured by environment settings
+        JOURNAL_RECAP_WORKERS sets the pool size, JOURNAL_RECAP_CHUNK chooses 'week' or 'day',
+        JOURNAL_RECAP_MIN_CHUNKS the fewest periods worth summarizing separately and
+        JOURNAL_RECAP_CACHE_PATH keeps chunk summaries on disk between runs
+        """
+        path = os.getenv('JOURNAL_RECAP_CACHE_PATH') or None
+        return cls(summarize_chunk, merge_summaries,
+                   max_workers=int(os.getenv('JOURNAL_RECAP_WORKERS', '4')),
+                   period=os.getenv('JOURNAL_RECAP_CHUNK', 'week').strip().lower(),
+                   cache=ResponseCache(max_entries=1024, ttl_seconds=0, db_path=path),
+                   min_chunks=int(os.getenv('JOURNAL_RECAP_MIN_CHUNKS', '2')))
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """The worker pool, started on first use"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="recap-chunk")
+            return self._executor
+
+    def _cached_map(self, jobs: List[Tuple[str, str, Callable[[], str]]]) -> List[str]:
+        """Run (label, key, fn) jobs concurrently, serving repeats from the cache"""
+        results: List[Optional[str]] = []
+        pending = []
+        for index, (_, key, fn) in enumerate(jobs):
+            cached = self.cache.get(key)
+            results.append(cached)
+            if cached is None:
+                pending.append((index, key, self._pool().submit(fn)))
+            else:
+                self.reused += 1
+
+        for index, key, future in pending:
+            summary = future.result()
+            self.cache.set(key, summary)
+            self.summarized += 1
+            results[index] = summary
+        return results
+
+    def summarize(self, entries: List[Dict],
+                  summarize_chunk: Optional[Callable[[str, List[Dict]], str]] = None,
+                  merge_summaries: Optional[Callable[[str, List[Tuple[str, str]]], str]] = None,
+                  source: str = '') -> List[Tuple[str, str]]:
+        """
+        Map step (plus merging of old summaries when there are too many)
+        Args:
+            entries: Parsed journal entries, oldest first
+            summarize_chunk: Map step for this call (defaults to the pipeline's)
+            merge_summaries: Merge step for this call (defaults to the pipeline's)
+            source: Backend and model the steps call; part of the cache keys, so
+                    summaries written by one model are not served for another
+        Returns:
+            (label, summary) pairs, oldest first, at most max_reduce_inputs of them
+        """
+        summarize_chunk = summarize_chunk or self.summarize_chunk
+        merge_summaries = merge_summaries or self.merge_summaries
+        chunks = chunk_entries(entries, self.period)
+        jobs = [(label, content_hash('chunk', source, label, chunk),
+                 lambda label=label, chunk=chunk: summarize_chunk(label, chunk))
+                for label, chunk in chunks.items()]
+        summaries = list(zip([label for label, _, _ in jobs], self._cached_map(jobs)))
+
+        # Collapse the oldest summaries group by group until the reduce prompt fits
+        keep = self.max_reduce_inputs - 1
+        while len(summaries) > self.max_reduce_inputs:
+            older, recent = summaries[:-keep], summaries[-keep:]
+            groups = [older[i:i + self.max_reduce_inputs]
+                      for i in range(0, len(older), self.max_reduce_inputs)]
+            jobs = []
+            for group in groups:
+                if len(group) > 1:
+                    label = f"{group[0][0]} to {group[-1][0]}"
+                    jobs.append((label, content_hash('merge', source, group),
+                                 lambda label=label, group=group: merge_summaries(label, group)))
+            merged = iter(zip([label for label, _, _ in jobs], self._cached_map(jobs)))
+            summaries = [group[0] if len(group) == 1 else next(merged) for group in groups] + recent
+        return summaries
+
+    def chunk_count(self, entries: List[Dict]) -> int:
+        """Number of chunks the entries span"""
+        return len(chunk_entries(entries, self.period))
+
+    def should_summarize(self, entries: List[Dict], fits_context: Callable[[List[Dict]], bool]) -> bool:
+        """
+        Whether a journal needs per-period summaries before the recap
+        Args:
+            entries: Parsed journal entries
+            fits_context: True when the entries fit one recap prompt as they are
+        Returns:
+            True if the entries overflow the prompt and span at least min_chunks periods
+        """
+        return self.chunk_count(entries) >= self.min_chunks and not fits_context(entries)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get work counters
+        Returns:
+            Dictionary with summaries computed and reused from the cache
+        """
+        return {'summarized': self.summarized, 'reused': self.reused}
+
+    def shutdown(self):
+        """Stop the worker pool (a later summary starts a new one)"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Process-wide pipeline, built on first use rather than at import
+_shared_pipeline = None
+_shared_pipeline_lock = threading.Lock()
+
+def get_recap_pipeline() -> HierarchicalRecap:
+    """
+    Get the pipeline shared by every chatbot, configured from the environment on first call
+    Returns:
+        The shared HierarchicalRecap (see HierarchicalRecap.from_env)
+    """
+    global _shared_pipeline
+    with _shared_pipeline_lock:
+        if _shared_pipeline is None:
+            _shared_pipeline = HierarchicalRecap.from_env()
+        return _shared_pipeline
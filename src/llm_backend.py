@@ -0,0 +1,510 @@
+import abc
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+# Model per call type; recap_chunk and recap_merge fall back to 'recap'
+DEFAULT_MODELS = {
+    'chat': 'gpt-4o-mini',
+    'recap': 'gpt-4o-mini',
+}
+DEFAULT_MODEL = 'gpt-4o-mini'
+
+
+class BackendError(Exception):
+    """Raised when a backend cannot complete a request"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class Completion(NamedTuple):
+    """Result of one chat completion"""
+    text: str
+    model: str
+    backend: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def _token_count(value: Any) -> int:
+    """Usage field as an int (0 when missing)"""
+    return value if isinstance(value, int) else 0
+
+
+class ChatBackend(abc.ABC):
+    """
+    Chat completion backend
+    Subclasses implement complete() and stream(); each backend has its own
+    model per call type, so a router can mix providers.
+    """
+
+    name = 'backend'
+
+    def __init__(self, models: Optional[Dict[str, str]] = None,
+                 default_model: str = DEFAULT_MODEL, name: Optional[str] = None):
+        """
+        Args:
+            models: Model name per call type ('chat', 'recap', ...)
+            default_model: Model for call types not in models
+            name: Backend name shown in stats and the usage ledger
+        """
+        self.models = dict(DEFAULT_MODELS if models is None else models)
+        self.default_model = default_model
+        if name:
+            self.name = name
+
+    def model_for(self, call_type: str) -> str:
+        """
+        Model used for a call type
+        Args:
+            call_type: e.g. 'chat', 'recap' or 'recap_chunk'
+        Returns:
+            Model name
+        """
+        return (self.models.get(call_type) or self.models.get(call_type.split('_')[0])
+                or self.default_model)
+
+    @abc.abstractmethod
+    def complete(self, messages: List[Dict[str, str]], call_type: str = 'other',
+                 model: Optional[str] = None, temperature: float = 0.7,
+                 max_tokens: int = 150) -> Completion:
+        """
+        Run a chat completion
+        Args:
+            messages: OpenAI style message list
+            call_type: Purpose of the call, selects the model
+            model: Explicit model, overriding the call type's
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+        Returns:
+            Completion
+        Raises:
+            BackendError or the client's own errors when the call fails
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stream(self, messages: List[Dict[str, str]], call_type: str = 'other',
+               model: Optional[str] = None, temperature: float = 0.7,
+               max_tokens: int = 150) -> Iterator[str]:
+        """
+        Run a chat completion, yielding text as it is generated
+        Args:
+            messages: OpenAI style message list
+            call_type: Purpose of the call, selects the model
+            model: Explicit model, overriding the call type's
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+        Returns:
+            Iterator of text chunks
+        """
+        raise NotImplementedError
+
+
+class OpenAIBackend(ChatBackend):
+    """OpenAI API through the shared client (see openai_client.py)"""
+
+    name = 'openai'
+
+    def __init__(self, client: Any = None, client_factory: Optional[Callable[[], Any]] = None,
+                 **kwargs):
+        """
+        Args:
+            client: openai.OpenAI client (or anything with the same interface)
+            client_factory: Called for the client on every use when client is None, so
+                            a client rebuilt by the factory's owner is picked up
+            kwargs: See ChatBackend
+        """
+        super().__init__(**kwargs)
+        self._client = client
+        self._client_factory = client_factory
+
+    @property
+    def client(self) -> Any:
+        client = self._client
+        if client is None and self._client_factory is not None:
+            client = self._client_factory()
+        if client is None:
+            raise BackendError("OpenAI client is not available")
+        return client
+
+    def complete(self, messages, call_type='other', model=None, temperature=0.7, max_tokens=150):
+        model = model or self.model_for(call_type)
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        usage = getattr(response, 'usage', None)
+        return Completion(response.choices[0].message.content or "", model, self.name,
+                          _token_count(getattr(usage, 'prompt_tokens', 0)),
+                          _token_count(getattr(usage, 'completion_tokens', 0)))
+
+    def stream(self, messages, call_type='other', model=None, temperature=0.7, max_tokens=150):
+        chunks = self.client.chat.completions.create(
+            model=model or self.model_for(call_type),
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class HTTPBackend(ChatBackend):
+    """
+    Any OpenAI-compatible /chat/completions endpoint (a local model server,
+    a proxy, the mock server), spoken to with urllib so no client package is needed
+    """
+
+    name = 'http'
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: float = 30.0,
+                 **kwargs):
+        """
+        Args:
+            base_url: API root, e.g. "http://localhost:11434/v1"
+            api_key: Sent as a bearer token when set
+            timeout: Seconds to wait for the server
+            kwargs: See ChatBackend
+        """
+        super().__init__(**kwargs)
+        self.url = base_url.rstrip('/') + "/chat/completions"
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def _open(self, payload: Dict[str, Any]):
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        if self.api_key:
+            request.add_header('Authorization', f"Bearer {self.api_key}")
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            detail = e.read(500).decode('utf-8', 'replace')
+            raise BackendError(f"HTTP {e.code} from {self.url}: {detail}", status=e.code) from e
+        except (urllib.error.URLError, OSError) as e:
+            raise BackendError(f"Cannot reach {self.url}: {e}") from e
+
+    def _payload(self, messages, model, temperature, max_tokens, stream=False) -> Dict[str, Any]:
+        payload = {'model': model, 'messages': messages, 'temperature': temperature,
+                   'max_tokens': max_tokens}
+        if stream:
+            payload['stream'] = True
+        return payload
+
+    def complete(self, messages, call_type='other', model=None, temperature=0.7, max_tokens=150):
+        model = model or self.model_for(call_type)
+        with self._open(self._payload(messages, model, temperature, max_tokens)) as response:
+            try:
+                body = json.loads(response.read().decode('utf-8'))
+                text = body['choices'][0]['message']['content'] or ""
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise BackendError(f"Malformed response from {self.url}: {e}") from e
+        usage = body.get('usage') or {}
+        return Completion(text, body.get('model', model), self.name,
+                          _token_count(usage.get('prompt_tokens')),
+                          _token_count(usage.get('completion_tokens')))
+
+    def stream(self, messages, call_type='other', model=None, temperature=0.7, max_tokens=150):
+        model = model or self.model_for(call_type)
+        with self._open(self._payload(messages, model, temperature, max_tokens, True)) as response:
+            # Server-sent events: "data: {...}" lines, ended by "data: [DONE]"
+            for raw in response:
+                line = raw.decode('utf-8').strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    content = json.loads(data)['choices'][0]['delta'].get('content')
+                except (ValueError, KeyError, IndexError) as e:
+                    raise BackendError(f"Malformed stream chunk from {self.url}: {e}") from e
+                if content:
+                    yield content
+
+
+class StubBackend(ChatBackend):
+    """
+    Deterministic in-process backend for offline development and tests
+    The reply is picked by a hash of the conversation, so the same request
+    always gets the same answer.
+    """
+
+    name = 'stub'
+
+    REPLIES = (
+        "Thank you for sharing that with me. What feels most important about it right now?",
+        "That sounds like a lot to carry. How have you been taking care of yourself?",
+        "I'm glad you wrote about this. What would you like to remember from today?",
+        "It takes courage to reflect like this. What helped you get through it?",
+    )
+
+    def __init__(self, replies: Optional[List[str]] = None, latency: float = 0.0,
+                 failing: bool = False, **kwargs):
+        """
+        Args:
+            replies: Possible replies (defaults to REPLIES)
+            latency: Seconds each call takes
+            failing: Raise BackendError on every call (for failover tests)
+            kwargs: See ChatBackend
+        """
+        super().__init__(**kwargs)
+        self.replies = tuple(replies) if replies else self.REPLIES
+        self.latency = latency
+        self.failing = failing
+        self.calls = 0
+
+    def _reply(self, messages, model, max_tokens) -> Completion:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failing:
+            raise BackendError(f"{self.name} is failing", status=503)
+        payload = json.dumps(messages, sort_keys=True).encode('utf-8')
+        index = int.from_bytes(hashlib.sha256(payload).digest()[:4], 'big') % len(self.replies)
+        text = self.replies[index]
+        words = text.split(' ')
+        # Honour max_tokens roughly, at one word per token
+        text = ' '.join(words[:max(1, max_tokens)])
+        prompt_tokens = sum(len(str(message.get('content', ''))) // 4 + 4 for message in messages)
+        return Completion(text, model, self.name, prompt_tokens, min(len(words), max_tokens))
+
+    def complete(self, messages, call_type='other', model=None, temperature=0.7, max_tokens=150):
+        return self._reply(messages, model or self.model_for(call_type), max_tokens)
+
+    def stream(self, messages, call_type='other', model=None, temperature=0.7, max_tokens=150):
+        completion = self._reply(messages, model or self.model_for(call_type), max_tokens)
+        words = completion.text.split(' ')
+        for index, word in enumerate(words):
+            yield word if index == len(words) - 1 else word + ' '
+
+
+class _Health:
+    """Rolling latency and outcome window of one backend"""
+
+    __slots__ = ('latencies', 'outcomes', 'last_failure', 'calls', 'errors')
+
+    def __init__(self, window: int):
+        self.latencies: deque = deque(maxlen=window)   # Successful calls only
+        self.outcomes: deque = deque(maxlen=window)    # True for success
+        self.last_failure = float('-inf')
+        self.calls = 0
+        self.errors = 0
+
+    def p95(self) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+
+class BackendRouter(ChatBackend):
+    """
+    Sends each call to the preferred healthy backend, failing over to the others
+    Backends are tried in their configured order. A backend whose error
+    rate over a rolling window (of at least min_samples calls) is above
+    max_error_rate is tried last until
+    cooldown seconds after its latest failure, when it gets another chance.
+    Backends sharing a priority are peers, ranked by observed p95 latency;
+    a peer with fewer than min_samples calls ranks first so each one is
+    measured before the ranking settles.
+    """
+
+    name = 'router'
+
+    def __init__(self, backends: List[ChatBackend], window: int = 50, min_samples: int = 10,
+                 max_error_rate: float = 0.5, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 priorities: Optional[List[int]] = None):
+        """
+        Args:
+            backends: Backends in order of preference
+            window: Calls per backend kept for latency and error statistics
+            min_samples: Calls before a backend's error rate or a peer's p95 counts
+            max_error_rate: Error rate above which a backend is avoided
+            cooldown: Seconds after its latest failure before an avoided backend is retried
+            clock: Monotonic time source
+            priorities: Priority per backend, lower first; equal priorities are peers
+                        ranked by latency (defaults to the list order, no peers)
+        Raises:
+            ValueError: If there are no backends or priorities do not match them
+        """
+        if not backends:
+            raise ValueError("BackendRouter needs at least one backend")
+        if priorities is not None and len(priorities) != len(backends):
+            raise ValueError("BackendRouter needs one priority per backend")
+        super().__init__(models=backends[0].models, default_model=backends[0].default_model)
+        self.backends = list(backends)
+        self.priorities = list(range(len(backends)) if priorities is None else priorities)
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self._clock = clock
+        self._health = {id(backend): _Health(window) for backend in self.backends}
+        self._lock = threading.Lock()
+
+    def model_for(self, call_type: str) -> str:
+        """Model of the preferred backend (used for cache keys)"""
+        return self.backends[0].model_for(call_type)
+
+    def ranked(self) -> List[ChatBackend]:
+        """
+        Backends in the order the next call will try them
+        Returns:
+            Healthy backends by priority (peers by p95 latency), then avoided ones
+        """
+        now = self._clock()
+        with self._lock:
+            def rank(item):
+                position, backend = item
+                health = self._health[id(backend)]
+                avoided = (len(health.outcomes) >= self.min_samples
+                           and health.error_rate() > self.max_error_rate
+                           and now - health.last_failure < self.cooldown)
+                measured = len(health.latencies) >= self.min_samples
+                return (avoided, self.priorities[position],
+                        health.p95() if measured else 0.0, position)
+            return [backend for _, backend in sorted(enumerate(self.backends), key=rank)]
+
+    def _record(self, backend: ChatBackend, latency: Optional[float]):
+        """Record a call; latency None marks a failure"""
+        with self._lock:
+            health = self._health[id(backend)]
+            health.calls += 1
+            health.outcomes.append(latency is not None)
+            if latency is None:
+                health.errors += 1
+                health.last_failure = self._clock()
+            else:
+                health.latencies.append(latency)
+
+    def complete(self, messages, call_type='other', model=None, temperature=0.7, max_tokens=150):
+        error: Optional[Exception] = None
+        for backend in self.ranked():
+            started = self._clock()
+            try:
+                completion = backend.complete(messages, call_type, model, temperature, max_tokens)
+            except Exception as e:
+                self._record(backend, None)
+                error = e
+                continue
+            self._record(backend, self._clock() - started)
+            return completion
+        raise error
+
+    def stream(self, messages, call_type='other', model=None, temperature=0.7, max_tokens=150):
+        error: Optional[Exception] = None
+        for backend in self.ranked():
+            started = self._clock()
+            emitted = False
+            try:
+                for chunk in backend.stream(messages, call_type, model, temperature, max_tokens):
+                    emitted = True
+                    yield chunk
+            except Exception as e:
+                self._record(backend, None)
+                # Text already shown cannot be taken back, so only fail over before the first chunk
+                if emitted:
+                    raise
+                error = e
+                continue
+            self._record(backend, self._clock() - started)
+            return
+        raise error
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-backend routing figures
+        Returns:
+            Backend name -> calls, errors, windowed error rate and p95 latency in seconds
+        """
+        stats = {}
+        with self._lock:
+            for backend in self.backends:
+                health = self._health[id(backend)]
+                stats[backend.name] = {'calls': health.calls, 'errors': health.errors,
+                                       'error_rate': health.error_rate(), 'p95': health.p95()}
+        return stats
+
+
+def _models_from_env(default: str) -> Dict[str, str]:
+    """Per call type models from JOURNAL_CHAT_MODEL and JOURNAL_RECAP_MODEL"""
+    return {'chat': os.getenv('JOURNAL_CHAT_MODEL', default),
+            'recap': os.getenv('JOURNAL_RECAP_MODEL', default)}
+
+
+def openai_backend_from_env(client_factory: Callable[[], Any]) -> OpenAIBackend:
+    """
+    Build the OpenAI backend with the models chosen by JOURNAL_CHAT_MODEL and JOURNAL_RECAP_MODEL
+    Args:
+        client_factory: Returns the OpenAI client, or None when it is unavailable
+    Returns:
+        OpenAIBackend using DEFAULT_MODEL for call types that are not configured
+    """
+    return OpenAIBackend(client_factory=client_factory, models=_models_from_env(DEFAULT_MODEL))
+
+
+def backend_from_env(openai_client_factory: Optional[Callable[[], Any]] = None
+                     ) -> Optional[ChatBackend]:
+    """
+    Build the model backend from environment settings
+    JOURNAL_LLM_BACKENDS lists backends in order of preference: 'openai',
+    'local' (an OpenAI-compatible server at JOURNAL_LLM_LOCAL_URL serving
+    JOURNAL_LLM_LOCAL_MODEL) and 'stub'. Several backends are routed in that
+    order, failing over on errors; backends joined with '|' (e.g.
+    'openai|local,stub') are peers picked by latency. JOURNAL_CHAT_MODEL and
+    JOURNAL_RECAP_MODEL pick the OpenAI model per call type.
+    Args:
+        openai_client_factory: Returns the OpenAI client, or None when it is unavailable
+    Returns:
+        A backend or router, or None when JOURNAL_LLM_BACKENDS is not set
+    """
+    names = [(priority, name.strip().lower())
+             for priority, group in enumerate(os.getenv('JOURNAL_LLM_BACKENDS', '').split(','))
+             for name in group.split('|') if name.strip()]
+    backends: List[ChatBackend] = []
+    priorities: List[int] = []
+    for priority, name in names:
+        priorities.append(priority)
+        if name == 'openai':
+            if openai_client_factory is not None and os.getenv('OPENAI_API_KEY'):
+                backends.append(openai_backend_from_env(openai_client_factory))
+        elif name == 'local':
+            model = os.getenv('JOURNAL_LLM_LOCAL_MODEL', 'llama3.1')
+            backends.append(HTTPBackend(
+                os.getenv('JOURNAL_LLM_LOCAL_URL', 'http://localhost:11434/v1'),
+                api_key=os.getenv('JOURNAL_LLM_LOCAL_API_KEY') or None,
+                timeout=float(os.getenv('JOURNAL_HTTP_TIMEOUT', '30')),
+                models={}, default_model=model, name='local'))
+        elif name == 'stub':
+            backends.append(StubBackend(models={}, default_model='stub'))
+        else:
+            raise ValueError(f"Unknown backend in JOURNAL_LLM_BACKENDS: {name}")
+        if len(backends) < len(priorities):
+            priorities.pop()  # OpenAI skipped without a key
+
+    if not backends:
+        return None
+    return backends[0] if len(backends) == 1 else BackendRouter(backends, priorities=priorities)
@@ -0,0 +1,335 @@
+# mock_openai_server.py - Local OpenAI-compatible server for offline load and latency testing
+#
+# Usage: python src/mock_openai_server.py [--port 8080] [--latency lognormal:0.4,0.5]
+#        [--token-interval 0.02] [--error-rate 0.01] [--rate-limit-rate 0.05] [--max-concurrent 0]
+# Point HTTPBackend (JOURNAL_LLM_BACKENDS=local, JOURNAL_LLM_LOCAL_URL=http://127.0.0.1:8080/v1)
+# or the openai client (OPENAI_BASE_URL) at it.
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+REPLIES = (
+    "Thank you for sharing that with me. What feels most important about it right now?",
+    "That sounds like a lot to carry. How have you been taking care of yourself this week?",
+    "I'm glad you wrote about this. What would you like to remember from today?",
+    "It takes courage to reflect like this. What helped you get through the hard parts?",
+)
+
+
+class LatencyModel:
+    """
+    Seconds to wait before the first token
+    Specs: "fixed:S", "uniform:LOW,HIGH", "normal:MEAN,STD", "exponential:MEAN"
+    and "lognormal:MEDIAN,SIGMA" (long tail, like real API latency)
+    """
+
+    KINDS = ('fixed', 'uniform', 'normal', 'exponential', 'lognormal')
+
+    def __init__(self, kind: str = 'fixed', a: float = 0.0, b: float = 0.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.a = a
+        self.b = b
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyModel':
+        """
+        Build a model from a spec string
+        Args:
+            spec: e.g. "lognormal:0.4,0.5"; a bare number means fixed
+        Returns:
+            LatencyModel
+        """
+        kind, _, params = spec.partition(':')
+        if not params:
+            return cls('fixed', float(kind))
+        values = [float(value) for value in params.split(',')]
+        return cls(kind.strip().lower(), *values[:2])
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency (never negative)"""
+        if self.kind == 'fixed':
+            value = self.a
+        elif self.kind == 'uniform':
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == 'normal':
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == 'exponential':
+            value = rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        else:
+            value = self.a * math.exp(rng.gauss(0.0, self.b)) if self.a > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self) -> str:
+        return f"LatencyModel({self.kind!r}, {self.a}, {self.b})"
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    OpenAI-compatible /v1/chat/completions (plain and streaming) and /v1/models
+    Replies are picked by a hash of the request, so the same prompt always
+    gets the same answer. Failures are injected at random with a seeded
+    generator, so runs are reproducible.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: Optional[LatencyModel] = None, token_interval: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 max_concurrent: int = 0, retry_after: float = 1.0, seed: int = 0,
+                 replies: Optional[List[str]] = None):
+        """
+        Create the server (call start() or serve_forever() to run it)
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            latency: Time to first token (defaults to none)
+            token_interval: Seconds between generated tokens
+            error_rate: Share of requests answered with HTTP 500
+            rate_limit_rate: Share of requests answered with HTTP 429
+            max_concurrent: Requests in flight beyond this get HTTP 429 (0 = unlimited)
+            retry_after: Retry-After seconds sent with 429 responses
+            seed: Seed for latency sampling and failure injection
+            replies: Possible replies (defaults to REPLIES)
+        """
+        super().__init__((host, port), _MockHandler)
+        self.latency = latency or LatencyModel()
+        self.token_interval = token_interval
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.replies = tuple(replies) if replies else REPLIES
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self.requests = 0
+        self.completed = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        """API root to give clients, e.g. http://127.0.0.1:54321/v1"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def admit(self) -> Tuple[Optional[int], float]:
+        """
+        Decide the fate of a new request
+        Returns:
+            (HTTP error status or None, latency to first token)
+        """
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            latency = self.latency.sample(self._rng)
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                self.rate_limited += 1
+                return 429, 0.0
+            if roll < self.rate_limit_rate:
+                self.rate_limited += 1
+                return 429, 0.0
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.errors += 1
+                return 500, latency
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return None, latency
+
+    def finish(self):
+        """Mark an admitted request as done"""
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def reply_tokens(self, messages: List[Dict[str, Any]], max_tokens: int) -> List[str]:
+        """Deterministic reply for a conversation, split into word tokens"""
+        payload = json.dumps(messages, sort_keys=True).encode('utf-8')
+        index = int.from_bytes(hashlib.sha256(payload).digest()[:4], 'big') % len(self.replies)
+        words = self.replies[index].split(' ')[:max(1, max_tokens)]
+        return [word if i == len(words) - 1 else word + ' ' for i, word in enumerate(words)]
+
+    def start(self) -> 'MockOpenAIServer':
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05},
+                                        name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def __enter__(self) -> 'MockOpenAIServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get request counters
+        Returns:
+            Dictionary with requests, completed, errors, rate_limited and max_in_flight
+        """
+        with self._lock:
+            return {'requests': self.requests, 'completed': self.completed,
+                    'errors': self.errors, 'rate_limited': self.rate_limited,
+                    'max_in_flight': self.max_in_flight}
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Request handler of MockOpenAIServer"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict] = None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str, kind: str, headers: Optional[Dict] = None):
+        self._send_json(status, {'error': {'message': message, 'type': kind}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/v1/models':
+            self._send_json(200, {'object': 'list', 'data': [
+                {'id': 'gpt-4o-mini', 'object': 'model', 'owned_by': 'mock'}]})
+        else:
+            self._error(404, f"Unknown path {self.path}", 'invalid_request_error')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length)
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            self._error(404, f"Unknown path {self.path}", 'invalid_request_error')
+            return
+        try:
+            body = json.loads(raw)
+            messages = body['messages']
+        except (ValueError, KeyError):
+            self._error(400, "Request body must be JSON with messages", 'invalid_request_error')
+            return
+
+        server: MockOpenAIServer = self.server
+        status, latency = server.admit()
+        if status == 429:
+            self._error(429, "Rate limit reached (injected)", 'rate_limit_exceeded',
+                        {'Retry-After': f"{server.retry_after:g}"})
+            return
+        time.sleep(latency)
+        if status == 500:
+            self._error(500, "The server had an error (injected)", 'server_error')
+            return
+
+        # Counted as completed before the last write, so a client that has read the
+        # whole reply always sees it in stats()
+        self._finished = False
+        try:
+            tokens = server.reply_tokens(messages, int(body.get('max_tokens') or 256))
+            model = body.get('model', 'gpt-4o-mini')
+            prompt_tokens = sum(len(str(m.get('content', ''))) // 4 + 4 for m in messages)
+            if body.get('stream'):
+                self._stream(model, tokens, server.token_interval)
+            else:
+                time.sleep(server.token_interval * len(tokens))
+                reply = {
+                    'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': ''.join(tokens)}}],
+                    'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(tokens),
+                              'total_tokens': prompt_tokens + len(tokens)},
+                }
+                self._finish()
+                self._send_json(200, reply)
+        finally:
+            self._finish()
+
+    def _finish(self):
+        """Mark this request done on the server, once"""
+        if not self._finished:
+            self._finished = True
+            self.server.finish()
+
+    def _stream(self, model: str, tokens: List[str], token_interval: float):
+        """Server-sent events, one token per chunk, then [DONE]"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        deltas = [{'role': 'assistant', 'content': ''}] + [{'content': token} for token in tokens]
+        for position, delta in enumerate(deltas):
+            if position > 1:
+                time.sleep(token_interval)
+            chunk = {'id': completion_id, 'object': 'chat.completion.chunk',
+                     'created': int(time.time()), 'model': model,
+                     'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        final = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                 'model': model, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+        self._finish()
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock OpenAI-compatible server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', default='fixed:0.3',
+                        help='Time to first token, e.g. fixed:0.3 or lognormal:0.4,0.5')
+    parser.add_argument('--token-interval', type=float, default=0.02,
+                        help='Seconds between tokens')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of HTTP 500s')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of HTTP 429s')
+    parser.add_argument('--max-concurrent', type=int, default=0,
+                        help='429 beyond this many requests in flight (0 = unlimited)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.host, args.port, LatencyModel.parse(args.latency),
+                              args.token_interval, args.error_rate, args.rate_limit_rate,
+                              args.max_concurrent, seed=args.seed)
+    print(f"Mock OpenAI server on {server.base_url} (latency {server.latency!r})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n{server.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -1,107 +1,296 @@
 import re
-from typing import Dict, Optional, Any
+import types
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Any
 
-def assess_mood(mood_input: str) -> Optional[Dict[str, Any]]:
+# Mood levels, change the verbiage and order to resemble an easier flow for the user
+# Found this emoji feature and thought it added a more personal touch
+# One shared read-only object per level; assess_mood hands out copies
+MOOD_LEVELS = types.MappingProxyType({
+    level: types.MappingProxyType({'level': level, 'description': description, 'emoji': emoji})
+    for level, description, emoji in (
+        (1, 'Very Low', '😔'),
+        (2, 'Low', '😟'),
+        (3, 'Neutral', '😐'),
+        (4, 'Good', '🙂'),
+        (5, 'Very Good', '😊'),
+    )
+})
+
+# Words and phrases for each level, built once at import
+MOOD_LEXICON = types.MappingProxyType({
+    word: MOOD_LEVELS[level]
+    for level, words in (
+        (1, ('1', 'one', 'very low', 'terrible', 'awful', 'horrible', 'depressed', 'hopeless')),
+        (2, ('2', 'two', 'low', 'down', 'sad', 'unhappy', 'blue', 'gloomy', 'bad')),
+        (3, ('3', 'three', 'neutral', 'okay', 'ok', 'fine', 'meh', 'alright', 'so-so', 'so so')),
+        (4, ('4', 'four', 'good', 'happy', 'content', 'pleased', 'satisfied', 'cheerful')),
+        (5, ('5', 'five', 'very good', 'excellent', 'great', 'fantastic', 'wonderful',
+             'amazing', 'ecstatic')),
+    )
+    for word in words
+})
+
+# Words that can come before a mood word, by how they change it:
+# intensifiers move the mood away from neutral, diminishers lower it one level,
+# negations flip it to the other side of neutral at half strength, and hedges
+# and fillers ("pretty good", "i'm feeling sad") leave it unchanged
+MOOD_MODIFIERS = types.MappingProxyType({
+    **dict.fromkeys(('very', 'really', 'so', 'super', 'extremely', 'incredibly', 'too',
+                     'totally', 'truly', 'absolutely', 'terribly', 'awfully'), 'intensifier'),
+    **dict.fromkeys(('a bit', 'a little', 'a little bit', 'slightly', 'kind of', 'kinda',
+                     'sort of', 'sorta', 'somewhat', 'mildly'), 'diminisher'),
+    **dict.fromkeys(('not', 'never', "don't", 'dont', "didn't", 'didnt', "isn't", 'isnt',
+                     'no longer'), 'negation'),
+    **dict.fromkeys(('pretty', 'quite', 'fairly', 'rather', 'mostly', 'just', 'i', "i'm", 'im',
+                     'i am', 'am', 'feel', 'feeling', 'felt', 'doing'), 'hedge'),
+})
+
+# Valence (level - 3) after a negation: "not happy" and "not okay" are Low,
+# "not sad" Neutral and "not terrible" Good
+_NEGATED_VALENCE = {2: -1, 1: -1, 0: -1, -1: 0, -2: 1}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+def _build_phrase_trie() -> Dict:
+    """Word-level trie of mood and modifier phrases; the None key holds (kind, value)"""
+    trie: Dict = {}
+    phrases = [(word, ('mood', mood)) for word, mood in MOOD_LEXICON.items()]
+    phrases += [(phrase, (kind, None)) for phrase, kind in MOOD_MODIFIERS.items()]
+    for phrase, terminal in phrases:
+        node = trie
+        for token in _TOKEN_PATTERN.findall(phrase):
+            node = node.setdefault(token, {})
+        node[None] = terminal
+    return trie
+
+_PHRASE_TRIE = _build_phrase_trie()
+
+def _parse_mood_phrase(mood_input: str) -> Optional[Mapping[str, Any]]:
     """
-    Assess mood from user input (1-5 or keywords)
+    Parse modifiers followed by a mood word in one left-to-right pass
+    Each position takes the longest phrase in the trie ("very good" is a mood,
+    "a little bit" one diminisher); anything unknown, or no mood at the end,
+    makes the input invalid
     Args:
-        mood_input: User's mood input (number 1-5 or keyword)    
+        mood_input: Stripped, lower-case input
     Returns:
-        Dictionary with mood level and description, or None if invalid
+        Read-only mood mapping, or None if the input does not parse
     """
-    if not mood_input:
+    tokens = _TOKEN_PATTERN.findall(mood_input)
+    modifiers = []
+    mood, position = None, 0
+    while position < len(tokens):
+        node, match, end = _PHRASE_TRIE, None, position
+        while end < len(tokens):
+            node = node.get(tokens[end])
+            if node is None:
+                break
+            end += 1
+            if None in node:
+                match = (node[None], end)
+        if match is None:
+            return None
+        (kind, mood), end = match
+        if kind == 'mood' and end < len(tokens) and tokens[position:end] == ['so', 'so']:
+            # "so so happy" is two intensifiers, not the mood "so so"
+            modifiers += ['intensifier', 'intensifier']
+            position = end
+            continue
+        position = end
+        if kind == 'mood':
+            break
+        modifiers.append(kind)
+    if mood is None or position != len(tokens):
         return None
+    if not modifiers:
+        return mood
     
-    # Clean the input
-    mood_input = mood_input.strip().lower()
+    # Apply modifiers from the one nearest the mood word outwards
+    valence = mood['level'] - 3
+    for kind in reversed(modifiers):
+        if kind == 'intensifier':
+            valence += (valence > 0) - (valence < 0)
+        elif kind == 'diminisher':
+            valence -= 1
+        elif kind == 'negation':
+            valence = _NEGATED_VALENCE[valence]
+        valence = max(-2, min(2, valence))
     
-    # Mood mappings, change the verbiage and order to resemble an easier flow for the user
-    # Found this emoji feature and thought it added a more personal touch
-    mood_map = {
-        # Level 1: Very low mood
-        '1': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
-        'one': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
-        'very low': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
-        'terrible': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
-        'awful': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
-        'horrible': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
-        'depressed': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
-        'hopeless': {'level': 1, 'description': 'Very Low', 'emoji': '😔'},
-        
-        # Level 2: Low mood
-        '2': {'level': 2, 'description': 'Low', 'emoji': '😟'},
-        'two': {'level': 2, 'description': 'Low', 'emoji': '😟'},
-        'low': {'level': 2, 'description': 'Low', 'emoji': '😟'},
-        'down': {'level': 2, 'description': 'Low', 'emoji': '😟'},
-        'sad': {'level': 2, 'description': 'Low', 'emoji': '😟'},
-        'unhappy': {'level': 2, 'description': 'Low', 'emoji': '😟'},
-        'blue': {'level': 2, 'description': 'Low', 'emoji': '😟'},
-        'gloomy': {'level': 2, 'description': 'Low', 'emoji': '😟'},
-        
-        # Level 3: Neutral mood
-        '3': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
-        'three': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
-        'neutral': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
-        'okay': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
-        'fine': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
-        'meh': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
-        'alright': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
-        'so-so': {'level': 3, 'description': 'Neutral', 'emoji': '😐'},
-        
-        # Level 4: Good mood
-        '4': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
-        'four': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
-        'good': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
-        'happy': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
-        'content': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
-        'pleased': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
-        'satisfied': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
-        'cheerful': {'level': 4, 'description': 'Good', 'emoji': '🙂'},
-        
-        # Level 5: Very good mood
-        '5': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-        'five': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-        'very good': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-        'excellent': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-        'great': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-        'fantastic': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-        'wonderful': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-        'amazing': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-        'ecstatic': {'level': 5, 'description': 'Very Good', 'emoji': '😊'},
-    }
+    level = MOOD_LEVELS[valence + 3]
+    if set(modifiers) <= {'diminisher', 'hedge'} and 'diminisher' in modifiers:
+        # "a bit happy" keeps its wording, e.g. Slightly Good
+        return types.MappingProxyType({'level': level['level'],
+                                       'description': 'Slightly ' + mood['description'],
+                                       'emoji': mood['emoji']})
+    return level
+
+def edit_distance(first: str, second: str) -> int:
+    """
+    Levenshtein distance between two words
+    Args:
+        first: A word
+        second: Another word
+    Returns:
+        Minimum number of single-character insertions, deletions and substitutions
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    previous = list(range(len(second) + 1))
+    for row, char in enumerate(first, 1):
+        current = [row]
+        for column, other in enumerate(second, 1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1,
+                               previous[column - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+class _BKTree:
+    """
+    Burkhard-Keller tree of words under edit distance
+    A search only descends into children whose edge distance is within the
+    bound of the query's distance to the node (triangle inequality), so most
+    of the lexicon is never compared
+    """
+    
+    def __init__(self, words: Iterable[str]):
+        self._root = None
+        for word in words:
+            self.add(word)
+    
+    def add(self, word: str):
+        """Insert a word"""
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+    
+    def search(self, word: str, max_distance: int) -> List[tuple]:
+        """
+        Find words within an edit distance
+        Args:
+            word: Query word
+            max_distance: Largest distance to accept
+        Returns:
+            List of (distance, word) pairs, closest first
+        """
+        matches = []
+        pending = [self._root] if self._root is not None else []
+        while pending:
+            candidate, children = pending.pop()
+            distance = edit_distance(word, candidate)
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+            for edge in range(distance - max_distance, distance + max_distance + 1):
+                child = children.get(edge)
+                if child is not None:
+                    pending.append(child)
+        return sorted(matches)
+
+# Single mood words that misspellings are corrected to (not the spelled-out
+# numbers, which are too close to everyday words like "tired" -> "three")
+_MOOD_WORD_TREE = _BKTree(word for word in MOOD_LEXICON if word.isalpha()
+                          and word not in ('one', 'two', 'three', 'four', 'five'))
+_MOOD_WORD_ORDER = {word: rank for rank, word in enumerate(MOOD_LEXICON)}
+
+def _fuzzy_mood(mood_input: str) -> Optional[Mapping[str, Any]]:
+    """
+    Correct a misspelled final mood word ("hapy", "very depresed") and parse again
+    Words up to 6 letters may be one edit off, longer ones two; typos shorter
+    than 4 letters are not corrected ("mad", "sat" and "god" are words of their
+    own). Ties between words of different levels are left unresolved rather
+    than guessed.
+    Args:
+        mood_input: Stripped, lower-case input that did not parse
+    Returns:
+        Read-only mood mapping with 'matched' (the corrected word) and
+        'confidence' (1 - edits / word length), or None
+    """
+    tokens = _TOKEN_PATTERN.findall(mood_input)
+    if not tokens:
+        return None
+    typo = tokens[-1]
+    if len(typo) < 4 or not typo.isalpha() or typo in _PHRASE_TRIE:
+        return None
     
-    # Check if input is in mood map
-    if mood_input in mood_map:
-        return mood_map[mood_input]
+    matches = _MOOD_WORD_TREE.search(typo, 1 if len(typo) <= 6 else 2)
+    if not matches:
+        return None
+    best = [word for distance, word in matches if distance == matches[0][0]]
+    if len({MOOD_LEXICON[word]['level'] for word in best}) > 1:
+        return None
+    word = min(best, key=_MOOD_WORD_ORDER.get)
+    
+    mood = _parse_mood_phrase(' '.join(tokens[:-1] + [word]))
+    if mood is None:
+        return None
+    confidence = 1 - matches[0][0] / max(len(typo), len(word))
+    return types.MappingProxyType({**mood, 'matched': word, 'confidence': round(confidence, 2)})
+
+@lru_cache(maxsize=4096)
+def _lookup_mood(mood_input: str) -> Optional[Mapping[str, Any]]:
+    """
+    Resolve normalized mood input to a read-only mood, memoized
+    Args:
+        mood_input: Stripped, lower-case input
+    Returns:
+        Read-only mood mapping, or None if invalid
+    """
+    mood = MOOD_LEXICON.get(mood_input)
+    if mood is not None:
+        return mood
     
     # Check for numeric input that might have spaces or special characters
     if mood_input.isdigit():
-        mood_num = int(mood_input)
-        if 1 <= mood_num <= 5:
-            return mood_map[str(mood_num)]
-    
-    # Check for "very" patterns
-    if mood_input.startswith('very '):
-        base_mood = mood_input[5:]
-        if base_mood in mood_map:
-            result = mood_map[base_mood].copy()
-            result['level'] = min(5, result['level'] + 1)
-            result['description'] = 'Very ' + result['description']
-            return result
+        return MOOD_LEVELS.get(int(mood_input))
     
-    # Check for "a bit" or "slightly" patterns
-    bit_patterns = ['a bit ', 'slightly ', 'kind of ', 'sort of ']
-    for pattern in bit_patterns:
-        if mood_input.startswith(pattern):
-            base_mood = mood_input[len(pattern):]
-            if base_mood in mood_map:
-                result = mood_map[base_mood].copy()
-                result['level'] = max(1, result['level'] - 1)
-                result['description'] = 'Slightly ' + result['description']
-                return result
+    # Modifier phrases like "very sad", "not too bad" or "a little bit happy"
+    mood = _parse_mood_phrase(mood_input)
+    if mood is not None:
+        return mood
     
-    # If no match found
-    return None
+    # Misspelled mood words, e.g. "hapy" or "exellent"
+    return _fuzzy_mood(mood_input)
+
+def assess_mood(mood_input: str) -> Optional[Dict[str, Any]]:
+    """
+    Assess mood from user input (1-5 or keywords)
+    Args:
+        mood_input: User's mood input (number 1-5, keyword, or a keyword with
+                    modifiers such as "very sad" or "not too bad")
+    Returns:
+        Dictionary with mood level and description, or None if invalid.
+        Misspelled keywords are corrected; those results also carry 'matched'
+        (the keyword used) and 'confidence' (0-1)
+    """
+    if not mood_input:
+        return None
+    mood = _lookup_mood(mood_input.strip().lower())
+    return dict(mood) if mood is not None else None
+
+def assess_moods(mood_inputs: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Assess many mood inputs at once, e.g. when re-analysing saved journals
+    Args:
+        mood_inputs: Iterable of mood inputs (numbers 1-5 or keywords)
+    Returns:
+        List of mood dictionaries (None for invalid inputs), in input order
+    """
+    lookup = _lookup_mood
+    results = []
+    for mood_input in mood_inputs:
+        mood = lookup(mood_input.strip().lower()) if mood_input else None
+        results.append(dict(mood) if mood is not None else None)
+    return results
 
 def display_mood_scale() -> str:
     """
@@ -0,0 +1,296 @@
+import datetime
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .mood_assessment import MOOD_LEVELS, assess_moods
+except ImportError:
+    from mood_assessment import MOOD_LEVELS, assess_moods
+
+DAY = 86400
+WEEK = 7 * DAY
+
+# Smoothing factor of the exponentially weighted moving average (weight of the newest check-in)
+DEFAULT_ALPHA = 0.3
+
+# Rolling standard deviation above which the mood is described as changeable
+VOLATILE_STD = 1.0
+
+
+def entry_timestamp(date: str) -> Optional[int]:
+    """
+    Timestamp of a check-in, at day resolution like the journal's dates
+    Args:
+        date: Journal date, starting MM/DD/YYYY ("12/14/2025" or "12/14/2025 05:38 PM")
+    Returns:
+        Epoch seconds at local midnight of that day, or None if the date is unreadable
+    """
+    try:
+        day = datetime.datetime.strptime(date[:10], "%m/%d/%Y")
+    except (TypeError, ValueError):
+        return None
+    return int(day.timestamp())
+
+
+class MoodSeries:
+    """
+    Compact time series of one user's mood check-ins
+    Timestamps (int64 epoch seconds) and levels (int8) are kept in typed
+    arrays read by NumPy without copying. Prefix sums of level and level²
+    and the EWMA are extended on every append, so rolling and windowed
+    statistics are vectorized differences that never rescan the history.
+    """
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA):
+        """
+        Create an empty series
+        Args:
+            alpha: EWMA weight of the newest check-in (0-1)
+        Raises:
+            ValueError: If alpha is not in (0, 1]
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self._times = array('q')
+        self._levels = array('b')
+        self._sums = array('q', [0])       # _sums[i] = sum of the first i levels
+        self._squares = array('q', [0])    # Same for squared levels
+        self._ewma = array('d')
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict], alpha: float = DEFAULT_ALPHA) -> 'MoodSeries':
+        """
+        Build a series from parsed journal entries (see app._parse_journal_entries)
+        Args:
+            entries: Entry dictionaries; those with a 'mood' description and a
+                     'date' starting MM/DD/YYYY are used
+            alpha: EWMA weight of the newest check-in
+        Returns:
+            MoodSeries in journal order
+        """
+        dated = []
+        for entry in entries:
+            if not entry.get('mood') or not entry.get('date'):
+                continue
+            timestamp = entry_timestamp(entry['date'])
+            if timestamp is not None:
+                dated.append((timestamp, entry['mood']))
+
+        series = cls(alpha)
+        moods = assess_moods(description for _, description in dated)
+        for (timestamp, _), mood in zip(dated, moods):
+            if mood is not None:
+                series.append(timestamp, mood['level'])
+        return series
+
+    def append(self, timestamp: float, level: int):
+        """
+        Add a check-in, updating the prefix sums and EWMA in O(1)
+        Args:
+            timestamp: Epoch seconds (an earlier time than the last check-in is
+                       moved up to it, keeping the series sorted)
+            level: Mood level 1-5
+        Raises:
+            ValueError: If level is outside 1-5
+        """
+        if level not in MOOD_LEVELS:
+            raise ValueError(f"mood level must be 1-5, got {level!r}")
+        with self._lock:
+            timestamp = int(timestamp)
+            if self._times and timestamp < self._times[-1]:
+                timestamp = self._times[-1]
+            self._times.append(timestamp)
+            self._levels.append(level)
+            self._sums.append(self._sums[-1] + level)
+            self._squares.append(self._squares[-1] + level * level)
+            previous = self._ewma[-1] if self._ewma else level
+            self._ewma.append(self.alpha * level + (1 - self.alpha) * previous)
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copy of the series
+        Returns:
+            (timestamps as int64, levels as int8)
+        """
+        with self._lock:
+            return (np.frombuffer(self._times, dtype=np.int64).copy(),
+                    np.frombuffer(self._levels, dtype=np.int8).copy())
+
+    def ewma(self) -> np.ndarray:
+        """EWMA after each check-in, oldest first"""
+        with self._lock:
+            return np.frombuffer(self._ewma, dtype=np.float64).copy()
+
+    def _rolling(self, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-check-in count, sum and sum of squares over the last `window` check-ins"""
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        with self._lock:
+            sums = np.frombuffer(self._sums, dtype=np.int64)
+            squares = np.frombuffer(self._squares, dtype=np.int64)
+            end = np.arange(1, len(sums))
+            start = np.maximum(end - window, 0)
+            return end - start, sums[end] - sums[start], squares[end] - squares[start]
+
+    def rolling_mean(self, window: int = 7) -> np.ndarray:
+        """
+        Mean level over the last `window` check-ins, at each check-in
+        Args:
+            window: Number of check-ins per window
+        Returns:
+            float64 array, one value per check-in
+        """
+        counts, sums, _ = self._rolling(window)
+        return sums / np.maximum(counts, 1)
+
+    def rolling_volatility(self, window: int = 7) -> np.ndarray:
+        """
+        Standard deviation of the level over the last `window` check-ins
+        Args:
+            window: Number of check-ins per window
+        Returns:
+            float64 array, one value per check-in
+        """
+        counts, sums, squares = self._rolling(window)
+        counts = np.maximum(counts, 1)
+        means = sums / counts
+        return np.sqrt(np.maximum(squares / counts - means * means, 0.0))
+
+    def window_stats(self, start: float, end: float) -> Tuple[int, float, float]:
+        """
+        Statistics of the check-ins in a time range, in O(log n)
+        Args:
+            start: Range start, epoch seconds (inclusive)
+            end: Range end, epoch seconds (exclusive)
+        Returns:
+            (count, mean, standard deviation) - mean and deviation are NaN when empty
+        """
+        with self._lock:
+            times = np.frombuffer(self._times, dtype=np.int64)
+            first, last = np.searchsorted(times, [start, end], side='left')
+            count = int(last - first)
+            if count == 0:
+                return 0, float('nan'), float('nan')
+            total = self._sums[last] - self._sums[first]
+            squares = self._squares[last] - self._squares[first]
+        mean = total / count
+        return count, mean, max(squares / count - mean * mean, 0.0) ** 0.5
+
+    def weekly_means(self, weeks: int = 4, now: Optional[float] = None) -> np.ndarray:
+        """
+        Mean level of each of the last `weeks` 7-day periods ending now
+        Args:
+            weeks: Number of periods
+            now: End of the last period, epoch seconds (defaults to the current time)
+        Returns:
+            float64 array, oldest period first (NaN for periods without check-ins)
+        """
+        now = time.time() if now is None else now
+        edges = now - WEEK * np.arange(weeks, -1, -1)
+        with self._lock:
+            times = np.frombuffer(self._times, dtype=np.int64)
+            sums = np.frombuffer(self._sums, dtype=np.int64)
+            positions = np.searchsorted(times, edges, side='left')
+            counts = np.diff(positions)
+            totals = np.diff(sums[positions])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+    def week_over_week(self, weeks: int = 4, now: Optional[float] = None) -> np.ndarray:
+        """
+        Change of the weekly mean from each week to the next
+        Args:
+            weeks: Number of periods compared (weeks - 1 deltas)
+            now: End of the last period, epoch seconds (defaults to the current time)
+        Returns:
+            float64 array of deltas, oldest first (NaN where a week has no check-ins)
+        """
+        return np.diff(self.weekly_means(weeks, now))
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Current trend figures
+        Args:
+            now: Reference time, epoch seconds (defaults to the current time)
+        Returns:
+            Dictionary with count, latest, ewma, week_count, week_mean, week_std
+            and week_delta (None where there is no data)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            count = len(self._levels)
+            latest = self._levels[-1] if count else None
+            ewma = self._ewma[-1] if count else None
+        week_count, week_mean, week_std = self.window_stats(now - WEEK, now + 1)
+        delta = self.week_over_week(2, now + 1)[0]
+        return {
+            'count': count,
+            'latest': latest,
+            'ewma': ewma,
+            'week_count': week_count,
+            'week_mean': None if week_count == 0 else week_mean,
+            'week_std': None if week_count == 0 else week_std,
+            'week_delta': None if np.isnan(delta) else float(delta),
+        }
+
+    def describe(self, now: Optional[float] = None) -> Optional[str]:
+        """
+        One-sentence mood trend for recaps and chat context
+        Args:
+            now: Reference time, epoch seconds (defaults to the current time)
+        Returns:
+            Trend sentence, or None if there are no check-ins
+        """
+        stats = self.summary(now)
+        if stats['count'] == 0:
+            return None
+        if stats['week_count'] == 0:
+            return (f"No mood check-ins in the last 7 days; the most recent was "
+                    f"{MOOD_LEVELS[stats['latest']]['description']}.")
+
+        plural = 's' if stats['week_count'] != 1 else ''
+        parts = [f"Mood averaged {stats['week_mean']:.1f}/5 over the last 7 days "
+                 f"({stats['week_count']} check-in{plural})"]
+        delta = stats['week_delta']
+        if delta is not None:
+            if abs(delta) < 0.25:
+                parts.append("about the same as the week before")
+            else:
+                parts.append(f"{'up' if delta > 0 else 'down'} {abs(delta):.1f} from the week before")
+        if stats['week_count'] > 1:
+            parts.append("changeable from day to day" if stats['week_std'] >= VOLATILE_STD
+                         else "fairly steady")
+        parts.append(f"recent trend {stats['ewma']:.1f}/5")
+        return ", ".join(parts) + "."
+
+    def reflect(self, now: Optional[float] = None) -> Optional[str]:
+        """
+        The week's mood trend in the warm wording of the rule-based recap
+        Args:
+            now: Reference time, epoch seconds (defaults to the current time)
+        Returns:
+            Reflection sentence, or None without check-ins in the last 7 days
+        """
+        stats = self.summary(now)
+        if stats['week_count'] == 0:
+            return None
+        delta = stats['week_delta']
+        if delta is not None and delta >= 0.25:
+            text = "Your mood has been lifting compared with the week before - notice what has been helping."
+        elif delta is not None and delta <= -0.25:
+            text = ("Your mood has dipped a little compared with the week before. Be gentle with "
+                    "yourself; harder weeks are part of the rhythm too.")
+        else:
+            text = "Your mood has stayed fairly even this week."
+        if stats['week_count'] > 1 and stats['week_std'] >= VOLATILE_STD:
+            text += " It has also moved around from day to day, which is worth being curious about."
+        return text
@@ -0,0 +1,110 @@
+import importlib.util
+import os
+import threading
+from typing import Any, Dict
+
+# Only check whether the package exists; the (slow) import happens on first AI use
+OPENAI_AVAILABLE = importlib.util.find_spec('openai') is not None
+
+# Connection pool and timeout settings shared by every chatbot instance
+_settings = {
+    'max_connections': int(os.getenv('JOURNAL_HTTP_MAX_CONNECTIONS', '20')),
+    'max_keepalive_connections': int(os.getenv('JOURNAL_HTTP_MAX_KEEPALIVE', '10')),
+    'keepalive_expiry': float(os.getenv('JOURNAL_HTTP_KEEPALIVE_EXPIRY', '60')),
+    'timeout': float(os.getenv('JOURNAL_HTTP_TIMEOUT', '30')),
+    'connect_timeout': float(os.getenv('JOURNAL_HTTP_CONNECT_TIMEOUT', '5')),
+    'max_retries': int(os.getenv('JOURNAL_HTTP_MAX_RETRIES', '2')),
+}
+
+_client = None
+_client_error = None      # Why the last attempt to create the client failed
+_client_lock = threading.Lock()
+
+def configure_client(**settings: Any):
+    """
+    Change connection pool and timeout settings
+    The shared client is rebuilt on next use if it already exists
+    Args:
+        settings: Any of max_connections, max_keepalive_connections, keepalive_expiry,
+                  timeout, connect_timeout, max_retries
+    """
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    _settings.update(settings)
+    reset_client()
+
+def get_client_settings() -> Dict[str, Any]:
+    """Get a copy of the current connection pool and timeout settings"""
+    return dict(_settings)
+
+def _build_http_client(openai_module):
+    """Build a keep-alive HTTP client with the configured pool, or None if httpx is missing"""
+    try:
+        import httpx
+    except ImportError:
+        return None
+
+    limits = httpx.Limits(
+        max_connections=_settings['max_connections'],
+        max_keepalive_connections=_settings['max_keepalive_connections'],
+        keepalive_expiry=_settings['keepalive_expiry'],
+    )
+    timeout = httpx.Timeout(_settings['timeout'], connect=_settings['connect_timeout'])
+    return openai_module.DefaultHttpxClient(limits=limits, timeout=timeout)
+
+def get_openai_client():
+    """
+    Get the process-wide OpenAI client, creating it on first call
+    Every chatbot instance and session shares its HTTP connection pool,
+    so TLS setup is paid once per connection rather than once per instance.
+    Nothing is printed, as this may run on the prewarm thread while the user
+    is typing; a failure is kept for get_client_error()
+    Returns:
+        openai.OpenAI client, or None if the package or API key is unavailable
+    """
+    global _client, _client_error
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not OPENAI_AVAILABLE or not api_key:
+            return None
+
+        try:
+            import openai
+            kwargs = {
+                'api_key': api_key,
+                'timeout': _settings['timeout'],
+                'max_retries': _settings['max_retries'],
+            }
+            http_client = _build_http_client(openai)
+            if http_client is not None:
+                kwargs['http_client'] = http_client
+            _client = openai.OpenAI(**kwargs)
+            _client_error = None
+        except Exception as e:
+            _client_error = f"Failed to initialize OpenAI client: {e}"
+            return None
+
+    return _client
+
+def get_client_error():
+    """Why the shared client could not be created, or None"""
+    return _client_error
+
+def reset_client():
+    """Close and drop the shared client (the next AI call creates a new one)"""
+    global _client, _client_error
+    with _client_lock:
+        if _client is not None:
+            try:
+                _client.close()
+            except Exception:
+                pass
+        _client = None
+        _client_error = None
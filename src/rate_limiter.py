@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted before its deadline"""
+
+
+def estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """
+    Rough token cost of a chat completion (prompt at ~4 characters per token plus the reply limit)
+    Args:
+        messages: OpenAI style message list
+        max_tokens: Completion token limit
+    Returns:
+        Estimated total tokens
+    """
+    prompt = sum(len(str(message.get('content', ''))) // 4 + 4 for message in messages)
+    return prompt + max_tokens
+
+
+class _TokenBucket:
+    """Continuously refilling bucket; callers hold the limiter's lock"""
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated')
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount is available (after refill)"""
+        missing = amount - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+
+class Permit:
+    """Admission to make one API call; release it (or use it as a context manager) when done"""
+
+    __slots__ = ('_limiter', 'tokens', 'wait_seconds', '_released')
+
+    def __init__(self, limiter: 'RateLimiter', tokens: int, wait_seconds: float):
+        self._limiter = limiter
+        self.tokens = tokens
+        self.wait_seconds = wait_seconds
+        self._released = False
+
+    def settle(self, actual_tokens: int):
+        """
+        Correct the token bucket once the real usage is known
+        Args:
+            actual_tokens: Tokens the provider reported for the call
+        """
+        self._limiter._settle(self.tokens, actual_tokens)
+        self.tokens = actual_tokens
+
+    def release(self):
+        """Free the in-flight slot (idempotent)"""
+        if not self._released:
+            self._released = True
+            self._limiter._release()
+
+    def __enter__(self) -> 'Permit':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class RateLimiter:
+    """
+    Shared admission control for model calls
+    Requests-per-minute and tokens-per-minute token buckets plus a cap on
+    calls in flight. Callers queue until admitted or until their deadline;
+    when the buckets cannot refill before the deadline the request is
+    rejected right away so the caller can fall back early.
+    """
+
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 200000,
+                 max_in_flight: int = 8, timeout: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Create a rate limiter
+        Args:
+            requests_per_minute: Request budget (also the burst size)
+            tokens_per_minute: Token budget (also the burst size)
+            max_in_flight: Most calls running at once
+            timeout: Default seconds a request may wait to be admitted
+            clock: Monotonic time source
+        """
+        if requests_per_minute <= 0 or tokens_per_minute <= 0 or max_in_flight < 1:
+            raise ValueError("rate limits must be positive")
+        self._clock = clock
+        now = clock()
+        self._requests = _TokenBucket(requests_per_minute, now)
+        self._tokens = _TokenBucket(tokens_per_minute, now)
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self._condition = threading.Condition()
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> Permit:
+        """
+        Wait for admission
+        Args:
+            tokens: Estimated tokens the call will use
+            timeout: Seconds to wait at most (defaults to the limiter timeout)
+        Returns:
+            Permit to release when the call finishes
+        Raises:
+            RateLimitExceeded: If the request cannot be admitted in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        # A request larger than the whole budget is charged the full budget
+        cost = min(max(0, tokens), self._tokens.capacity)
+        started = self._clock()
+        deadline = started + timeout
+
+        with self._condition:
+            self.waiting += 1
+            try:
+                while True:
+                    now = self._clock()
+                    self._requests.refill(now)
+                    self._tokens.refill(now)
+                    refill_wait = max(self._requests.wait_time(1), self._tokens.wait_time(cost))
+                    slot_free = self.in_flight < self.max_in_flight
+
+                    if slot_free and refill_wait == 0:
+                        self._requests.tokens -= 1
+                        self._tokens.tokens -= cost
+                        self.in_flight += 1
+                        break
+
+                    remaining = deadline - now
+                    # Fail fast when the buckets cannot refill before the deadline
+                    if remaining <= 0 or refill_wait > remaining:
+                        self.rejected += 1
+                        raise RateLimitExceeded(
+                            f"Rate limit: request not admitted within {timeout:.1f}s "
+                            f"({self.waiting - 1} queued, {self.in_flight} in flight)")
+                    # Wake up on a released slot or once the buckets have refilled
+                    self._condition.wait(refill_wait if slot_free else remaining)
+            finally:
+                self.waiting -= 1
+
+            waited = self._clock() - started
+            self.admitted += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return Permit(self, cost, waited)
+
+    def _release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _settle(self, estimated: float, actual: float):
+        with self._condition:
+            self._tokens.tokens = min(self._tokens.capacity,
+                                      self._tokens.tokens + estimated - actual)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue and admission metrics
+        Returns:
+            Dictionary with queue depth, in-flight calls, admitted/rejected counts
+            and wait times in seconds
+        """
+        with self._condition:
+            return {
+                'queue_depth': self.waiting,
+                'in_flight': self.in_flight,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'avg_wait': self.total_wait / self.admitted if self.admitted else 0.0,
+                'max_wait': self.max_wait,
+            }
+
+
+def rate_limiter_from_env() -> Optional[RateLimiter]:
+    """
+    Build the shared rate limiter from environment settings
+    JOURNAL_RATE_LIMIT=off disables it; JOURNAL_RATE_RPM, JOURNAL_RATE_TPM,
+    JOURNAL_MAX_IN_FLIGHT and JOURNAL_RATE_TIMEOUT set the limits
+    Returns:
+        A RateLimiter, or None when rate limiting is turned off
+    """
+    if os.getenv('JOURNAL_RATE_LIMIT', 'on').strip().lower() in ('off', '0', 'false', 'no'):
+        return None
+    return RateLimiter(
+        requests_per_minute=float(os.getenv('JOURNAL_RATE_RPM', '500')),
+        tokens_per_minute=float(os.getenv('JOURNAL_RATE_TPM', '200000')),
+        max_in_flight=int(os.getenv('JOURNAL_MAX_IN_FLIGHT', '8')),
+        timeout=float(os.getenv('JOURNAL_RATE_TIMEOUT', '5')),
+    )
+
+
+# Shared by every chatbot in the process, since provider limits are per API key
+shared_rate_limiter = rate_limiter_from_env()
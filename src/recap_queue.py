@@ -0,0 +1,238 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+try:
+    from .recap_speculator import fingerprint_entries
+except ImportError:
+    from recap_speculator import fingerprint_entries
+
+
+class DeferredRecap(NamedTuple):
+    """An AI recap waiting for the backend to come back"""
+    journal: str
+    entries: List[Dict]
+    fingerprint: str
+    requested: float     # When the user asked for the recap (epoch seconds)
+    attempts: int
+
+
+class RecapQueue:
+    """
+    Durable queue of AI recaps that could not be generated
+    Jobs live in sqlite, so they survive restarts. There is at most one job
+    per journal; a newer request replaces the entries of a pending one. A
+    drain retries due jobs, hands finished recaps to a deliver callback and
+    backs off exponentially while the backend keeps failing.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, retry_base: float = 30.0,
+                 retry_max: float = 3600.0, max_attempts: int = 48,
+                 clock: Callable[[], float] = time.time):
+        """
+        Create or open a queue
+        Args:
+            db_path: sqlite file (None keeps the queue in memory)
+            retry_base: Seconds before the first retry, doubled per failure
+            retry_max: Longest wait between retries
+            max_attempts: Failures after which a job is dropped
+            clock: Time source, injectable for testing
+        """
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_attempts = max(1, max_attempts)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        # Outcome counters
+        self.enqueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path or ':memory:', check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS deferred_recaps ("
+            "journal TEXT PRIMARY KEY, entries TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "requested REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt REAL NOT NULL, last_error TEXT)"
+        )
+        self._db.commit()
+
+    def enqueue(self, journal: str, entries: List[Dict]) -> DeferredRecap:
+        """
+        Queue a recap for later, replacing the entries of a pending one
+        Args:
+            journal: Journal identifier (the user's name)
+            entries: Entries the recap is generated from
+        Returns:
+            The queued job
+        """
+        now = self._clock()
+        fingerprint = fingerprint_entries(entries)
+        with self._lock:
+            # Keep the original request time, but retry the new entries right away
+            self._db.execute(
+                "INSERT INTO deferred_recaps (journal, entries, fingerprint, requested, next_attempt) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(journal) DO UPDATE SET "
+                "entries = excluded.entries, fingerprint = excluded.fingerprint, "
+                "attempts = 0, next_attempt = excluded.next_attempt",
+                (journal, json.dumps(entries, default=str), fingerprint, now, now)
+            )
+            self._db.commit()
+            self.enqueued += 1
+            row = self._db.execute("SELECT requested FROM deferred_recaps WHERE journal = ?",
+                                   (journal,)).fetchone()
+        return DeferredRecap(journal, entries, fingerprint, row[0], 0)
+
+    def pending(self, due_only: bool = False) -> List[DeferredRecap]:
+        """
+        List queued jobs, oldest request first
+        Args:
+            due_only: Only jobs whose retry time has come
+        Returns:
+            Queued jobs
+        """
+        query = "SELECT journal, entries, fingerprint, requested, attempts FROM deferred_recaps"
+        params = ()
+        if due_only:
+            query += " WHERE next_attempt <= ?"
+            params = (self._clock(),)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY requested", params).fetchall()
+        return [DeferredRecap(journal, json.loads(entries), fingerprint, requested, attempts)
+                for journal, entries, fingerprint, requested, attempts in rows]
+
+    def _complete(self, job: DeferredRecap):
+        """Remove a finished job unless newer entries replaced it meanwhile"""
+        with self._lock:
+            self._db.execute("DELETE FROM deferred_recaps WHERE journal = ? AND fingerprint = ?",
+                             (job.journal, job.fingerprint))
+            self._db.commit()
+            self.completed += 1
+
+    def _retry(self, job: DeferredRecap, error: Exception):
+        """Schedule the next attempt with exponential backoff, or drop the job"""
+        attempts = job.attempts + 1
+        with self._lock:
+            self.failed += 1
+            if attempts >= self.max_attempts:
+                self._db.execute("DELETE FROM deferred_recaps WHERE journal = ? AND fingerprint = ?",
+                                 (job.journal, job.fingerprint))
+                self.dropped += 1
+            else:
+                delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+                self._db.execute(
+                    "UPDATE deferred_recaps SET attempts = ?, next_attempt = ?, last_error = ? "
+                    "WHERE journal = ? AND fingerprint = ?",
+                    (attempts, self._clock() + delay, str(error)[:500], job.journal, job.fingerprint)
+                )
+            self._db.commit()
+
+    def drain(self, generate: Callable[[List[Dict]], str],
+              deliver: Callable[[DeferredRecap, str], Any]) -> int:
+        """
+        Complete the jobs that are due
+        Stops at the first failure, since the backend is most likely still down
+        Args:
+            generate: Produces the AI recap from entries; raises if it cannot
+            deliver: Stores a finished recap (e.g. appends it to the journal)
+        Returns:
+            Number of recaps delivered
+        """
+        delivered = 0
+        with self._drain_lock:
+            for job in self.pending(due_only=True):
+                try:
+                    recap = generate(job.entries)
+                    deliver(job, recap)
+                except Exception as e:
+                    self._retry(job, e)
+                    break
+                self._complete(job)
+                delivered += 1
+        return delivered
+
+    def start(self, generate: Callable[[List[Dict]], str],
+              deliver: Callable[[DeferredRecap, str], Any],
+              interval: float = 60.0) -> threading.Thread:
+        """
+        Drain in a background thread, right away and then every interval seconds
+        Args:
+            generate: See drain
+            deliver: See drain
+            interval: Seconds between drains
+        Returns:
+            The worker thread (already running if it was started before)
+        """
+        if self._worker is not None and self._worker.is_alive():
+            return self._worker
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.drain(generate, deliver)
+                except sqlite3.Error as e:
+                    print(f"Warning: deferred recap queue error: {e}")
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._worker = threading.Thread(target=run, name="recap-drain", daemon=True)
+        self._worker.start()
+        return self._worker
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background drain"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM deferred_recaps").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get queue counters
+        Returns:
+            Dictionary with pending jobs and enqueued, completed, failed and dropped counts
+        """
+        return {
+            'pending': len(self),
+            'enqueued': self.enqueued,
+            'completed': self.completed,
+            'failed': self.failed,
+            'dropped': self.dropped,
+        }
+
+    def close(self):
+        """Stop the drain and close the database"""
+        self.stop(timeout=5)
+        with self._lock:
+            self._db.close()
+
+
+def recap_queue_from_env() -> Optional[RecapQueue]:
+    """
+    Open the deferred recap queue from environment settings
+    JOURNAL_RECAP_QUEUE_PATH sets the sqlite file (default recap_queue.db in the working
+    directory, ignored by git); 'off' disables it
+    Returns:
+        A RecapQueue, or None when deferral is turned off
+    """
+    path = os.getenv('JOURNAL_RECAP_QUEUE_PATH', 'recap_queue.db').strip()
+    if path.lower() in ('off', '0', 'false', 'no', ''):
+        return None
+    return RecapQueue(path)
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from .chatbot import RecapResult
+except ImportError:
+    from chatbot import RecapResult
+
+
+def fingerprint_entries(entries: List[Dict]) -> str:
+    """
+    Build a stable fingerprint of the entries a recap is generated from
+    Args:
+        entries: Recap entry dictionaries
+    Returns:
+        Hex digest that changes whenever an entry is added or edited
+    """
+    payload = json.dumps(entries, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _SpeculativeJob:
+    """A recap being computed ahead of time for one journal"""
+
+    __slots__ = ('fingerprint', 'future')
+
+    def __init__(self, fingerprint: str, future: Future):
+        self.fingerprint = fingerprint
+        self.future = future
+
+
+class RecapSpeculator:
+    """Computes weekly recaps in a worker thread before the user asks for them"""
+
+    def __init__(self, generate: Callable[[List[Dict]], RecapResult], max_wasted: int = 3):
+        """
+        Create a speculator
+        Args:
+            generate: Function producing a recap from entries (e.g. chatbot.compose_weekly_recap)
+            max_wasted: Stop speculating after this many results were thrown away
+                        (including AI recaps that failed)
+        """
+        self.generate = generate
+        self.max_wasted = max_wasted
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recap-speculator")
+        self._jobs: Dict[str, _SpeculativeJob] = {}
+        self._lock = threading.Lock()
+
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+        self.cancelled = 0
+
+    def schedule(self, key: str, entries: List[Dict]) -> bool:
+        """
+        Start computing the recap for a journal, superseding any older speculation
+        Args:
+            key: Journal identifier (the user's name)
+            entries: Entries the recap would be generated from
+        Returns:
+            True if a new speculative job was started
+        """
+        if not entries:
+            return False
+
+        fingerprint = fingerprint_entries(entries)
+        with self._lock:
+            current = self._jobs.get(key)
+            if current is not None and current.fingerprint == fingerprint:
+                return False            # Already computing this exact recap
+            if current is not None:
+                self._discard(current)
+            if self.wasted >= self.max_wasted:
+                self._jobs.pop(key, None)
+                return False
+
+            future = self._executor.submit(self.generate, list(entries))
+            self._jobs[key] = _SpeculativeJob(fingerprint, future)
+            self.started += 1
+            return True
+
+    def invalidate(self, key: str):
+        """
+        Drop the speculative recap for a journal (e.g. after a new entry is written)
+        Args:
+            key: Journal identifier
+        """
+        with self._lock:
+            job = self._jobs.pop(key, None)
+            if job is not None:
+                self._discard(job)
+
+    def _discard(self, job: _SpeculativeJob):
+        """Cancel a queued job or count a started one as wasted"""
+        if job.future.cancel():
+            self.cancelled += 1
+        else:
+            self.wasted += 1
+
+    def take(self, key: str, entries: List[Dict],
+             timeout: Optional[float] = None) -> Optional[RecapResult]:
+        """
+        Get the speculative recap if it was computed from exactly these entries
+        Waits for an in-flight job rather than starting a second model call. A
+        recap that fell back because the AI call failed is discarded, so the
+        caller makes its own call instead of serving the fallback
+        Args:
+            key: Journal identifier
+            entries: Entries the caller would generate the recap from
+            timeout: Seconds to wait for an unfinished job (None waits until done)
+        Returns:
+            The AI recap, or None if there is no matching successful speculation
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.fingerprint != fingerprint_entries(entries):
+                return None
+            self._jobs.pop(key)
+
+        try:
+            recap = job.future.result(timeout=timeout)
+        except Exception:
+            recap = None
+        if recap is None or recap.source != 'ai':
+            with self._lock:
+                self.wasted += 1
+            return None
+
+        with self._lock:
+            self.used += 1
+        return recap
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get speculation counters
+        Returns:
+            Dictionary with started, used, wasted, cancelled and pending counts
+        """
+        with self._lock:
+            return {
+                'started': self.started,
+                'used': self.used,
+                'wasted': self.wasted,
+                'cancelled': self.cancelled,
+                'pending': len(self._jobs),
+                'enabled': self.wasted < self.max_wasted,
+            }
+
+    def shutdown(self):
+        """Stop the worker thread without waiting for running jobs"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
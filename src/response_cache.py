@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class ResponseCache:
+    """A two tier (memory LRU + optional sqlite) cache for model responses"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0,
+                 db_path: Optional[str] = None, max_disk_entries: int = 5000,
+                 clock: Callable[[], float] = time.time):
+        """
+        Create a response cache
+        Args:
+            max_entries: Size cap of the in-memory LRU tier
+            ttl_seconds: Seconds a cached response stays valid (0 disables expiry)
+            db_path: Optional sqlite file for the on-disk tier
+            max_disk_entries: Size cap of the on-disk tier
+            clock: Time source, injectable for testing
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max(1, max_disk_entries)
+        self._clock = clock
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        # Hit/miss counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            self._open_disk_tier(db_path)
+
+    def _open_disk_tier(self, db_path: str):
+        """Open (or create) the sqlite table backing the disk tier"""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(messages: List[Dict[str, str]], model: str, temperature: float,
+                 max_tokens: int) -> str:
+        """
+        Build a cache key from a request
+        Args:
+            messages: OpenAI style message list
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+        Returns:
+            Hex digest identifying the normalized request
+        """
+        normalized = [
+            [str(msg.get('role', '')).strip().lower(), ' '.join(str(msg.get('content', '')).split())]
+            for msg in messages
+        ]
+        payload = json.dumps([normalized, model, round(float(temperature), 3), int(max_tokens)],
+                             ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _is_expired(self, created: float) -> bool:
+        return bool(self.ttl_seconds) and self._clock() - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+        Args:
+            key: Key from make_key
+        Returns:
+            Cached response text, or None on a miss
+        """
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                created, value = item
+                if not self._is_expired(created):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created = row
+                    if not self._is_expired(created):
+                        self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?",
+                                         (self._clock(), key))
+                        self._db.commit()
+                        self._remember(key, created, value)
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """
+        Store a response in every enabled tier
+        Args:
+            key: Key from make_key
+            value: Response text
+        """
+        now = self._clock()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, last_access) "
+                    "VALUES (?, ?, ?, ?)", (key, value, now, now)
+                )
+                # Enforce the disk size cap by dropping least recently used rows
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                    "ORDER BY last_access DESC LIMIT -1 OFFSET ?)", (self.max_disk_entries,)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, created: float, value: str):
+        """Insert into the memory tier, evicting the least recently used entry"""
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached response and reset the counters"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def close(self):
+        """Close the on-disk tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss metrics
+        Returns:
+            Dictionary of counters and the overall hit rate
+        """
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        disk_size = 0
+        if self._db is not None:
+            with self._lock:
+                disk_size = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            'hits': hits,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_size': len(self._memory),
+            'disk_size': disk_size,
+        }
+
+
+def cache_from_env() -> Optional[ResponseCache]:
+    """
+    Build the default response cache from environment settings
+    JOURNAL_RESPONSE_CACHE=off disables caching, JOURNAL_CACHE_PATH enables the disk tier
+    Returns:
+        A ResponseCache, or None when caching is turned off
+    """
+    if os.getenv('JOURNAL_RESPONSE_CACHE', 'on').strip().lower() in ('off', '0', 'false', 'no'):
+        return None
+    ttl = float(os.getenv('JOURNAL_CACHE_TTL', '3600'))
+    return ResponseCache(ttl_seconds=ttl, db_path=os.getenv('JOURNAL_CACHE_PATH') or None)
@@ -0,0 +1,259 @@
+import types
+from typing import Any
+
+# Response corpus for rule-based replies. Loaded once per process and shared by
+# every chatbot and session - dicts are read-only views and lists are tuples.
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Recursively convert dicts to read-only mappings and lists to tuples
+    Args:
+        value: Nested dict/list literal
+    Returns:
+        Immutable equivalent of value
+    """
+    if isinstance(value, dict):
+        return types.MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Empathetic responses based on mood levels (1-5)
+MOOD_RESPONSES = _freeze({
+    1: {  # Very low mood
+        'empathetic': [
+            "I hear you're having a really tough time. That sounds incredibly hard.",
+            "I'm so sorry you're feeling this way. Thank you for sharing with me.",
+            "It takes courage to acknowledge when things are this difficult. I'm here with you.",
+            "This sounds really heavy to carry. Would you like to talk more about what's coming up?"
+        ],
+        'supportive': [
+            "Would it help to take a few deep breaths together?",
+            "Sometimes just naming the feeling can help a little. Would you like to try?",
+            "I want you to know that your feelings are valid, no matter how dark they seem.",
+            "You don't have to go through this alone. Would you like some grounding techniques?"
+        ]
+    },
+    2: {  # Low mood
+        'empathetic': [
+            "I can sense you're going through a challenging time. That sounds really difficult.",
+            "Thank you for being honest about how you're feeling. That's not easy to do.",
+            "It sounds like things feel heavy right now. Would you like to unpack that a bit?",
+            "I'm here to listen, without judgment, whenever you're ready to share more."
+        ],
+        'supportive': [
+            "Would it help to focus on one small, kind thing you can do for yourself right now?",
+            "Sometimes writing down what's bothering us can make it feel more manageable.",
+            "Remember that feelings come in waves - this one will pass too.",
+            "Would you like me to suggest some gentle self-care ideas?"
+        ]
+    },
+    3: {  # Neutral mood
+        'empathetic': [
+            "Thanks for checking in with yourself. Being aware is the first step.",
+            "It's okay to feel neutral sometimes - not every day has to be high or low.",
+            "How interesting that you're noticing this middle ground. What's that like for you?",
+            "Sometimes neutrality can be a sign of balance. What do you think?"
+        ],
+        'supportive': [
+            "This might be a good time to check in with what you need right now.",
+            "Would you like to explore what might bring a little more lightness to your day?",
+            "Sometimes neutral moments are opportunities for gentle reflection.",
+            "Is there something small that might bring you a bit of comfort or joy?"
+        ]
+    },
+    4: {  # Good mood
+        'empathetic': [
+            "It's wonderful to hear you're feeling good! That's something to acknowledge.",
+            "I'm genuinely happy to hear you're in a positive space today!",
+            "This sounds lovely! Would you like to savor this feeling a bit more?",
+            "It's great that you're recognizing and enjoying this positive moment!"
+        ],
+        'supportive': [
+            "Would you like to explore what's contributing to this good feeling?",
+            "This might be a perfect time for some positive journaling or gratitude practice.",
+            "How can you nurture this good feeling?",
+            "Would you like to set a small intention to carry this feeling forward?"
+        ]
+    },
+    5: {  # Very good mood
+        'empathetic': [
+            "WOW! That's amazing to hear! I'm smiling just knowing you're feeling so good!",
+            "This is wonderful! Thank you for sharing this positive energy!",
+            "I'm genuinely thrilled to hear you're feeling fantastic!",
+            "What fantastic news! Would you like to celebrate this feeling with me?"
+        ],
+        'supportive': [
+            "This is a perfect moment to practice gratitude for this feeling.",
+            "Would you like to capture this moment in your journal to remember later?",
+            "How can you share this positive energy with yourself or others?",
+            "This great feeling is something to acknowledge and honor. Well done!"
+        ]
+    }
+})
+
+# Follow-up questions for each mood level
+FOLLOWUP_QUESTIONS = _freeze({
+    1: [
+        "What does this heavy feeling feel like in your body?",
+        "Is there one small thing that might feel slightly less heavy today?",
+        "What would feel supportive right now, even if it's very small?",
+        "Can you remember a time when you felt slightly better, even briefly?"
+    ],
+    2: [
+        "What's one thing that might help shift this feeling, even a tiny bit?",
+        "Is there a person or memory that usually brings you comfort?",
+        "What does your body need right now - rest, movement, nourishment?",
+        "What would you tell a friend who was feeling this way?"
+    ],
+    3: [
+        "What might help you move toward feeling a bit more positive?",
+        "Is there something you've been curious about trying?",
+        "What small pleasure could you add to your day?",
+        "How do you feel about this neutral space?"
+    ],
+    4: [
+        "What's contributing to this good feeling?",
+        "How can you savor or extend this positive moment?",
+        "What would you like to do with this good energy?",
+        "Is there someone you'd like to share this feeling with?"
+    ],
+    5: [
+        "What's making today so wonderful?",
+        "How can you capture this feeling to remember on harder days?",
+        "Is there a way to pay this positive feeling forward?",
+        "What does this fantastic feeling make you want to do?"
+    ]
+})
+
+# Chat mode responses for different conversation types
+CHAT_RESPONSES = _freeze({
+    'greeting': [
+        "Hi there! I'm here to listen. How's your day going?",
+        "Hello! I'm glad you're here. What's on your mind today?",
+        "Hi! I'm ready to chat whenever you are. How are things?",
+        "Hello! I'm here to talk about anything you'd like. What's up?"
+    ],
+    'feeling': [
+        "I hear you. Tell me more about what that feels like for you.",
+        "That sounds significant. Would you like to explore that feeling further?",
+        "Thank you for sharing that. How long have you been feeling this way?",
+        "I understand. What's been coming up for you with this feeling?"
+    ],
+    'journal': [
+        "Your journal is a safe space for all your thoughts and feelings.",
+        "It's great that you're reflecting on your journal. What stands out to you?",
+        "Journaling can be such a powerful tool. What brings you to it today?",
+        "Your reflections matter. Would you like to explore any particular entry?"
+    ],
+    'support': [
+        "I'm here to support you. What do you need right now?",
+        "You're not alone in this. I'm listening.",
+        "Whatever you're going through, your feelings are valid.",
+        "Take your time. I'm right here with you."
+    ],
+    'reflection': [
+        "That's an interesting perspective. What makes you think that?",
+        "I appreciate you sharing that reflection. How did you come to that insight?",
+        "That's a powerful observation. How does that feel to acknowledge?",
+        "Thank you for that reflection. What's next for you with this realization?"
+    ]
+})
+
+# Weekly recap templates
+RECAP_TEMPLATES = _freeze([
+    "Looking back at your journal entries, I notice {observation}. This week, you showed {quality}. Remember: {encouragement}",
+    "Your reflections this week revealed {theme}. You demonstrated {strength} in how you approached things. A reminder: {insight}",
+    "Based on your entries, you've been exploring {topic}. Your journey shows {growth}. Keep in mind: {advice}",
+    "This week's journaling highlights {focus}. I see {progress} in your reflections. Consider this: {suggestion}"
+])
+
+# Observations, qualities, and encouragement phrases
+RECAP_ELEMENTS = _freeze({
+    'observations': [
+        "a mix of different emotions and experiences",
+        "some meaningful reflections",
+        "progress in your self-awareness",
+        "moments of insight and growth"
+    ],
+    'qualities': [
+        "courage in being honest with yourself",
+        "resilience in facing challenges",
+        "thoughtfulness in your reflections",
+        "self-compassion in your journey"
+    ],
+    'encouragements': [
+        "every entry is a step forward, no matter how small",
+        "your willingness to reflect is itself a form of growth",
+        "there's no right or wrong way to feel - only your authentic experience",
+        "each day brings new opportunities for understanding"
+    ],
+    'themes': [
+        "self-discovery and personal growth",
+        "emotional awareness and processing",
+        "daily experiences and their meanings",
+        "personal challenges and triumphs"
+    ],
+    'strengths': [
+        "honesty and vulnerability",
+        "persistence and dedication",
+        "insight and self-awareness",
+        "courage and openness"
+    ],
+    'insights': [
+        "growth often happens in small, daily moments",
+        "your feelings are valuable messengers",
+        "reflection is a powerful tool for understanding",
+        "every emotion has something to teach us"
+    ]
+})
+
+# Reply used for uncategorized chat messages
+GENERIC_RESPONSES = _freeze([
+    "I hear you. Tell me more about that.",
+    "Thank you for sharing that. What comes up for you as you say that?",
+    "I'm listening. Would you like to explore that further?",
+    "That's interesting. What makes you bring that up?",
+    "I appreciate you sharing that. How does that feel to talk about?"
+])
+
+# Support offers for each mood level
+SUPPORT_OFFERS = _freeze({
+    1: "Would you like some gentle guidance through this difficult moment?",
+    2: "Would you like to explore some coping strategies together?",
+    3: "Would you like to reflect a bit more on what you need right now?",
+    4: "Would you like to build on this positive feeling?",
+    5: "Would you like to celebrate and explore this fantastic feeling?"
+})
+
+# Immediate replies when a chat message contains crisis signals (see crisis_detector.py):
+# grounding first, then real-world support. Served locally, never from the model.
+CRISIS_RESPONSES = _freeze({
+    'self_harm': (
+        "I'm really glad you told me, and I'm concerned about your safety. You don't have to "
+        "go through this alone. If you are in the US, please call or text 988 (Suicide & Crisis "
+        "Lifeline) now - it's free and open 24/7. If you might act on these thoughts, call 911 "
+        "or go to the nearest emergency room. Right now, try to breathe slowly with me: in for "
+        "4, hold for 4, out for 6. Is there someone you trust who can be with you?"
+    ),
+    'harm_to_others': (
+        "Thank you for being honest about how intense this feels. Let's slow down together: "
+        "take a step away from the situation and breathe in for 4, hold for 4, out for 6. "
+        "If anyone is in immediate danger, please call 911. You can also call or text 988 to "
+        "talk with a trained counselor right now, any time of day."
+    ),
+    'panic': (
+        "It sounds like you're overwhelmed right now, and that's really scary. Let's ground "
+        "together: name 5 things you can see, 4 you can touch, 3 you can hear, 2 you can smell "
+        "and 1 you can taste. Breathe in for 4, out for 6. If this doesn't ease or you feel "
+        "unsafe, call or text 988, or 911 in an emergency."
+    ),
+})
+
+# Grounding line put in front of the normal reply for everyday acute-stress wording
+# ("freaking out about my exam"), which is not answered with a crisis reply
+GROUNDING_PROMPTS = _freeze({
+    'distress': "That sounds like a lot at once - try one slow breath with me: in for 4, out for 6.",
+})
@@ -33,6 +33,8 @@ Examples:
   python app.py --show-scale        # Display mood scale
   python app.py --test              # Run unit tests
   python app.py --chat              # Start directly in chat mode (NEW!)
+  python app.py --no-prewarm        # Skip background AI connection warm-up
+  python app.py --usage-report      # Summarize AI token usage and cost
         """
     )
     
@@ -72,6 +74,18 @@ Examples:
         help='Set user name (for testing)'
     )
     
+    parser.add_argument(
+        '--no-prewarm',
+        action='store_true',
+        help='Do not warm up the AI connection in the background at startup'
+    )
+    
+    parser.add_argument(
+        '--usage-report',
+        action='store_true',
+        help='Show AI token usage, cost and latency per user, day and call type'
+    )
+    
     return parser.parse_args()
 
 def process_cli_args(args) -> Dict[str, Any]:
@@ -88,7 +102,8 @@ def process_cli_args(args) -> Dict[str, Any]:
         'action': 'run',                            # Default action
         'mood': None,
         'chat_mode': False,                         # New Chat mode flag
-        'user_name': None
+        'user_name': None,
+        'prewarm': not args.no_prewarm
     }
     
     # Check for version flag
@@ -101,6 +116,11 @@ def process_cli_args(args) -> Dict[str, Any]:
         result['action'] = 'show_scale'
         return result
     
+    # Check for usage report flag
+    if args.usage_report:
+        result['action'] = 'usage_report'
+        return result
+    
     # Check for test flag
     if args.test:
         result['action'] = 'test'
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+try:
+    from .chatbot import ChatSession, UnifiedChatbot, get_chatbot
+    from .conversation_history import ConversationHistory, Turn
+except ImportError:
+    from chatbot import ChatSession, UnifiedChatbot, get_chatbot
+    from conversation_history import ConversationHistory, Turn
+
+# Spilled snapshots are committed in batches; a crash loses at most this many
+COMMIT_EVERY = 256
+
+
+def encode_session(session: ChatSession) -> bytes:
+    """
+    Serialize a session into a compact snapshot
+    Args:
+        session: Session to serialize (its random source is not kept)
+    Returns:
+        zlib-compressed JSON bytes
+    """
+    history = session.conversation_history
+    payload = [history.max_turns, session.user_context, [list(turn) for turn in history]]
+    return zlib.compress(json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+def decode_session(data: bytes) -> ChatSession:
+    """
+    Rebuild a session from a snapshot made by encode_session
+    Args:
+        data: Snapshot bytes
+    Returns:
+        Rehydrated ChatSession
+    """
+    max_turns, user_context, turns = json.loads(zlib.decompress(data).decode('utf-8'))
+    history = ConversationHistory((Turn(*turn) for turn in turns), max_turns)
+    return ChatSession(history, user_context)
+
+
+class SessionManager:
+    """
+    Maps users to chat sessions for multi-user hosting
+    Keeps an LRU of active sessions in memory and spills the least recently
+    used or idle ones to compact sqlite snapshots, rehydrating them on the
+    user's next message. A session is pinned while chat() is answering, so it
+    is never spilled in the middle of a turn
+    """
+
+    def __init__(self, chatbot: Optional[UnifiedChatbot] = None, max_active: int = 1024,
+                 db_path: Optional[str] = None, idle_seconds: float = 0,
+                 clock: Callable[[], float] = time.time):
+        """
+        Create a session manager
+        Args:
+            chatbot: Chatbot whose settings, cache and client every session shares
+                     (defaults to the shared chatbot)
+            max_active: Sessions kept in memory before the least recently used spill
+            db_path: sqlite file for snapshots (None keeps them in an in-memory database)
+            idle_seconds: Spill sessions unused this long on evict_idle() (0 disables)
+            clock: Time source, injectable for testing
+        """
+        self._chatbot = chatbot
+        self.max_active = max(1, max_active)
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._active: "OrderedDict[Hashable, Tuple[ChatSession, float]]" = OrderedDict()
+        self._pins: Dict[str, int] = {}    # user id -> chat() calls in progress
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+
+        # Lifecycle counters
+        self.created = 0
+        self.spilled = 0
+        self.rehydrated = 0
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path or ':memory:', check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "user_id TEXT PRIMARY KEY, data BLOB NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @property
+    def chatbot(self) -> UnifiedChatbot:
+        """Template chatbot that sessions are bound to"""
+        if self._chatbot is None:
+            self._chatbot = get_chatbot()
+        return self._chatbot
+
+    def get_session(self, user_id: Hashable) -> ChatSession:
+        """
+        Get a user's session, rehydrating or creating it as needed
+        Args:
+            user_id: Identifies the user
+        Returns:
+            The user's ChatSession
+        """
+        with self._lock:
+            return self._checkout(str(user_id))
+
+    def _checkout(self, key: str) -> ChatSession:
+        """Make a session the most recently used, loading it if needed; caller holds the lock"""
+        item = self._active.get(key)
+        if item is not None:
+            session = item[0]
+            self._active.move_to_end(key)
+        else:
+            row = self._db.execute("SELECT data FROM sessions WHERE user_id = ?",
+                                   (key,)).fetchone()
+            if row is not None:
+                session = decode_session(row[0])
+                self.rehydrated += 1
+            else:
+                # The user id goes with the session so usage is attributed to it
+                session = ChatSession(user_context={'user_id': key})
+                self.created += 1
+        self._active[key] = (session, self._clock())
+        self._trim(key)
+        return session
+
+    def chatbot_for(self, user_id: Hashable) -> UnifiedChatbot:
+        """
+        Get a chatbot bound to a user's session
+        Args:
+            user_id: Identifies the user
+        Returns:
+            Shallow copy of the template chatbot using the user's session
+        """
+        return self.chatbot.for_session(self.get_session(user_id))
+
+    def chat(self, user_id: Hashable, message: str, mood_context: Optional[Dict] = None) -> str:
+        """
+        Answer a user's chat message within their session
+        Args:
+            user_id: Identifies the user
+            message: The user's message
+            mood_context: Current mood context
+        Returns:
+            Chat response string
+        """
+        key = str(user_id)
+        with self._lock:
+            session = self._checkout(key)
+            self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            return self.chatbot.for_session(session).get_chat_response(message, mood_context=mood_context)
+        finally:
+            with self._lock:
+                self._release(key, session)
+
+    def _release(self, key: str, session: ChatSession):
+        """Unpin a session after a turn, keeping the turn; caller holds the lock"""
+        pins = self._pins.pop(key) - 1
+        if pins:
+            self._pins[key] = pins
+        item = self._active.get(key)
+        if item is not None and item[0] is session:
+            # The turn counts as use: stamp it now rather than when it started
+            self._active[key] = (session, self._clock())
+            self._active.move_to_end(key)
+            self._trim(key)
+        elif not pins:
+            # Dropped from memory during the turn (flush/close), so store the new turns
+            self._spill(key, session)
+
+    def _trim(self, keep: str):
+        """Spill least recently used unpinned sessions over max_active, except keep; caller holds the lock"""
+        excess = len(self._active) - self.max_active
+        if excess <= 0:
+            return
+        victims = []
+        for key in self._active:
+            if key != keep and key not in self._pins:
+                victims.append(key)
+                if len(victims) == excess:
+                    break
+        for key in victims:
+            session, _ = self._active.pop(key)
+            self._spill(key, session)
+
+    def _spill(self, key: str, session: ChatSession):
+        """Write a session snapshot; caller holds the lock"""
+        self._db.execute(
+            "INSERT OR REPLACE INTO sessions (user_id, data, updated) VALUES (?, ?, ?)",
+            (key, encode_session(session), self._clock())
+        )
+        self.spilled += 1
+        self._uncommitted += 1
+        if self._uncommitted >= COMMIT_EVERY:
+            self._db.commit()
+            self._uncommitted = 0
+
+    def evict_idle(self, idle_seconds: Optional[float] = None) -> int:
+        """
+        Spill sessions that have not been used recently
+        Args:
+            idle_seconds: Idle threshold, defaults to the instance setting
+        Returns:
+            Number of sessions spilled
+        """
+        threshold = self.idle_seconds if idle_seconds is None else idle_seconds
+        if not threshold:
+            return 0
+        cutoff = self._clock() - threshold
+        evicted = 0
+        with self._lock:
+            # Oldest first, so stop at the first session used after the cutoff;
+            # sessions pinned by a turn in progress are skipped
+            victims = []
+            for key, (_, last_used) in self._active.items():
+                if last_used > cutoff:
+                    break
+                if key not in self._pins:
+                    victims.append(key)
+            for key in victims:
+                session, _ = self._active.pop(key)
+                self._spill(key, session)
+                evicted += 1
+        return evicted
+
+    def flush(self):
+        """Snapshot every active session and commit, keeping them in memory"""
+        with self._lock:
+            for key, (session, _) in self._active.items():
+                self._spill(key, session)
+            self._db.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        """Flush active sessions and close the snapshot database"""
+        self.flush()
+        with self._lock:
+            self._active.clear()
+            self._db.close()
+
+    def active_users(self) -> List[str]:
+        """User ids currently held in memory, least recently used first"""
+        with self._lock:
+            return list(self._active)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get session lifecycle counters
+        Returns:
+            Dictionary with active, stored, created, spilled and rehydrated counts
+        """
+        with self._lock:
+            stored = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            return {
+                'active': len(self._active),
+                'stored': stored,
+                'created': self.created,
+                'spilled': self.spilled,
+                'rehydrated': self.rehydrated,
+            }
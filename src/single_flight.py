@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+
+class SingleFlight:
+    """Coalesces identical in-flight calls so only one of them does the work"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.executed = 0
+        self.deduplicated = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for the identical call already in progress
+        Args:
+            key: Identifies the request (e.g. a normalized prompt hash)
+            fn: Zero-argument function doing the actual work
+        Returns:
+            fn's result, shared by every caller with the same key
+        Raises:
+            Whatever fn raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters
+        Returns:
+            Dictionary with total calls, executed calls and deduplicated calls
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executed': self.executed,
+                'deduplicated': self.deduplicated,
+                'in_flight': len(self._in_flight),
+            }
+
+
+# Shared by every chatbot in the process so concurrent sessions coalesce too
+shared_single_flight = SingleFlight()
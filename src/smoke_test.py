@@ -271,6 +271,27 @@ class TestAppNewFeatures(unittest.TestCase):
         self.assertTrue(hasattr(app, 'quick_mood_check'))
         self.assertTrue(callable(app.quick_mood_check))
     
+    def test_confirm_corrected_mood(self):
+        """Test that low-confidence keyword corrections are confirmed with the user"""
+        import app
+        
+        with patch('sys.stdout', new_callable=StringIO):
+            with patch('builtins.input', return_value='no'):
+                self.assertIsNone(app.confirm_mood("hapy", app.assess_mood("hapy")))
+            with patch('builtins.input', return_value='yes'):
+                self.assertEqual(app.confirm_mood("hapy", app.assess_mood("hapy"))['level'], 4)
+            # Confident corrections and exact keywords are not asked about
+            with patch('builtins.input', side_effect=AssertionError("asked")):
+                self.assertEqual(app.confirm_mood("exellent", app.assess_mood("exellent"))['level'], 5)
+                self.assertEqual(app.confirm_mood("sad", app.assess_mood("sad"))['level'], 2)
+    
+    def test_journal_lock_per_file(self):
+        """Test that writers of one journal share a lock and other journals do not"""
+        import app
+        
+        self.assertIs(app.journal_lock("TestUser"), app.journal_lock("TestUser"))
+        self.assertIsNot(app.journal_lock("TestUser"), app.journal_lock("OtherUser"))
+    
     def test_show_chat_help_output(self):
         """Test show_chat_help function output"""
         import app
@@ -331,8 +352,8 @@ Entry Type: Daily Reflection"""
                     with patch('app.display_mood_scale'):
                         with patch('app.assess_mood'):
                             with patch('app.save_chat_conversation'):
-                                with patch('app.chatbot') as mock_chatbot:
-                                    mock_chatbot.get_chat_response.return_value = "Mock response"
+                                with patch('app.get_chatbot') as mock_get_chatbot:
+                                    mock_get_chatbot.return_value.get_chat_response.return_value = "Mock response"
                                     
                                     # Call function - should not crash
                                     app.chat_mode("TestUser")
@@ -348,8 +369,6 @@ class TestAppIntegrationSmoke(unittest.TestCase):
         
         # Check that required modules are imported
         self.assertTrue(hasattr(app, 'justice_navigator_info'))
-        self.assertTrue(hasattr(app, 'pd'))  # pandas
-        self.assertTrue(hasattr(app, 'np'))  # numpy
         self.assertTrue(hasattr(app, 'os'))
         self.assertTrue(hasattr(app, 'datetime'))
         self.assertTrue(hasattr(app, 'Fore'))  # colorama
@@ -363,7 +382,7 @@ class TestAppIntegrationSmoke(unittest.TestCase):
         self.assertTrue(hasattr(app, 'decision_table'))
         self.assertTrue(hasattr(app, 'assess_mood'))
         self.assertTrue(hasattr(app, 'display_mood_scale'))
-        self.assertTrue(hasattr(app, 'chatbot'))
+        self.assertTrue(hasattr(app, 'get_chatbot'))
     
     def test_main_program_structure(self):
         """Test that main program has correct structure"""
@@ -414,18 +433,19 @@ class TestAppIntegrationSmoke(unittest.TestCase):
         """Test chatbot is properly integrated"""
         import app
         
-        # Check chatbot is available
-        self.assertTrue(hasattr(app, 'chatbot'))
+        # Check chatbot is available (built on first use)
+        self.assertTrue(callable(app.get_chatbot))
+        chatbot = app.get_chatbot()
         
         # It should have key methods
-        self.assertTrue(hasattr(app.chatbot, 'get_empathetic_response'))
-        self.assertTrue(callable(app.chatbot.get_empathetic_response))
+        self.assertTrue(hasattr(chatbot, 'get_empathetic_response'))
+        self.assertTrue(callable(chatbot.get_empathetic_response))
         
-        self.assertTrue(hasattr(app.chatbot, 'get_chat_response'))  # NEW
-        self.assertTrue(callable(app.chatbot.get_chat_response))
+        self.assertTrue(hasattr(chatbot, 'get_chat_response'))  # NEW
+        self.assertTrue(callable(chatbot.get_chat_response))
         
-        self.assertTrue(hasattr(app.chatbot, 'generate_weekly_recap'))
-        self.assertTrue(callable(app.chatbot.generate_weekly_recap))
+        self.assertTrue(hasattr(chatbot, 'generate_weekly_recap'))
+        self.assertTrue(callable(chatbot.generate_weekly_recap))
 
 def run_smoke_tests():
     """Run all smoke tests and display results"""
@@ -0,0 +1,185 @@
+import datetime
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+# Default ledger file, next to the journal files the app writes (ignored by git,
+# since records name the user)
+DEFAULT_LEDGER_PATH = "usage_ledger.jsonl"
+
+# USD per million (prompt, completion) tokens, for cost estimates in reports
+MODEL_PRICES = {
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+}
+
+
+class UsageLedger:
+    """
+    Append-only record of model calls
+    One JSON line per call with the call type, user, model, token usage,
+    latency and outcome. Lines are appended and never rewritten, so the
+    file can be tailed or shipped while the app runs.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH,
+                 clock=lambda: datetime.datetime.now(datetime.timezone.utc)):
+        """
+        Create a ledger
+        Args:
+            path: JSONL file to append to (created on first record)
+            clock: Source of record timestamps, injectable for testing
+        """
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def record(self, call_type: str, model: str, prompt_tokens: int = 0,
+               completion_tokens: int = 0, latency: float = 0.0, outcome: str = 'ok',
+               user: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Append one call to the ledger
+        Args:
+            call_type: What the call was for, e.g. 'chat' or 'recap'
+            model: Model name
+            prompt_tokens: Prompt tokens reported by the API
+            completion_tokens: Completion tokens reported by the API
+            latency: Seconds the API call took
+            outcome: 'ok', 'cached', 'rate_limited' or 'error'
+            user: User the call was made for, if known
+        Returns:
+            The written record
+        """
+        entry = {
+            'ts': self._clock().isoformat(timespec='seconds'),
+            'user': user,
+            'call_type': call_type,
+            'model': model,
+            'prompt_tokens': int(prompt_tokens),
+            'completion_tokens': int(completion_tokens),
+            'latency': round(float(latency), 4),
+            'outcome': outcome,
+        }
+        line = json.dumps(entry, separators=(',', ':')) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line)
+            self.recorded += 1
+        return entry
+
+    def record_response(self, call_type: str, model: str, response: Any, latency: float,
+                        user: Optional[str] = None, outcome: str = 'ok') -> Dict[str, Any]:
+        """
+        Append a successful call, taking token counts from the response
+        Args:
+            call_type: What the call was for
+            model: Model name
+            response: Backend Completion, or an OpenAI response with .usage
+            latency: Seconds the API call took
+            user: User the call was made for, if known
+            outcome: 'ok' or 'cached'
+        Returns:
+            The written record
+        """
+        usage = getattr(response, 'usage', response)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0)
+        completion_tokens = getattr(usage, 'completion_tokens', 0)
+        return self.record(call_type, model,
+                           prompt_tokens if isinstance(prompt_tokens, int) else 0,
+                           completion_tokens if isinstance(completion_tokens, int) else 0,
+                           latency, outcome, user)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Records in the order written (unreadable lines are skipped)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def ledger_from_env() -> Optional[UsageLedger]:
+    """
+    Build the usage ledger from environment settings
+    Recording is opt-in: JOURNAL_USAGE_LEDGER=on writes to DEFAULT_LEDGER_PATH,
+    any other value except 'off' is taken as the file path
+    Returns:
+        A UsageLedger, or None when recording is not turned on
+    """
+    path = os.getenv('JOURNAL_USAGE_LEDGER', 'off').strip()
+    if path.lower() in ('off', '0', 'false', 'no', ''):
+        return None
+    if path.lower() in ('on', '1', 'true', 'yes'):
+        path = DEFAULT_LEDGER_PATH
+    return UsageLedger(path)
+
+
+def usage_report(ledger: UsageLedger) -> Dict[str, Any]:
+    """
+    Aggregate the ledger per user, per day and per call type
+    Args:
+        ledger: Ledger to read
+    Returns:
+        Dictionary of pandas DataFrames keyed 'user', 'day' and 'call_type'
+        (empty when nothing has been recorded)
+    """
+    import pandas as pd  # Only needed for reports, keep it off the startup path
+
+    frame = pd.DataFrame(list(ledger))
+    if frame.empty:
+        return {}
+
+    frame['day'] = frame['ts'].str[:10]
+    frame['user'] = frame['user'].fillna('(unknown)')
+    frame['total_tokens'] = frame['prompt_tokens'] + frame['completion_tokens']
+    prices = frame['model'].map(lambda model: MODEL_PRICES.get(model, (0.0, 0.0)))
+    frame['cost_usd'] = (frame['prompt_tokens'] * prices.str[0]
+                         + frame['completion_tokens'] * prices.str[1]) / 1_000_000
+    frame['failed'] = frame['outcome'].isin(['error', 'rate_limited'])
+    frame['cached'] = frame['outcome'] == 'cached'
+    # Latency only means something for calls that reached the API
+    frame['api_latency'] = frame['latency'].where(frame['outcome'].isin(['ok', 'error']))
+
+    report = {}
+    for dimension in ('user', 'day', 'call_type'):
+        grouped = frame.groupby(dimension).agg(
+            calls=('outcome', 'size'),
+            cached=('cached', 'sum'),
+            failed=('failed', 'sum'),
+            prompt_tokens=('prompt_tokens', 'sum'),
+            completion_tokens=('completion_tokens', 'sum'),
+            total_tokens=('total_tokens', 'sum'),
+            cost_usd=('cost_usd', 'sum'),
+            mean_latency=('api_latency', 'mean'),
+            p95_latency=('api_latency', lambda values: values.quantile(0.95)),
+        )
+        report[dimension] = grouped.sort_values('total_tokens', ascending=False)
+    return report
+
+
+def format_usage_report(ledger: UsageLedger) -> str:
+    """
+    Usage report as printable text
+    Args:
+        ledger: Ledger to read
+    Returns:
+        One table per dimension, or a note when the ledger is empty
+    """
+    report = usage_report(ledger)
+    if not report:
+        return f"No model calls recorded in {ledger.path} yet."
+
+    titles = {'user': "By user", 'day': "By day", 'call_type': "By call type"}
+    sections = []
+    for dimension, frame in report.items():
+        table = frame.round({'cost_usd': 4, 'mean_latency': 3, 'p95_latency': 3})
+        sections.append(f"{titles[dimension]}\n{table.to_string()}")
+    return f"Model usage from {ledger.path}\n\n" + "\n\n".join(sections)
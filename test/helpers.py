@@ -0,0 +1,11 @@
+# helpers.py - Shared fixtures for the unit tests
+
+
+class FakeClock:
+    """Manually advanced time source, for code that takes a clock callable"""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,93 @@
+# test_chat_analytics.py - Unit tests for vectorized chat analytics
+import unittest
+
+import numpy as np
+
+from src.chat_analytics import ChatAnalytics, extract_chat_lines
+from src.chatbot import UnifiedChatbot
+
+SEPARATOR = '=' * 64
+
+def chat_entry(date, lines):
+    """Build a chat conversation entry the way save_chat_conversation writes it"""
+    body = ''.join(f"You: {line}\nCompanion: I hear you.\n" for line in lines)
+    return (f"\n{SEPARATOR}\nEntry Type: Chat Conversation\nDate: {date}\n{SEPARATOR}\n"
+            f"{body}{SEPARATOR}\n")
+
+class TestExtractChatLines(unittest.TestCase):
+    """Test cases for reading chat lines out of journals"""
+
+    def test_extracts_user_lines_per_session(self):
+        """Test that only the user's lines are collected, grouped by session"""
+        journal = (chat_entry("12/14/2025 05:38 PM", ["hi there", "I feel sad"])
+                   + f"\n{SEPARATOR}\nEntry Type: Daily Reflection\nDate: 12/15/2025 | Time: 09:00 AM\n"
+                   + f"{SEPARATOR}\nPositive moment: You: not a chat line\n"
+                   + chat_entry("12/16/2025 08:00 AM", ["I need help"]))
+        corpus = extract_chat_lines({'Dee': journal})
+
+        self.assertEqual(corpus.lines, ["hi there", "I feel sad", "I need help"])
+        self.assertEqual(corpus.session_ids.tolist(), [0, 0, 1])
+        self.assertEqual(corpus.session_count, 2)
+        self.assertEqual(corpus.session_users, ['Dee', 'Dee'])
+        self.assertEqual(corpus.session_dates[1].day, 16)
+
+    def test_empty_journal(self):
+        """Test that an empty journal yields an empty corpus"""
+        corpus = extract_chat_lines({'Dee': ''})
+        self.assertEqual(len(corpus), 0)
+        self.assertEqual(corpus.session_count, 0)
+
+class TestChatAnalytics(unittest.TestCase):
+    """Test cases for the ChatAnalytics class"""
+
+    def setUp(self):
+        self.analytics = ChatAnalytics()
+
+    def test_term_matrix_counts(self):
+        """Test term counts per line"""
+        matrix = self.analytics.term_matrix(["I feel, I feel... so sad", "nothing here"])
+        feel = self.analytics.terms.index('feel*')
+        sad = self.analytics.terms.index('sad')
+
+        self.assertEqual(matrix.shape, (2, len(self.analytics.terms)))
+        self.assertEqual(matrix[0, feel], 2)
+        self.assertEqual(matrix[0, sad], 1)
+        self.assertEqual(matrix[1].sum(), 0)
+
+    def test_categories_match_chatbot(self):
+        """Test that vectorized categories agree with _categorize_message"""
+        lines = ["hi there", "I feel sad!", "my journal entry", "this is hard",
+                 "i think so", "nothing", "Hello, I feel", "They went", "Writing!!",
+                 "I'm overwhelmed", "", "greetings, I know it is difficult"]
+        matrix = self.analytics.term_matrix(lines)
+        categories = [self.analytics.categories[i] for i in self.analytics.categorize(matrix)]
+
+        self.assertEqual(categories, UnifiedChatbot(ai_enabled=False).categorize_many(lines))
+
+    def test_analyze_statistics(self):
+        """Test distribution, per-session and daily trend statistics"""
+        journal = (chat_entry("12/14/2025 05:38 PM", ["hi", "I feel sad", "I feel ok"])
+                   + chat_entry("12/15/2025 09:00 AM", ["I need help"]))
+        result = self.analytics.analyze(extract_chat_lines({'Dee': journal}))
+        categories = list(result['categories'])
+
+        self.assertEqual(result['distribution'][categories.index('feeling')], 2)
+        self.assertEqual(result['sessions']['line_counts'].tolist(), [3, 1])
+        self.assertEqual(categories[result['sessions']['dominant'][0]], 'feeling')
+        self.assertTrue(np.allclose(result['sessions']['category_shares'].sum(axis=1), 1.0))
+        self.assertEqual(len(result['trend']['days']), 2)
+        self.assertEqual(result['trend']['category_counts'].sum(), 4)
+
+    def test_analyze_empty_corpus(self):
+        """Test that an empty corpus produces zero statistics"""
+        result = self.analytics.analyze(extract_chat_lines({}))
+        self.assertEqual(result['distribution'].sum(), 0)
+        self.assertEqual(result['trend']['days'], [])
+
+    def test_rejects_unsupported_keywords(self):
+        """Test that keywords outside the supported length raise ValueError"""
+        with self.assertRaises(ValueError):
+            ChatAnalytics((('odd', ('a*',)),))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 # test_chatbot_unified.py - Unit tests for chatbot
+import os
 import unittest
-from src.chatbot import UnifiedChatbot
+from unittest.mock import MagicMock, patch
+import src.chatbot as chatbot_module
+from src.chatbot import UnifiedChatbot, ChatSession
 from src.mood_assessment import assess_mood
 
 class TestUnifiedChatbot(unittest.TestCase):
@@ -81,6 +84,28 @@ class TestUnifiedChatbot(unittest.TestCase):
             category = self.chatbot._categorize_message(message)
             self.assertEqual(category, expected_category)
     
+    def test_categorize_message_whole_words(self):
+        """Test keywords only match whole words or their stems"""
+        test_cases = [
+            ("this is something", "general"),       # 'hi' inside other words
+            ("they went home", "general"),          # 'hey' inside 'they'
+            ("I was writing all night", "journal"),  # 'writ*' stem
+            ("HELLO", "greeting"),                  # case insensitive
+            ("hi, I feel stuck", "greeting"),       # greeting has priority
+            ("i know it's hard", "support"),        # support beats reflection
+        ]
+        
+        for message, expected_category in test_cases:
+            with self.subTest(message=message):
+                self.assertEqual(self.chatbot._categorize_message(message), expected_category)
+    
+    def test_categorize_many(self):
+        """Test batch categorization matches single calls"""
+        messages = ["hi there", "i feel sad", "my journal entry", "random message"]
+        expected = [self.chatbot._categorize_message(m) for m in messages]
+        self.assertEqual(self.chatbot.categorize_many(messages), expected)
+        self.assertEqual(self.chatbot.categorize_many([]), [])
+    
     def test_generate_weekly_recap(self):
         """Test weekly recap generation"""
         # Test with entries
@@ -106,6 +131,120 @@ class TestUnifiedChatbot(unittest.TestCase):
         self.chatbot.clear_history()
         self.assertEqual(len(self.chatbot.conversation_history), 0)
 
+class TestChatbotPrewarm(unittest.TestCase):
+    """Test cases for warming up the AI connection"""
+    
+    def test_prewarm_disabled_without_ai(self):
+        """Test prewarm is a no-op in rule-based mode"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        self.assertFalse(chatbot.prewarm())
+        self.assertIsNone(chatbot.latency_stats['prewarm'])
+    
+    def test_prewarm_opens_connection(self):
+        """Test prewarm touches the client and records its latency"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+        
+        self.assertTrue(chatbot.prewarm())
+        chatbot.openai_client.models.list.assert_called_once()
+        chatbot.openai_client.chat.completions.create.assert_not_called()
+        self.assertIsNotNone(chatbot.latency_stats['prewarm'])
+    
+    def test_prewarm_minimal_request(self):
+        """Test prewarm can send a one-token completion"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+        
+        self.assertTrue(chatbot.prewarm(send_request=True))
+        kwargs = chatbot.openai_client.chat.completions.create.call_args.kwargs
+        self.assertEqual(kwargs['max_tokens'], 1)
+        self.assertEqual(kwargs['model'], chatbot.llm_backend.model_for('chat'))
+    
+    def test_prewarm_swallows_errors(self):
+        """Test a failing prewarm reports False instead of raising"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+        chatbot.openai_client.models.list.side_effect = ConnectionError("offline")
+        
+        self.assertFalse(chatbot.prewarm())
+    
+    def test_default_backend_uses_configured_models(self):
+        """Test the OpenAI backend reads JOURNAL_CHAT_MODEL once and follows the client"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        with patch.dict(os.environ, {'JOURNAL_CHAT_MODEL': 'gpt-4o'}):
+            backend = chatbot.llm_backend
+        self.assertEqual(backend.model_for('chat'), 'gpt-4o')
+        self.assertIs(chatbot.llm_backend, backend)
+        chatbot.openai_client = MagicMock()
+        self.assertIs(backend.client, chatbot.openai_client)
+
+class TestChatSession(unittest.TestCase):
+    """Test cases for per-session state and the shared response corpus"""
+    
+    def test_corpus_shared_between_instances(self):
+        """Test that instances reuse one read-only corpus"""
+        first = UnifiedChatbot(ai_enabled=False)
+        second = UnifiedChatbot(ai_enabled=False)
+        
+        self.assertIs(first.mood_responses, second.mood_responses)
+        self.assertNotIn('mood_responses', vars(first))
+        with self.assertRaises(TypeError):
+            first.chat_responses['greeting'] = []
+    
+    def test_sessions_keep_separate_history(self):
+        """Test that history and context belong to each session"""
+        first = UnifiedChatbot(ai_enabled=False)
+        second = UnifiedChatbot(ai_enabled=False)
+        first.get_chat_response("Hello", mood_context={'description': 'Good'})
+        
+        self.assertEqual(len(first.session.conversation_history), 2)
+        self.assertEqual(len(second.conversation_history), 0)
+        self.assertEqual(first.user_context['current_mood']['description'], 'Good')
+        self.assertEqual(second.user_context, {})
+    
+    def test_seeded_session_is_reproducible(self):
+        """Test that a seeded session RNG gives repeatable replies"""
+        replies = []
+        for _ in range(2):
+            chatbot = UnifiedChatbot(ai_enabled=False, session=ChatSession(seed=7))
+            replies.append([chatbot.get_chat_response("I feel tired") for _ in range(5)])
+        self.assertEqual(replies[0], replies[1])
+    
+    def test_followup_questions_are_mutable_lists(self):
+        """Test that callers get a list they can change without touching the corpus"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        questions = chatbot.get_followup_questions(3, count=10)
+        
+        self.assertIsInstance(questions, list)
+        questions.clear()
+        self.assertEqual(len(chatbot.get_followup_questions(3, count=10)), 4)
+    
+    def test_session_uses_slots(self):
+        """Test that sessions carry no per-instance __dict__"""
+        self.assertFalse(hasattr(ChatSession(), '__dict__'))
+
+class TestSharedChatbot(unittest.TestCase):
+    """Test cases for the lazily built shared chatbot"""
+    
+    def test_built_on_first_use(self):
+        """Test that get_chatbot builds one instance on demand and reuses it"""
+        with patch.object(chatbot_module, '_chatbot', None), \
+             patch.object(chatbot_module, 'UnifiedChatbot', wraps=UnifiedChatbot) as factory:
+            factory.assert_not_called()
+            first = chatbot_module.get_chatbot()
+            self.assertIs(chatbot_module.get_chatbot(), first)
+            self.assertEqual(factory.call_count, 1)
+    
+    def test_module_attribute_compatibility(self):
+        """Test that the old chatbot module attribute still resolves"""
+        with patch.object(chatbot_module, '_chatbot', None):
+            self.assertIs(chatbot_module.chatbot, chatbot_module.get_chatbot())
+        with self.assertRaises(AttributeError):
+            chatbot_module.not_a_chatbot
+
 class TestChatbotIntegration(unittest.TestCase):
     """Integration tests for chatbot with mood assessment"""
     
@@ -149,6 +288,9 @@ def run_tests():
     
     # Add test cases
     suite.addTests(loader.loadTestsFromTestCase(TestUnifiedChatbot))
+    suite.addTests(loader.loadTestsFromTestCase(TestChatbotPrewarm))
+    suite.addTests(loader.loadTestsFromTestCase(TestChatSession))
+    suite.addTests(loader.loadTestsFromTestCase(TestSharedChatbot))
     suite.addTests(loader.loadTestsFromTestCase(TestChatbotIntegration))
     
     # Run tests
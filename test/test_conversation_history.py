@@ -0,0 +1,96 @@
+# test_conversation_history.py - Unit tests for bounded conversation history
+import unittest
+from unittest.mock import MagicMock
+
+from src.conversation_history import ConversationHistory, Turn, parse_line
+from src.chatbot import UnifiedChatbot
+
+class TestConversationHistory(unittest.TestCase):
+    """Test cases for the ConversationHistory class"""
+
+    def test_capacity_is_fixed(self):
+        """Test that the oldest turns drop off once the history is full"""
+        history = ConversationHistory(max_turns=3)
+        for i in range(10):
+            history.add_user(f"message {i}")
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual([turn.text for turn in history], ["message 7", "message 8", "message 9"])
+
+    def test_typed_turns(self):
+        """Test that turns keep role, mood and a timestamp"""
+        history = ConversationHistory()
+        turn = history.add_assistant("I'm here with you.", mood=2)
+
+        self.assertIsInstance(turn, Turn)
+        self.assertEqual((turn.role, turn.mood), ('assistant', 2))
+        self.assertGreater(turn.timestamp, 0)
+        self.assertIs(history.last(), turn)
+
+    def test_to_openai_messages(self):
+        """Test conversion to the OpenAI message format"""
+        history = ConversationHistory()
+        history.add_user("one")
+        history.add_assistant("two")
+        history.add_user("three")
+
+        self.assertEqual(history.to_openai_messages(limit=2), [
+            {"role": "assistant", "content": "two"},
+            {"role": "user", "content": "three"},
+        ])
+        self.assertEqual(len(history.to_openai_messages()), 3)
+        self.assertEqual(history.to_openai_messages(limit=0), [])
+
+    def test_from_transcript_lines(self):
+        """Test parsing of the transcript lines app.py keeps"""
+        history = ConversationHistory.from_lines([
+            "User: Hello Dee! Ready to chat?",
+            "User's current mood: Good",
+            "You: I had a long day",
+            "Companion: Tell me more.",
+        ])
+
+        self.assertEqual([turn.role for turn in history], ['user', 'system', 'user', 'assistant'])
+        self.assertEqual(history[2].text, "I had a long day")
+
+    def test_parse_legacy_mood_response(self):
+        """Test that old dict history records become assistant turns"""
+        turn = parse_line({'type': 'mood_response', 'mood_level': 4, 'response': 'Lovely!'})
+        self.assertEqual((turn.role, turn.text, turn.mood), ('assistant', 'Lovely!', 4))
+
+    def test_clear(self):
+        """Test clearing the history"""
+        history = ConversationHistory.from_lines(["You: hi"])
+        history.clear()
+        self.assertEqual(len(history), 0)
+        self.assertIsNone(history.last())
+
+class TestChatbotHistory(unittest.TestCase):
+    """Integration tests for history in UnifiedChatbot"""
+
+    def test_history_stays_bounded(self):
+        """Test that a long session keeps a constant number of turns"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        for _ in range(100):
+            chatbot.get_empathetic_response(3)
+            chatbot.get_chat_response("I feel okay")
+
+        self.assertEqual(len(chatbot.conversation_history), chatbot.conversation_history.max_turns)
+
+    def test_app_transcript_not_duplicated(self):
+        """Test that a transcript already ending in the message is not repeated in the prompt"""
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False, coalesce=False)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+        chatbot.openai_client.chat.completions.create.return_value.choices[0].message.content = "Okay."
+        transcript = ["You: hi", "Companion: Hello!", "You: I feel tired"]
+
+        chatbot.get_chat_response("I feel tired", transcript)
+
+        messages = chatbot.openai_client.chat.completions.create.call_args.kwargs['messages']
+        self.assertEqual([m['content'] for m in messages[1:]], ["hi", "Hello!", "I feel tired"])
+        self.assertEqual([turn.role for turn in chatbot.conversation_history],
+                         ['user', 'assistant', 'user', 'assistant'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# test_crisis_detector.py - Unit tests for the local crisis signal fast path
+import time
+import unittest
+
+from src.crisis_detector import CrisisDetector, detect_crisis, expand_pattern
+from src.response_corpus import CRISIS_RESPONSES, GROUNDING_PROMPTS
+from src.llm_backend import StubBackend
+from src.chatbot import UnifiedChatbot
+
+class TestCrisisDetector(unittest.TestCase):
+    """Test cases for the CrisisDetector class"""
+
+    def test_detects_each_category(self):
+        """Test phrases from every category, across case, punctuation and apostrophes"""
+        cases = {
+            "I want to KILL myself.": 'self_harm',
+            "Some days I feel like ending it all": 'self_harm',
+            "I don't want to be alive anymore": 'self_harm',
+            "self-harm urges are back": 'self_harm',
+            "I'm gonna hurt him if he does that again": 'harm_to_others',
+            "I can’t breathe and my heart is racing": 'panic',
+            "I think I had a panic attack": 'panic',
+            "I'm freaking out about my exam": 'distress',
+        }
+        for message, category in cases.items():
+            with self.subTest(message=message):
+                signal = detect_crisis(message)
+                self.assertIsNotNone(signal)
+                self.assertEqual(signal.category, category)
+
+    def test_ordinary_messages_do_not_match(self):
+        """Test that everyday wording is not mistaken for a crisis"""
+        for message in ("I was killing it at work today", "My plants will die if I forget them",
+                        "This traffic is a nightmare", "I hurt my knee running", ""):
+            with self.subTest(message=message):
+                self.assertIsNone(detect_crisis(message))
+
+    def test_exclusions_cancel_overlapping_phrases(self):
+        """Test negated and figurative wording that contains a crisis phrase"""
+        for message in ("I don't want to die, I'm scared of the surgery",
+                        "I never wanna die young", "I'm going to hurt her feelings",
+                        "I don't want to hurt their feelings", "I would never hurt myself",
+                        "I don't want to hurt myself", "I'm not going to kill myself",
+                        "I won't end my life over this", "I don't want to hurt him"):
+            with self.subTest(message=message):
+                self.assertIsNone(detect_crisis(message))
+        # Another crisis phrase in the same message is still found
+        signal = detect_crisis("I don't want to die but I want to kill myself")
+        self.assertEqual((signal.category, signal.phrase), ('self_harm', 'kill myself'))
+        self.assertEqual(detect_crisis("I don't want to live").category, 'self_harm')
+        # A negation only cancels the phrase it leads into
+        self.assertEqual(detect_crisis("I'm not okay, I want to hurt myself").category, 'self_harm')
+        self.assertEqual(detect_crisis("Not going to lie, I want to die").category, 'self_harm')
+
+    def test_highest_priority_category_wins(self):
+        """Test that self-harm outranks panic wherever it appears in the message"""
+        signal = detect_crisis("I'm panicking and I want to die")
+        self.assertEqual((signal.category, signal.phrase), ('self_harm', 'want to die'))
+
+    def test_custom_patterns(self):
+        """Test pattern expansion and a detector built from custom patterns"""
+        self.assertEqual(expand_pattern("a|b_c d"), [('a', 'd'), ('b', 'c', 'd')])
+        detector = CrisisDetector([('urgent', ('help me now',))])
+        self.assertEqual(detector.detect("please help me now").category, 'urgent')
+        self.assertIsNone(detector.detect("help me later"))
+        self.assertEqual(detector.max_phrase_words, 3)
+
+    def test_scan_is_fast(self):
+        """Test that a typical turn is scanned well within the 100µs budget"""
+        message = ("Today was long. Work was stressful but I went for a walk with my sister "
+                   "and we talked about what we want to do next year.")
+        detect_crisis(message)
+        runs = 2000
+        started = time.perf_counter()
+        for _ in range(runs):
+            detect_crisis(message)
+        self.assertLess((time.perf_counter() - started) / runs, 100e-6)
+
+class TestChatbotCrisisFastPath(unittest.TestCase):
+    """Integration tests for crisis handling in get_chat_response"""
+
+    def test_crisis_reply_skips_the_backend(self):
+        """Test that a crisis message is answered locally and recorded in history"""
+        stub = StubBackend()
+        chatbot = UnifiedChatbot(ai_enabled=True, use_cache=False, coalesce=False,
+                                 rate_limit=False, backend=stub)
+        response = chatbot.get_chat_response("I keep thinking about suicide")
+        self.assertEqual(response, CRISIS_RESPONSES['self_harm'])
+        self.assertIn("988", response)
+        self.assertEqual(stub.calls, 0)
+        self.assertEqual(chatbot.conversation_history.last().text, response)
+
+        chatbot.get_chat_response("I had a nice walk")
+        self.assertEqual(stub.calls, 1)
+
+    def test_rule_based_mode_gets_the_same_reply(self):
+        """Test the fast path without AI"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        self.assertEqual(chatbot.get_chat_response("I can't breathe"), CRISIS_RESPONSES['panic'])
+
+    def test_distress_keeps_the_normal_reply(self):
+        """Test that everyday distress gets a grounding line before the model's reply"""
+        stub = StubBackend()
+        chatbot = UnifiedChatbot(ai_enabled=True, use_cache=False, coalesce=False,
+                                 rate_limit=False, backend=stub)
+        response = chatbot.get_chat_response("I'm freaking out about my exam")
+        self.assertEqual(stub.calls, 1)
+        self.assertTrue(response.startswith(GROUNDING_PROMPTS['distress'] + " "))
+        self.assertNotEqual(response, CRISIS_RESPONSES['panic'])
+
+if __name__ == "__main__":
+    unittest.main()
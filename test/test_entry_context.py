@@ -0,0 +1,83 @@
+# test_entry_context.py - Unit tests for the recap context builder
+import unittest
+
+from src.entry_context import EntryContextBuilder, estimate_tokens
+
+def daily_entry(date, positive, mood='Good', challenge='Skipped'):
+    """Parsed daily reflection in the shape app.py produces"""
+    fields = [f"Positive moment: {positive}", f"Challenge handled: {challenge}",
+              "Connections:", "Current feelings: okay"]
+    return {'type': 'Daily Reflection', 'date': date, 'mood': mood,
+            'fields': fields, 'content': ' '.join(fields)}
+
+class TestEntryContextBuilder(unittest.TestCase):
+    """Test cases for the EntryContextBuilder class"""
+
+    def setUp(self):
+        self.builder = EntryContextBuilder(token_budget=120)
+
+    def test_drops_empty_and_skipped_answers(self):
+        """Test that digests keep only answered questions"""
+        digest = self.builder.digest(daily_entry("12/14/2025", "a long walk"))
+
+        self.assertIn("Positive moment: a long walk", digest.text)
+        self.assertNotIn("Skipped", digest.text)
+        self.assertNotIn("Connections", digest.text)
+        self.assertIn("mood Good", digest.text)
+
+    def test_chat_keeps_user_lines_only(self):
+        """Test that companion replies are left out of chat digests"""
+        entry = {'type': 'Chat Conversation', 'date': '12/15/2025',
+                 'fields': ["You: I feel anxious about work", "Companion: Tell me more."]}
+        digest = self.builder.digest(entry)
+
+        self.assertIn("I feel anxious about work", digest.text)
+        self.assertNotIn("Tell me more", digest.text)
+
+    def test_entry_without_content_is_skipped(self):
+        """Test that fully skipped entries produce no digest"""
+        entry = {'type': 'Weekly Check-in', 'fields': ["Biggest accomplishment: Skipped"]}
+        self.assertIsNone(self.builder.digest(entry))
+
+    def test_packs_within_budget_preferring_recent(self):
+        """Test that the newest entries win when the budget is tight"""
+        entries = [daily_entry(f"12/{day:02d}/2025", f"note number {day} " + "detail " * 20)
+                   for day in range(1, 21)]
+        selected = self.builder.select(entries)
+
+        self.assertLessEqual(sum(result.tokens for result in selected), self.builder.token_budget)
+        self.assertTrue(selected)
+        self.assertIn("12/20/2025", selected[-1].text)
+        self.assertNotIn("12/01/2025", "\n".join(result.text for result in selected))
+
+    def test_build_includes_summary(self):
+        """Test that summary counts lead the context"""
+        context = self.builder.build([{'entry_count': 3, 'daily_count': 2},
+                                      daily_entry("12/14/2025", "a long walk")])
+
+        self.assertTrue(context.startswith("Total entries: 3\nDaily reflections: 2"))
+        self.assertIn("(1 of 1)", context)
+
+    def test_build_empty(self):
+        """Test the fallback text when nothing usable is present"""
+        self.assertIn("not available", self.builder.build([]))
+
+    def test_digest_cache(self):
+        """Test that unchanged entries are formatted only once"""
+        entries = [daily_entry("12/14/2025", "a long walk"), daily_entry("12/15/2025", "rest")]
+        self.builder.build(entries)
+        self.builder.build([dict(entry) for entry in entries])
+
+        stats = self.builder.stats()
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_long_answers_cut_at_word_boundary(self):
+        """Test that long answers are shortened on a word boundary"""
+        builder = EntryContextBuilder(max_answer_chars=40)
+        digest = builder.digest(daily_entry("12/14/2025", "word " * 30))
+        self.assertIn("word...", digest.text)
+        self.assertLess(estimate_tokens(digest.text), estimate_tokens("word " * 30))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# test_entry_index.py - Unit tests for local journal retrieval
+import unittest
+from unittest.mock import MagicMock
+
+from src.entry_index import EntryIndex
+from src.chatbot import UnifiedChatbot
+
+def daily_entry(date, positive, challenge="Skipped"):
+    """Parsed daily reflection in the shape app.py produces"""
+    return {'type': 'Daily Reflection', 'date': date, 'mood': 'Good',
+            'fields': [f"Positive moment: {positive}", f"Challenge handled: {challenge}"]}
+
+class TestEntryIndex(unittest.TestCase):
+    """Test cases for the EntryIndex class"""
+
+    def setUp(self):
+        self.index = EntryIndex()
+        self.index.add_entries([
+            daily_entry("12/01/2025", "baked bread with my grandmother"),
+            daily_entry("12/02/2025", "finished the project at work", "stressful deadline at work"),
+            daily_entry("12/03/2025", "long run in the park before the rain"),
+        ])
+
+    def test_most_similar_entry_first(self):
+        """Test that the entry sharing the query's words ranks first"""
+        hits = self.index.search("work deadline stress again", k=3)
+
+        self.assertTrue(hits)
+        self.assertIn("deadline at work", hits[0].snippet)
+        self.assertEqual(hits[0].doc_id, 1)
+        self.assertLessEqual(hits[0].score, 1.0 + 1e-6)
+
+    def test_incremental_add(self):
+        """Test that a newly added entry is searchable right away"""
+        self.index.add_entry(daily_entry("12/04/2025", "adopted a puppy named Biscuit"))
+        hits = self.index.search("how is biscuit the puppy")
+
+        self.assertEqual(len(self.index), 4)
+        self.assertIn("Biscuit", hits[0].snippet)
+
+    def test_unrelated_query_returns_nothing(self):
+        """Test that queries without shared words find no entries"""
+        self.assertEqual(self.index.search("quantum chromodynamics"), [])
+        self.assertEqual(self.index.search("the and of"), [])
+
+    def test_skipped_entries_not_indexed(self):
+        """Test that entries without answers are not added"""
+        self.assertIsNone(self.index.add_entry({'type': 'Weekly Check-in',
+                                                'fields': ["Biggest accomplishment: Skipped"]}))
+        self.assertEqual(len(self.index), 3)
+
+    def test_snippets_leave_out_skipped_answers(self):
+        """Test that stored snippets are the compact entry digests"""
+        hit = self.index.search("grandmother bread")[0]
+        self.assertNotIn("Skipped", hit.snippet)
+        self.assertTrue(hit.snippet.startswith("[12/01/2025"))
+
+class TestChatbotRetrieval(unittest.TestCase):
+    """Integration tests for retrieval in AI chat"""
+
+    def test_relevant_entries_added_to_prompt(self):
+        """Test that matching past entries are sent as a system message"""
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False, coalesce=False)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+        chatbot.openai_client.chat.completions.create.return_value.choices[0].message.content = "Okay."
+        chatbot.entry_index = EntryIndex()
+        chatbot.entry_index.add_entry(daily_entry("12/01/2025", "my sister visited for the weekend"))
+
+        chatbot.get_chat_response("I miss my sister")
+
+        messages = chatbot.openai_client.chat.completions.create.call_args.kwargs['messages']
+        context = [m['content'] for m in messages if m['content'].startswith("Relevant past")]
+        self.assertEqual(len(context), 1)
+        self.assertIn("sister visited", context[0])
+
+    def test_no_index_no_context(self):
+        """Test that chat works unchanged without an index"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        self.assertEqual(chatbot._relevant_entries("anything"), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+# test_hierarchical_recap.py - Unit tests for map-reduce recaps over long journals
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from src.hierarchical_recap import HierarchicalRecap, chunk_entries, UNDATED
+from src.chatbot import UnifiedChatbot
+from src.entry_context import EntryContextBuilder
+
+def entry(date, text):
+    """Parsed daily reflection"""
+    return {'type': 'Daily Reflection', 'date': date, 'fields': [f"Positive moment: {text}"]}
+
+class RecordingSummarizer:
+    """Stand-in map/merge steps that record their calls"""
+
+    def __init__(self):
+        self.chunks = []
+        self.merges = []
+        self.lock = threading.Lock()
+
+    def summarize(self, label, entries):
+        with self.lock:
+            self.chunks.append(label)
+        return f"{label}: {len(entries)} entries"
+
+    def merge(self, label, summaries):
+        with self.lock:
+            self.merges.append(label)
+        return f"merged {len(summaries)}"
+
+class TestChunking(unittest.TestCase):
+    """Test cases for grouping entries into periods"""
+
+    def test_week_chunks(self):
+        """Test that entries group by the Monday of their week, oldest first"""
+        chunks = chunk_entries([
+            {'entry_count': 4},
+            entry("12/10/2025", "b"),      # Wednesday
+            entry("12/08/2025", "a"),      # Monday, same week
+            entry("12/15/2025 09:00 AM", "c"),
+            {'type': 'Daily Reflection', 'fields': ["no date"]},
+        ])
+
+        self.assertEqual(list(chunks), ["Week of 12/08/2025", "Week of 12/15/2025", UNDATED])
+        self.assertEqual([e['date'] for e in chunks["Week of 12/08/2025"]],
+                         ["12/08/2025", "12/10/2025"])
+
+    def test_day_chunks(self):
+        """Test per-day chunking"""
+        chunks = chunk_entries([entry("12/08/2025", "a"), entry("12/09/2025", "b")], period='day')
+        self.assertEqual(list(chunks), ["12/08/2025", "12/09/2025"])
+
+class TestHierarchicalRecap(unittest.TestCase):
+    """Test cases for the HierarchicalRecap pipeline"""
+
+    def setUp(self):
+        self.recorder = RecordingSummarizer()
+        self.pipeline = HierarchicalRecap(self.recorder.summarize, self.recorder.merge,
+                                          max_workers=3, max_reduce_inputs=4)
+        self.entries = [entry(f"12/{day:02d}/2025", f"day {day}") for day in range(1, 22, 7)]
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+
+    def test_each_chunk_summarized_once(self):
+        """Test that unchanged chunks are served from the cache"""
+        first = self.pipeline.summarize(self.entries)
+        second = self.pipeline.summarize(self.entries)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.recorder.chunks), 3)
+        self.assertEqual(self.pipeline.stats(), {'summarized': 3, 'reused': 3})
+
+    def test_new_entry_invalidates_only_its_chunk(self):
+        """Test that adding an entry re-summarizes just its week"""
+        self.pipeline.summarize(self.entries)
+        self.pipeline.summarize(self.entries + [entry("12/16/2025", "new")])
+
+        self.assertEqual(len(self.recorder.chunks), 4)
+        self.assertEqual(self.recorder.chunks[-1], "Week of 12/15/2025")
+
+    def test_long_journal_collapses_to_reduce_limit(self):
+        """Test that old summaries are merged until the reduce input fits"""
+        entries = [entry(f"{month:02d}/01/2025", "x") for month in range(1, 13)]
+        summaries = self.pipeline.summarize(entries)
+
+        self.assertLessEqual(len(summaries), 4)
+        self.assertTrue(self.recorder.merges)
+        # The most recent periods are kept as they are
+        self.assertEqual(summaries[-1][1], "Week of 12/01/2025: 1 entries")
+
+    def test_steps_passed_per_call(self):
+        """Test that one pipeline serves callers with their own map and merge steps"""
+        pipeline = HierarchicalRecap(max_workers=2)
+        other = RecordingSummarizer()
+        summaries = pipeline.summarize(self.entries, other.summarize, other.merge)
+        pipeline.shutdown()
+
+        self.assertEqual(len(other.chunks), 3)
+        self.assertEqual(summaries[0], ("Week of 12/01/2025", "Week of 12/01/2025: 1 entries"))
+        self.assertFalse(self.recorder.chunks)
+
+    def test_should_summarize(self):
+        """Test that only journals over the context budget and min_chunks are summarized"""
+        self.assertFalse(self.pipeline.should_summarize(self.entries, lambda entries: True))
+        self.assertTrue(self.pipeline.should_summarize(self.entries, lambda entries: False))
+        one_week = [entry("12/01/2025", "a"), entry("12/02/2025", "b")]
+        self.assertFalse(self.pipeline.should_summarize(one_week, lambda entries: False))
+        pipeline = HierarchicalRecap(self.recorder.summarize, self.recorder.merge, min_chunks=4)
+        self.assertFalse(pipeline.should_summarize(self.entries, lambda entries: False))
+        pipeline.shutdown()
+
+    def test_cache_is_per_source(self):
+        """Test that summaries are not reused for another model, and the pool starts lazily"""
+        self.assertIsNone(self.pipeline._executor)
+        self.pipeline.summarize(self.entries, source="openai:gpt-4o-mini")
+        self.pipeline.summarize(self.entries, source="openai:gpt-4o-mini")
+        self.pipeline.summarize(self.entries, source="openai:gpt-4o")
+
+        self.assertEqual(len(self.recorder.chunks), 6)
+        self.assertIsNotNone(self.pipeline._executor)
+
+    def test_rejects_unknown_period(self):
+        """Test that an unsupported period raises ValueError"""
+        with self.assertRaises(ValueError):
+            HierarchicalRecap(self.recorder.summarize, self.recorder.merge, period='month')
+
+class TestChatbotHierarchicalRecap(unittest.TestCase):
+    """Integration tests for long-journal recaps in UnifiedChatbot"""
+
+    def make_chatbot(self, token_budget):
+        """AI chatbot on a mock client with its own context budget"""
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False, coalesce=False)
+        chatbot.context_builder = EntryContextBuilder(token_budget=token_budget)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+        chatbot.openai_client.chat.completions.create.return_value.choices[0].message.content = "Summary."
+        return chatbot
+
+    def test_multi_week_recap_uses_period_summaries(self):
+        """Test that a journal over the context budget is summarized per week before the recap"""
+        chatbot = self.make_chatbot(token_budget=20)  # Fits one entry, not both
+        entries = [{'entry_count': 2}, entry("12/01/2025", "a walk"), entry("12/15/2025", "a call")]
+
+        chatbot.generate_weekly_recap(entries)
+
+        calls = chatbot.openai_client.chat.completions.create.call_args_list
+        self.assertEqual(len(calls), 3)  # Two week summaries and the final recap
+        final_prompt = calls[-1].kwargs['messages'][1]['content']
+        self.assertIn("Week of 12/15/2025: Summary.", final_prompt)
+
+    def test_short_multi_week_journal_uses_one_prompt(self):
+        """Test that a journal that fits the context budget skips the map step"""
+        chatbot = self.make_chatbot(token_budget=250)
+        entries = [{'entry_count': 2}, entry("12/01/2025", "a walk"), entry("12/15/2025", "a call")]
+
+        chatbot.generate_weekly_recap(entries)
+
+        calls = chatbot.openai_client.chat.completions.create.call_args_list
+        self.assertEqual(len(calls), 1)
+        self.assertIn("a call", calls[0].kwargs['messages'][1]['content'])
+
+    def test_model_change_resummarizes(self):
+        """Test that period summaries written by one model are not reused after a switch"""
+        chatbot = self.make_chatbot(token_budget=20)
+        chatbot.recap_pipeline = HierarchicalRecap(max_workers=1)
+        self.addCleanup(chatbot.recap_pipeline.shutdown)
+        entries = [{'entry_count': 2}, entry("12/01/2025", "a walk"), entry("12/15/2025", "a call")]
+        create = chatbot.openai_client.chat.completions.create
+
+        chatbot.generate_weekly_recap(entries)
+        chatbot.generate_weekly_recap(entries)
+        self.assertEqual(create.call_count, 4)  # Summaries reused, recap made twice
+        chatbot.llm_backend.models['recap'] = 'gpt-4o'
+        chatbot.generate_weekly_recap(entries)
+        self.assertEqual(create.call_count, 7)
+        self.assertEqual(create.call_args_list[4].kwargs['model'], 'gpt-4o')
+
+    def test_pipeline_is_shared(self):
+        """Test that chatbots share one pipeline (worker pool and summary cache)"""
+        first = UnifiedChatbot(ai_enabled=False)
+        second = UnifiedChatbot(ai_enabled=False)
+        self.assertIs(first.recap_pipeline, second.recap_pipeline)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+# test_llm_backend.py - Unit tests for model backends and latency-aware routing
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from src.llm_backend import (BackendError, BackendRouter, ChatBackend, HTTPBackend, OpenAIBackend,
+                             StubBackend, backend_from_env)
+from src.chatbot import UnifiedChatbot
+from test.helpers import FakeClock
+
+MESSAGES = [{"role": "user", "content": "I had a long day"}]
+
+class TimedStub(StubBackend):
+    """Stub that advances a fake clock by a fixed latency per call"""
+
+    def __init__(self, clock, seconds, **kwargs):
+        super().__init__(**kwargs)
+        self.clock = clock
+        self.seconds = seconds
+
+    def _reply(self, messages, model, max_tokens):
+        self.clock.now += self.seconds
+        return super()._reply(messages, model, max_tokens)
+
+class _CompatibleHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible endpoint"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.headers.get('Authorization'), body))
+        if body['model'] == 'broken':
+            self.send_response(500)
+            self.end_headers()
+            self.wfile.write(b"model crashed")
+            return
+        self.send_response(200)
+        if body.get('stream'):
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for word in ("Hello ", "there"):
+                chunk = {'choices': [{'delta': {'content': word}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+        reply = {'model': body['model'],
+                 'choices': [{'message': {'role': 'assistant', 'content': "Local reply"}}],
+                 'usage': {'prompt_tokens': 12, 'completion_tokens': 3}}
+        data = json.dumps(reply).encode()
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class TestBackends(unittest.TestCase):
+    """Test cases for the individual backends"""
+
+    def test_stub_is_deterministic(self):
+        """Test that the stub answers the same request the same way"""
+        stub = StubBackend()
+        first = stub.complete(MESSAGES, call_type='chat')
+        self.assertEqual(first, stub.complete(MESSAGES, call_type='chat'))
+        self.assertIn(first.text, StubBackend.REPLIES)
+        self.assertEqual(first.backend, 'stub')
+        self.assertGreater(first.prompt_tokens, 0)
+        self.assertEqual(''.join(stub.stream(MESSAGES)), first.text)
+
+    def test_backend_interface_is_abstract(self):
+        """Test that a backend must implement complete() and stream()"""
+        with self.assertRaises(TypeError):
+            ChatBackend()
+
+        class CompleteOnly(ChatBackend):
+            def complete(self, messages, **kwargs):
+                return None
+
+        with self.assertRaises(TypeError):
+            CompleteOnly()
+
+    def test_model_per_call_type(self):
+        """Test model selection by call type with prefix fallback"""
+        stub = StubBackend(models={'chat': 'fast', 'recap': 'strong'}, default_model='other')
+        self.assertEqual(stub.model_for('chat'), 'fast')
+        self.assertEqual(stub.model_for('recap_chunk'), 'strong')
+        self.assertEqual(stub.model_for('prewarm'), 'other')
+        self.assertEqual(stub.complete(MESSAGES, call_type='recap').model, 'strong')
+        self.assertEqual(stub.complete(MESSAGES, call_type='recap', model='x').model, 'x')
+
+    def test_openai_backend_reads_usage(self):
+        """Test that the OpenAI backend maps the client response"""
+        client = MagicMock()
+        response = client.chat.completions.create.return_value
+        response.choices[0].message.content = "Hi"
+        response.usage.prompt_tokens = 7
+        response.usage.completion_tokens = 2
+        completion = OpenAIBackend(client).complete(MESSAGES, call_type='chat', max_tokens=20)
+        self.assertEqual((completion.text, completion.total_tokens), ("Hi", 9))
+        self.assertEqual(client.chat.completions.create.call_args.kwargs['model'], 'gpt-4o-mini')
+
+    def test_openai_backend_without_client(self):
+        """Test that a missing client is reported as a backend error"""
+        with self.assertRaises(BackendError):
+            OpenAIBackend(client_factory=lambda: None).complete(MESSAGES)
+
+class TestHTTPBackend(unittest.TestCase):
+    """Test the OpenAI-compatible HTTP backend against a local server"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _CompatibleHandler)
+        cls.server.requests = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_complete(self):
+        """Test a completion round trip with usage and auth header"""
+        backend = HTTPBackend(self.base_url, api_key="secret", models={}, default_model='llama')
+        completion = backend.complete(MESSAGES, max_tokens=30)
+        self.assertEqual(completion.text, "Local reply")
+        self.assertEqual((completion.prompt_tokens, completion.completion_tokens), (12, 3))
+        auth, body = self.server.requests[-1]
+        self.assertEqual(auth, "Bearer secret")
+        self.assertEqual((body['model'], body['max_tokens']), ('llama', 30))
+
+    def test_stream(self):
+        """Test that server-sent events are yielded as text chunks"""
+        backend = HTTPBackend(self.base_url, models={}, default_model='llama')
+        self.assertEqual(list(backend.stream(MESSAGES)), ["Hello ", "there"])
+
+    def test_errors(self):
+        """Test that HTTP and connection errors become BackendError"""
+        with self.assertRaises(BackendError) as raised:
+            HTTPBackend(self.base_url, models={}, default_model='broken').complete(MESSAGES)
+        self.assertEqual(raised.exception.status, 500)
+        with self.assertRaises(BackendError):
+            HTTPBackend("http://127.0.0.1:9/v1", timeout=1).complete(MESSAGES)
+
+class TestBackendRouter(unittest.TestCase):
+    """Test cases for the BackendRouter class"""
+
+    def test_healthy_primary_keeps_all_traffic(self):
+        """Test that configured order wins over latency while the primary is healthy"""
+        clock = FakeClock(0.0)
+        primary = TimedStub(clock, 2.0, name='primary')
+        backup = TimedStub(clock, 0.01, name='backup')
+        router = BackendRouter([primary, backup], min_samples=2, clock=clock)
+
+        for _ in range(30):
+            self.assertEqual(router.complete(MESSAGES).backend, 'primary')
+        self.assertEqual((primary.calls, backup.calls), (30, 0))
+
+    def test_routes_peers_by_lowest_p95(self):
+        """Test that the faster of two peers wins once both are measured"""
+        clock = FakeClock(0.0)
+        slow = TimedStub(clock, 2.0, name='slow')
+        fast = TimedStub(clock, 0.2, name='fast')
+        router = BackendRouter([slow, fast], min_samples=2, clock=clock, priorities=[0, 0])
+
+        for _ in range(6):
+            router.complete(MESSAGES)
+        # Both were measured (two calls each), then everything went to the fast one
+        self.assertEqual((slow.calls, fast.calls), (2, 4))
+        self.assertEqual([backend.name for backend in router.ranked()], ['fast', 'slow'])
+        self.assertAlmostEqual(router.stats()['slow']['p95'], 2.0)
+
+    def test_fails_over_and_avoids_erroring_backend(self):
+        """Test failover and that a failing backend is avoided until its cooldown ends"""
+        clock = FakeClock(0.0)
+        primary = StubBackend(name='primary', failing=True)
+        backup = StubBackend(name='backup')
+        router = BackendRouter([primary, backup], min_samples=1, cooldown=30, clock=clock)
+
+        self.assertEqual(router.complete(MESSAGES).backend, 'backup')
+        router.complete(MESSAGES)
+        self.assertEqual(primary.calls, 1)  # Avoided after its first failure
+        self.assertEqual(router.stats()['primary']['error_rate'], 1.0)
+
+        primary.failing = False
+        clock.now += 31
+        self.assertEqual(router.complete(MESSAGES).backend, 'primary')
+
+    def test_single_failure_does_not_demote_primary(self):
+        """Test that a failed call fails over once without avoiding the primary"""
+        primary = StubBackend(name='primary', failing=True)
+        router = BackendRouter([primary, StubBackend(name='backup')], clock=FakeClock(0.0))
+        self.assertEqual(router.complete(MESSAGES).backend, 'backup')
+        primary.failing = False
+        self.assertEqual(router.complete(MESSAGES).backend, 'primary')
+
+    def test_all_backends_failing_raises(self):
+        """Test that the last error is raised when no backend succeeds"""
+        router = BackendRouter([StubBackend(failing=True), StubBackend(failing=True)])
+        with self.assertRaises(BackendError):
+            router.complete(MESSAGES)
+
+    def test_stream_fails_over_before_first_chunk(self):
+        """Test that streaming moves to the next backend if the first cannot start"""
+        router = BackendRouter([StubBackend(name='down', failing=True), StubBackend(name='up')])
+        self.assertIn(''.join(router.stream(MESSAGES)), StubBackend.REPLIES)
+        self.assertEqual(router.stats()['down']['errors'], 1)
+
+    def test_backend_from_env(self):
+        """Test backend configuration from JOURNAL_LLM_BACKENDS"""
+        with patch.dict(os.environ, {'JOURNAL_LLM_BACKENDS': ''}):
+            self.assertIsNone(backend_from_env())
+        with patch.dict(os.environ, {'JOURNAL_LLM_BACKENDS': 'stub'}):
+            self.assertIsInstance(backend_from_env(), StubBackend)
+        with patch.dict(os.environ, {'JOURNAL_LLM_BACKENDS': 'local, stub',
+                                     'JOURNAL_LLM_LOCAL_URL': 'http://127.0.0.1:8000/v1'}):
+            router = backend_from_env()
+            self.assertEqual([backend.name for backend in router.backends], ['local', 'stub'])
+            self.assertEqual(router.backends[0].url, 'http://127.0.0.1:8000/v1/chat/completions')
+            self.assertEqual(router.priorities, [0, 1])
+        with patch.dict(os.environ, {'JOURNAL_LLM_BACKENDS': 'openai|local,stub',
+                                     'OPENAI_API_KEY': ''}):
+            router = backend_from_env(lambda: None)
+            self.assertEqual([backend.name for backend in router.backends], ['local', 'stub'])
+            self.assertEqual(router.priorities, [0, 1])
+        with patch.dict(os.environ, {'JOURNAL_LLM_BACKENDS': 'local|stub'}):
+            self.assertEqual(backend_from_env().priorities, [0, 0])
+        with patch.dict(os.environ, {'JOURNAL_LLM_BACKENDS': 'mystery'}):
+            with self.assertRaises(ValueError):
+                backend_from_env()
+
+    def test_needs_a_backend(self):
+        """Test that an empty router is rejected"""
+        with self.assertRaises(ValueError):
+            BackendRouter([])
+
+class TestChatbotBackend(unittest.TestCase):
+    """Integration tests for UnifiedChatbot on a configured backend"""
+
+    def test_chat_and_recap_run_offline_on_the_stub(self):
+        """Test that AI mode works end to end without the OpenAI package or key"""
+        stub = StubBackend(models={'chat': 'fast', 'recap': 'strong'})
+        chatbot = UnifiedChatbot(ai_enabled=True, use_cache=False, coalesce=False,
+                                 rate_limit=False, backend=stub)
+        self.assertTrue(chatbot.ai_enabled)
+
+        reply = chatbot.get_chat_response("I had a long day")
+        self.assertIn(reply, StubBackend.REPLIES)
+        recap = chatbot.compose_weekly_recap([{'entry_count': 1}, {'type': 'Daily Reflection',
+                                                                   'content': 'A walk helped'}])
+        self.assertEqual(recap.source, 'ai')
+        self.assertEqual(stub.calls, 2)
+
+    def test_backend_stats_for_router(self):
+        """Test that routing stats are exposed only for routers"""
+        router = BackendRouter([StubBackend(name='a'), StubBackend(name='b')])
+        self.assertIn('a', UnifiedChatbot(ai_enabled=True, backend=router).backend_stats())
+        self.assertEqual(UnifiedChatbot(ai_enabled=False).backend_stats(), {})
+
+if __name__ == "__main__":
+    unittest.main()
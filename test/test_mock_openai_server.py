@@ -0,0 +1,101 @@
+# test_mock_openai_server.py - Unit tests for the mock OpenAI-compatible server
+import json
+import random
+import threading
+import time
+import unittest
+import urllib.request
+
+from src.mock_openai_server import LatencyModel, MockOpenAIServer, REPLIES
+from src.llm_backend import BackendError, HTTPBackend
+
+MESSAGES = [{"role": "user", "content": "Today was calm"}]
+
+class TestLatencyModel(unittest.TestCase):
+    """Test cases for the LatencyModel class"""
+
+    def test_parse_specs(self):
+        """Test that spec strings select the distribution and parameters"""
+        self.assertEqual(LatencyModel.parse("0.25").sample(random.Random(0)), 0.25)
+        model = LatencyModel.parse("uniform:0.1,0.2")
+        samples = [model.sample(random.Random(seed)) for seed in range(50)]
+        self.assertTrue(all(0.1 <= sample <= 0.2 for sample in samples))
+        with self.assertRaises(ValueError):
+            LatencyModel.parse("pareto:1,2")
+
+    def test_samples_are_reproducible_and_non_negative(self):
+        """Test seeded sampling and clamping at zero"""
+        model = LatencyModel.parse("lognormal:0.4,0.5")
+        first = [model.sample(random.Random(7)) for _ in range(3)]
+        self.assertEqual(first, [model.sample(random.Random(7)) for _ in range(3)])
+        normal = LatencyModel('normal', 0.0, 1.0)
+        rng = random.Random(1)
+        self.assertTrue(all(normal.sample(rng) >= 0 for _ in range(100)))
+
+class TestMockOpenAIServer(unittest.TestCase):
+    """Round trips against a running mock server"""
+
+    def test_completion_round_trip(self):
+        """Test a plain completion with usage and deterministic content"""
+        with MockOpenAIServer() as server:
+            backend = HTTPBackend(server.base_url, models={}, default_model='gpt-4o-mini')
+            first = backend.complete(MESSAGES, max_tokens=100)
+            self.assertEqual(first, backend.complete(MESSAGES, max_tokens=100))
+            self.assertIn(first.text, REPLIES)
+            self.assertEqual(first.completion_tokens, len(first.text.split(' ')))
+            self.assertGreater(first.prompt_tokens, 0)
+            self.assertEqual(backend.complete(MESSAGES, max_tokens=3).completion_tokens, 3)
+            self.assertEqual(server.stats()['completed'], 3)
+
+    def test_streaming_is_paced_per_token(self):
+        """Test that streamed tokens arrive one by one at the configured interval"""
+        with MockOpenAIServer(token_interval=0.01) as server:
+            backend = HTTPBackend(server.base_url)
+            started = time.perf_counter()
+            chunks = list(backend.stream(MESSAGES, max_tokens=5))
+            self.assertEqual(len(chunks), 5)
+            self.assertGreaterEqual(time.perf_counter() - started, 0.04)
+
+    def test_injected_failures(self):
+        """Test that 429 and 500 responses are injected at the configured rates"""
+        with MockOpenAIServer(rate_limit_rate=1.0) as server:
+            with self.assertRaises(BackendError) as raised:
+                HTTPBackend(server.base_url).complete(MESSAGES)
+            self.assertEqual(raised.exception.status, 429)
+        with MockOpenAIServer(error_rate=1.0) as server:
+            with self.assertRaises(BackendError) as raised:
+                HTTPBackend(server.base_url).complete(MESSAGES)
+            self.assertEqual(raised.exception.status, 500)
+            self.assertEqual(server.stats()['errors'], 1)
+
+    def test_concurrency_limit_returns_429(self):
+        """Test that requests beyond max_concurrent are rate limited"""
+        with MockOpenAIServer(latency=LatencyModel('fixed', 0.3), max_concurrent=1) as server:
+            backend = HTTPBackend(server.base_url)
+            statuses = []
+
+            def call():
+                try:
+                    backend.complete(MESSAGES)
+                    statuses.append(200)
+                except BackendError as e:
+                    statuses.append(e.status)
+
+            threads = [threading.Thread(target=call) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+                time.sleep(0.05)
+            for thread in threads:
+                thread.join(5)
+            self.assertEqual(sorted(statuses), [200, 429, 429])
+            self.assertEqual(server.stats()['max_in_flight'], 1)
+
+    def test_models_endpoint(self):
+        """Test the models listing used by connection prewarm"""
+        with MockOpenAIServer() as server:
+            with urllib.request.urlopen(server.base_url + "/models", timeout=5) as response:
+                body = json.loads(response.read())
+        self.assertEqual(body['data'][0]['id'], 'gpt-4o-mini')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,10 @@
 import unittest
 from src.mood_assessment import (
     assess_mood, 
+    assess_moods,
     display_mood_scale, 
+    edit_distance,
+    MOOD_LEVELS,
     get_mood_color, 
     suggest_mood_activities
 )
@@ -71,6 +74,73 @@ class TestMoodAssessment(unittest.TestCase):
                 self.assertIsNotNone(result, f"Failed for input: {input_str}")
                 self.assertEqual(result['level'], expected_level)
     
+    def test_assess_mood_phrases(self):
+        """Test chained intensifiers, hedges, diminishers and negation"""
+        test_cases = [
+            ("really really sad", 1),
+            ("very very low", 1),
+            ("pretty good", 4),
+            ("I'm feeling kinda down", 1),
+            ("a little bit happy", 3),
+            ("not happy", 2),
+            ("not okay", 2),
+            ("not sad", 3),
+            ("not very good", 2),
+            ("not too bad", 4),
+            ("Not terrible!", 4),
+            ("so-so", 3),
+            ("so so", 3),
+            ("i am so so happy", 5),
+            ("so so sad", 1),
+        ]
+        
+        for input_str, expected_level in test_cases:
+            with self.subTest(input=input_str):
+                result = assess_mood(input_str)
+                self.assertIsNotNone(result, f"Failed for input: {input_str}")
+                self.assertEqual(result['level'], expected_level)
+        
+        # Modified results keep the legacy wording
+        self.assertEqual(assess_mood("a bit happy")['description'], "Slightly Good")
+        self.assertEqual(assess_mood("very happy")['description'], "Very Good")
+        for input_str in ("very", "not", "happy sad", "sad today", "not really sure"):
+            with self.subTest(input=input_str):
+                self.assertIsNone(assess_mood(input_str))
+    
+    def test_assess_mood_misspellings(self):
+        """Test that misspelled keywords are corrected and report confidence"""
+        test_cases = [
+            ("hapy", 4, "happy"),
+            ("Depresed", 1, "depressed"),
+            ("exellent", 5, "excellent"),
+            ("very hapy", 5, "happy"),
+        ]
+        
+        for input_str, expected_level, expected_word in test_cases:
+            with self.subTest(input=input_str):
+                result = assess_mood(input_str)
+                self.assertIsNotNone(result, f"Failed for input: {input_str}")
+                self.assertEqual(result['level'], expected_level)
+                self.assertEqual(result['matched'], expected_word)
+                self.assertGreater(result['confidence'], 0.7)
+                self.assertLess(result['confidence'], 1.0)
+        
+        # Exact matches carry no correction
+        self.assertNotIn('confidence', assess_mood("happy"))
+        # Too far from any keyword
+        self.assertIsNone(assess_mood("tired"))
+        # Short words are words of their own, not typos
+        for input_str in ("mad", "rad", "sat", "god"):
+            with self.subTest(input=input_str):
+                self.assertIsNone(assess_mood(input_str))
+    
+    def test_edit_distance(self):
+        """Test the Levenshtein distance used for corrections"""
+        self.assertEqual(edit_distance("hapy", "happy"), 1)
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("", "sad"), 3)
+        self.assertEqual(edit_distance("sad", "sad"), 0)
+    
     def test_assess_mood_invalid(self):
         """Test mood assessment with invalid inputs"""
         invalid_inputs = [
@@ -204,6 +274,26 @@ class TestMoodAssessment(unittest.TestCase):
                         self.assertEqual(result['level'], first_result['level'])
                         self.assertEqual(result['description'], first_result['description'])
 
+    def test_results_are_independent_copies(self):
+        """Test that changing a result does not affect the shared mood table"""
+        result = assess_mood("happy")
+        result['level'] = 1
+        result['note'] = "edited"
+        self.assertEqual(assess_mood("happy")['level'], 4)
+        self.assertNotIn('note', assess_mood("happy"))
+        self.assertEqual(MOOD_LEVELS[4]['level'], 4)
+        with self.assertRaises(TypeError):
+            MOOD_LEVELS[4]['level'] = 1
+    
+    def test_assess_moods_batch(self):
+        """Test bulk assessment matches assess_mood, in order"""
+        inputs = ["3", "Sad", "", "invalid", " a bit happy ", "sad"]
+        results = assess_moods(inputs)
+        self.assertEqual(results, [assess_mood(text) for text in inputs])
+        self.assertEqual([result and result['level'] for result in results], [3, 2, None, None, 3, 2])
+        self.assertIsNot(results[1], results[5])
+        self.assertEqual(assess_moods(iter(["5"]))[0]['description'], "Very Good")
+
 class TestMoodAssessmentIntegration(unittest.TestCase):
     """Integration tests for mood assessment with other components"""
     
@@ -0,0 +1,126 @@
+# test_mood_series.py - Unit tests for the mood time series
+import datetime
+import math
+import unittest
+
+import numpy as np
+
+from src.mood_series import DAY, MoodSeries, entry_timestamp
+from src.chatbot import UnifiedChatbot
+
+NOW = 1_800_000_000
+
+def series_of(points, alpha=0.5):
+    """Series from (days ago, level) pairs, oldest first"""
+    series = MoodSeries(alpha=alpha)
+    for days_ago, level in points:
+        series.append(NOW - days_ago * DAY, level)
+    return series
+
+class TestMoodSeries(unittest.TestCase):
+    """Test cases for the MoodSeries class"""
+
+    def test_compact_arrays(self):
+        """Test that check-ins are stored as int64 timestamps and int8 levels"""
+        series = series_of([(3, 2), (1, 4)])
+        times, levels = series.arrays()
+        self.assertEqual((times.dtype, levels.dtype), (np.int64, np.int8))
+        self.assertEqual(levels.tolist(), [2, 4])
+        self.assertEqual(len(series), 2)
+        # Out of order check-ins are moved up to keep the series sorted
+        series.append(NOW - 10 * DAY, 3)
+        self.assertEqual(series.arrays()[0][-1], times[-1])
+        with self.assertRaises(ValueError):
+            series.append(NOW, 6)
+
+    def test_rolling_statistics_match_direct_computation(self):
+        """Test prefix-sum rolling mean and volatility against a rescan"""
+        levels = [2, 3, 1, 5, 4, 4, 2, 3]
+        series = series_of([(len(levels) - day, level) for day, level in enumerate(levels)])
+        means, stds = series.rolling_mean(3), series.rolling_volatility(3)
+        for index in range(len(levels)):
+            window = levels[max(0, index - 2):index + 1]
+            self.assertAlmostEqual(means[index], np.mean(window))
+            self.assertAlmostEqual(stds[index], np.std(window))
+
+    def test_ewma_is_updated_incrementally(self):
+        """Test the EWMA recurrence, starting from the first check-in"""
+        series = series_of([(3, 2), (2, 4), (1, 4)], alpha=0.5)
+        self.assertEqual(series.ewma().tolist(), [2.0, 3.0, 3.5])
+
+    def test_weekly_means_and_week_over_week(self):
+        """Test 7-day period means and their deltas, with an empty week"""
+        series = series_of([(20, 1), (10, 2), (9, 4), (2, 4), (1, 5)])
+        means = series.weekly_means(4, NOW)
+        self.assertTrue(math.isnan(means[0]))  # 21-28 days ago
+        self.assertEqual(means[1:].tolist(), [1.0, 3.0, 4.5])
+        self.assertEqual(series.week_over_week(3, NOW).tolist(), [2.0, 1.5])
+
+    def test_window_stats(self):
+        """Test statistics over a time range"""
+        series = series_of([(5, 2), (3, 4), (1, 3)])
+        count, mean, std = series.window_stats(NOW - 4 * DAY, NOW)
+        self.assertEqual(count, 2)
+        self.assertAlmostEqual(mean, 3.5)
+        self.assertAlmostEqual(std, 0.5)
+        self.assertEqual(series.window_stats(NOW, NOW + DAY)[0], 0)
+
+    def test_describe(self):
+        """Test the trend sentence used by recaps and chat"""
+        self.assertIsNone(MoodSeries().describe(NOW))
+        rising = series_of([(10, 2), (9, 2), (3, 4), (1, 4)]).describe(NOW)
+        self.assertIn("averaged 4.0/5", rising)
+        self.assertIn("up 2.0 from the week before", rising)
+        self.assertIn("fairly steady", rising)
+        stale = series_of([(30, 5)]).describe(NOW)
+        self.assertIn("No mood check-ins in the last 7 days", stale)
+        self.assertIn("Very Good", stale)
+
+    def test_reflect(self):
+        """Test the recap wording of the trend"""
+        self.assertIsNone(series_of([(30, 5)]).reflect(NOW))
+        self.assertIn("lifting", series_of([(10, 2), (3, 4), (1, 4)]).reflect(NOW))
+        self.assertIn("dipped", series_of([(10, 5), (3, 3), (1, 3)]).reflect(NOW))
+        changeable = series_of([(3, 1), (2, 5), (1, 1)]).reflect(NOW)
+        self.assertIn("fairly even", changeable)
+        self.assertIn("day to day", changeable)
+
+    def test_entry_timestamp(self):
+        """Test that check-ins are stamped at local midnight of their journal date"""
+        midnight = entry_timestamp("10/12/2026")
+        self.assertEqual(entry_timestamp("10/12/2026 05:00 PM"), midnight)
+        self.assertEqual(datetime.datetime.fromtimestamp(midnight).hour, 0)
+        self.assertIsNone(entry_timestamp("unknown"))
+
+    def test_from_entries(self):
+        """Test seeding from parsed journal entries by mood description"""
+        entries = [
+            {'type': 'Daily Reflection', 'date': '10/12/2026', 'mood': 'Good'},
+            {'type': 'Chat Conversation', 'date': '10/12/2026 05:00 PM'},
+            {'type': 'Daily Reflection', 'date': '10/13/2026', 'mood': 'Slightly Good'},
+            {'type': 'Daily Reflection', 'date': 'unknown', 'mood': 'Low'},
+        ]
+        series = MoodSeries.from_entries(entries)
+        times, levels = series.arrays()
+        self.assertEqual(levels.tolist(), [4, 3])
+        self.assertEqual(times[1] - times[0], DAY)
+        self.assertEqual(datetime.datetime.fromtimestamp(times[0]).day, 12)
+
+class TestRecapMoodTrend(unittest.TestCase):
+    """Integration of the mood trend with weekly recaps"""
+
+    def test_rule_based_recap_uses_the_reflection(self):
+        """Test that the recap gets the reflection wording and the AI context the statistics"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        trend = "Mood averaged 3.5/5 over the last 7 days (2 check-ins)."
+        reflection = "Your mood has stayed fairly even this week."
+        summary = {'entry_count': 2, 'mood_trend': trend, 'mood_reflection': reflection}
+        recap = chatbot.compose_weekly_recap([summary])
+        self.assertTrue(recap.text.endswith(reflection))
+        self.assertNotIn(trend, recap.text)
+        context = chatbot.context_builder.build([summary])
+        self.assertIn(f"Mood trend: {trend}", context)
+        self.assertNotIn(reflection, context)
+
+if __name__ == "__main__":
+    unittest.main()
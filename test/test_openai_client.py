@@ -0,0 +1,107 @@
+# test_openai_client.py - Unit tests for the shared OpenAI client factory
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src import openai_client
+from src.chatbot import UnifiedChatbot
+
+class TestOpenAIClientFactory(unittest.TestCase):
+    """Test cases for the lazily created, process-wide client"""
+
+    def setUp(self):
+        openai_client.reset_client()
+
+    def tearDown(self):
+        openai_client.reset_client()
+
+    def test_no_api_key_returns_none(self):
+        """Test that no client is built without an API key"""
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(openai_client.get_openai_client())
+
+    def test_client_is_shared(self):
+        """Test that repeated calls return the same client instance"""
+        fake_module = MagicMock()
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'}), \
+             patch.object(openai_client, 'OPENAI_AVAILABLE', True), \
+             patch.dict('sys.modules', {'openai': fake_module}), \
+             patch('builtins.print') as printed:
+            first = openai_client.get_openai_client()
+            second = openai_client.get_openai_client()
+
+        self.assertIs(first, second)
+        self.assertEqual(fake_module.OpenAI.call_count, 1)
+        printed.assert_not_called()
+
+    def test_failure_is_kept_not_printed(self):
+        """Test that a failed client is reported through get_client_error only"""
+        fake_module = MagicMock()
+        fake_module.OpenAI.side_effect = RuntimeError("bad proxy")
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'}), \
+             patch.object(openai_client, 'OPENAI_AVAILABLE', True), \
+             patch.dict('sys.modules', {'openai': fake_module}), \
+             patch('builtins.print') as printed:
+            self.assertIsNone(openai_client.get_openai_client())
+
+        printed.assert_not_called()
+        self.assertIn("bad proxy", openai_client.get_client_error())
+
+    def test_configure_client_rejects_unknown_settings(self):
+        """Test that unknown pool settings raise ValueError"""
+        with self.assertRaises(ValueError):
+            openai_client.configure_client(pool_size=5)
+
+    def test_configure_client_updates_settings(self):
+        """Test that settings changes are visible"""
+        original = openai_client.get_client_settings()
+        try:
+            openai_client.configure_client(max_connections=3, timeout=12.5)
+            settings = openai_client.get_client_settings()
+            self.assertEqual(settings['max_connections'], 3)
+            self.assertEqual(settings['timeout'], 12.5)
+        finally:
+            openai_client.configure_client(**original)
+
+class TestChatbotLazyClient(unittest.TestCase):
+    """Test that chatbots fetch the shared client only on first AI use"""
+
+    def test_client_not_created_at_construction(self):
+        """Test that constructing a chatbot does not build a client"""
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'}), \
+             patch('src.chatbot.OPENAI_AVAILABLE', True), \
+             patch('src.chatbot.get_openai_client') as factory, \
+             patch('builtins.print'):
+            chatbot = UnifiedChatbot(ai_enabled=True)
+            self.assertTrue(chatbot.ai_enabled)
+        factory.assert_not_called()
+
+    def test_instances_share_client(self):
+        """Test that two AI-enabled chatbots use the same client"""
+        shared = MagicMock()
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'}), \
+             patch('src.chatbot.OPENAI_AVAILABLE', True), \
+             patch('src.chatbot.get_openai_client', return_value=shared), \
+             patch('builtins.print'):
+            first = UnifiedChatbot(ai_enabled=True)
+            second = UnifiedChatbot(ai_enabled=True)
+            self.assertIs(first.openai_client, shared)
+            self.assertIs(second.openai_client, shared)
+
+    def test_rebuilt_client_is_picked_up(self):
+        """Test that a client rebuilt after reset_client() replaces the old one"""
+        old, new = MagicMock(), MagicMock()
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'}), \
+             patch('src.chatbot.OPENAI_AVAILABLE', True), \
+             patch('src.chatbot.get_openai_client', side_effect=[old, new]), \
+             patch('builtins.print'):
+            chatbot = UnifiedChatbot(ai_enabled=True)
+            self.assertIs(chatbot.openai_client, old)
+            self.assertIs(chatbot.openai_client, new)
+            # A client set on the instance overrides the shared one
+            override = MagicMock()
+            chatbot.openai_client = override
+            self.assertIs(chatbot.openai_client, override)
+
+if __name__ == "__main__":
+    unittest.main()
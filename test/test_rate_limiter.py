@@ -0,0 +1,144 @@
+# test_rate_limiter.py - Unit tests for API rate limiting and admission control
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.rate_limiter import RateLimiter, RateLimitExceeded, estimate_request_tokens
+from src.chatbot import UnifiedChatbot
+from test.helpers import FakeClock
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the RateLimiter class"""
+
+    def test_request_budget_rejects_when_refill_is_too_slow(self):
+        """Test that a request the bucket cannot refill for in time fails fast"""
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1000, clock=clock)
+        limiter.acquire(timeout=1).release()
+        limiter.acquire(timeout=1).release()
+
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire(timeout=1)
+        stats = limiter.stats()
+        self.assertEqual(stats['admitted'], 2)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_buckets_refill_over_time(self):
+        """Test that the budget comes back at the per-minute rate"""
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600, clock=clock)
+        limiter.acquire(tokens=600, timeout=0).release()
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire(tokens=100, timeout=1)
+
+        clock.now += 10  # 100 tokens refilled
+        limiter.acquire(tokens=100, timeout=0).release()
+
+    def test_oversized_request_is_charged_the_full_budget(self):
+        """Test that a request larger than the token budget can still be admitted"""
+        limiter = RateLimiter(tokens_per_minute=100, clock=FakeClock())
+        with limiter.acquire(tokens=5000, timeout=0) as permit:
+            self.assertEqual(permit.tokens, 100)
+
+    def test_settle_returns_unused_tokens(self):
+        """Test that reporting actual usage corrects the token bucket"""
+        clock = FakeClock()
+        limiter = RateLimiter(tokens_per_minute=1000, clock=clock)
+        with limiter.acquire(tokens=900, timeout=0) as permit:
+            permit.settle(100)
+        limiter.acquire(tokens=800, timeout=0).release()
+
+    def test_in_flight_cap_queues_then_times_out(self):
+        """Test that callers wait for a free slot and give up at the deadline"""
+        limiter = RateLimiter(max_in_flight=1)
+        permit = limiter.acquire()
+        started = time.monotonic()
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire(timeout=0.1)
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+        permit.release()
+        permit.release()  # Releasing twice is harmless
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+    def test_released_slot_admits_waiting_caller(self):
+        """Test that a queued caller is admitted when a slot frees up"""
+        limiter = RateLimiter(max_in_flight=1)
+        permit = limiter.acquire()
+        admitted = []
+
+        def waiter():
+            with limiter.acquire(timeout=5) as second:
+                admitted.append(second.wait_seconds)
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        deadline = time.time() + 5
+        while limiter.stats()['queue_depth'] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(limiter.stats()['queue_depth'], 1)
+        permit.release()
+        thread.join(5)
+
+        self.assertEqual(len(admitted), 1)
+        stats = limiter.stats()
+        self.assertEqual(stats['admitted'], 2)
+        self.assertGreater(stats['max_wait'], 0)
+
+    def test_invalid_limits(self):
+        """Test that non-positive limits are rejected"""
+        with self.assertRaises(ValueError):
+            RateLimiter(requests_per_minute=0)
+        with self.assertRaises(ValueError):
+            RateLimiter(max_in_flight=0)
+
+    def test_estimate_request_tokens(self):
+        """Test that the estimate covers prompt and completion budget"""
+        messages = [{"role": "user", "content": "x" * 400}]
+        self.assertEqual(estimate_request_tokens(messages, 50), 154)
+
+class TestChatbotRateLimiting(unittest.TestCase):
+    """Integration tests for rate limiting in UnifiedChatbot"""
+
+    def test_completion_settles_reported_usage(self):
+        """Test that API calls pass through the limiter and report usage"""
+        limiter = RateLimiter(tokens_per_minute=10000, clock=FakeClock())
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False, coalesce=False,
+                                 rate_limiter=limiter)
+        response = MagicMock()
+        response.choices[0].message.content = "Reply"
+        response.usage.prompt_tokens = 40
+        response.usage.completion_tokens = 10
+        chatbot.openai_client = MagicMock()
+        chatbot.openai_client.chat.completions.create.return_value = response
+
+        self.assertEqual(chatbot._create_completion([{"role": "user", "content": "Hi"}], 400), "Reply")
+        stats = chatbot.rate_limit_stats()
+        self.assertEqual(stats['admitted'], 1)
+        self.assertEqual(stats['in_flight'], 0)
+        # 10000 - 50 tokens left, so a 9900 token request still fits
+        limiter.acquire(tokens=9900, timeout=0).release()
+
+    def test_rejected_chat_falls_back_to_rules(self):
+        """Test that a chat request over the limit gets a rule-based reply"""
+        limiter = RateLimiter(requests_per_minute=1, clock=FakeClock(), timeout=0)
+        limiter.acquire().release()
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False, coalesce=False,
+                                 rate_limiter=limiter)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+
+        response = chatbot.get_chat_response("hello there")
+        self.assertTrue(response)
+        chatbot.openai_client.chat.completions.create.assert_not_called()
+        self.assertEqual(chatbot.rate_limit_stats()['rejected'], 1)
+
+    def test_rate_limiting_can_be_disabled(self):
+        """Test that rate_limit=False turns off admission control"""
+        chatbot = UnifiedChatbot(ai_enabled=False, rate_limit=False)
+        self.assertIsNone(chatbot.rate_limiter)
+        self.assertEqual(chatbot.rate_limit_stats(), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+# test_recap_queue.py - Unit tests for the deferred AI recap queue
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.recap_queue import RecapQueue
+from src.chatbot import UnifiedChatbot
+from test.helpers import FakeClock
+
+ENTRIES = [{'entry_count': 1}, {'type': 'Daily Reflection', 'date': '12/14/2025',
+                                'fields': ['Positive moment: a long walk']}]
+
+class TestRecapQueue(unittest.TestCase):
+    """Test cases for the RecapQueue class"""
+
+    def setUp(self):
+        self.clock = FakeClock(1_700_000_000.0)
+        self.queue = RecapQueue(retry_base=30, retry_max=120, max_attempts=4, clock=self.clock)
+        self.delivered = []
+
+    def tearDown(self):
+        self.queue.close()
+
+    def deliver(self, job, recap):
+        self.delivered.append((job.journal, recap))
+
+    def test_drain_delivers_and_removes_jobs(self):
+        """Test that a successful drain hands the recap over and empties the queue"""
+        self.queue.enqueue('Ana', ENTRIES)
+        self.assertEqual(self.queue.drain(lambda entries: "Full recap", self.deliver), 1)
+        self.assertEqual(self.delivered, [('Ana', "Full recap")])
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.stats()['completed'], 1)
+
+    def test_one_job_per_journal(self):
+        """Test that a newer request replaces the entries but keeps the request time"""
+        first = self.queue.enqueue('Ana', ENTRIES)
+        self.clock.now += 100
+        second = self.queue.enqueue('Ana', ENTRIES + [{'type': 'Weekly Check-in'}])
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(second.requested, first.requested)
+        self.assertEqual(len(self.queue.pending()[0].entries), 3)
+
+    def test_failures_back_off_then_drop(self):
+        """Test exponential backoff between retries and dropping after max_attempts"""
+        self.queue.enqueue('Ana', ENTRIES)
+
+        def failing(entries):
+            raise RuntimeError("offline")
+
+        self.assertEqual(self.queue.drain(failing, self.deliver), 0)
+        self.assertEqual(self.queue.pending(due_only=True), [])
+        self.clock.now += 30
+        self.queue.drain(failing, self.deliver)          # 2nd failure, next wait 60s
+        self.clock.now += 59
+        self.assertEqual(self.queue.pending(due_only=True), [])
+        self.clock.now += 1
+        self.queue.drain(failing, self.deliver)          # 3rd failure, next wait 120s
+        self.clock.now += 120
+        self.queue.drain(failing, self.deliver)          # 4th failure drops the job
+
+        self.assertEqual(len(self.queue), 0)
+        stats = self.queue.stats()
+        self.assertEqual(stats['failed'], 4)
+        self.assertEqual(stats['dropped'], 1)
+        self.assertEqual(self.delivered, [])
+
+    def test_drain_stops_at_first_failure(self):
+        """Test that later jobs are not attempted while the backend is down"""
+        self.queue.enqueue('Ana', ENTRIES)
+        self.clock.now += 1
+        self.queue.enqueue('Ben', ENTRIES)
+        generate = MagicMock(side_effect=RuntimeError("offline"))
+        self.queue.drain(generate, self.deliver)
+        self.assertEqual(generate.call_count, 1)
+
+    def test_newer_entries_survive_an_in_flight_drain(self):
+        """Test that a request queued during a drain is not lost when the drain finishes"""
+        self.queue.enqueue('Ana', ENTRIES)
+
+        def generate(entries):
+            self.queue.enqueue('Ana', ENTRIES + [{'type': 'Weekly Check-in'}])
+            return "Recap of older entries"
+
+        self.queue.drain(generate, self.deliver)
+        self.assertEqual(len(self.queue), 1)
+        self.assertEqual(len(self.queue.pending()[0].entries), 3)
+
+    def test_jobs_survive_reopening(self):
+        """Test that queued recaps are kept on disk across restarts"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "queue.db")
+            queue = RecapQueue(path)
+            queue.enqueue('Ana', ENTRIES)
+            queue.close()
+
+            reopened = RecapQueue(path)
+            self.assertEqual(reopened.pending()[0].entries, ENTRIES)
+            reopened.close()
+
+    def test_background_worker_drains(self):
+        """Test that the worker thread completes queued recaps"""
+        self.queue.enqueue('Ana', ENTRIES)
+        self.queue.start(lambda entries: "Later recap", self.deliver, interval=0.01)
+        deadline = time.time() + 5
+        while not self.delivered and time.time() < deadline:
+            time.sleep(0.01)
+        self.queue.stop(timeout=5)
+        self.assertEqual(self.delivered, [('Ana', "Later recap")])
+
+class TestComposeWeeklyRecap(unittest.TestCase):
+    """Test the recap source reported by UnifiedChatbot"""
+
+    def test_rule_based_recap(self):
+        """Test that recaps without AI are reported as rule-based"""
+        result = UnifiedChatbot(ai_enabled=False).compose_weekly_recap(ENTRIES)
+        self.assertEqual(result.source, 'rules')
+        self.assertIsNone(result.error)
+
+    def test_failed_ai_recap_is_a_fallback(self):
+        """Test that an AI failure is reported so the recap can be deferred"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+        with patch.object(chatbot, '_generate_ai_recap', side_effect=RuntimeError("offline")):
+            result = chatbot.compose_weekly_recap(ENTRIES)
+        self.assertEqual(result.source, 'fallback')
+        self.assertIn("offline", result.error)
+        self.assertTrue(result.text)
+
+        with patch.object(chatbot, '_generate_ai_recap', return_value="AI recap"):
+            self.assertEqual(chatbot.compose_weekly_recap(ENTRIES).source, 'ai')
+            self.assertEqual(chatbot.generate_weekly_recap(ENTRIES), "AI recap")
+
+    def test_quiet_recap_does_not_print_failures(self):
+        """Test that background callers can keep AI failures off the screen"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        chatbot.ai_enabled = True
+        chatbot.openai_client = MagicMock()
+        with patch.object(chatbot, '_generate_ai_recap', side_effect=RuntimeError("offline")), \
+             patch('builtins.print') as printed:
+            result = chatbot.compose_weekly_recap(ENTRIES, quiet=True)
+        printed.assert_not_called()
+        self.assertIn("offline", result.error)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# test_recap_speculator.py - Unit tests for speculative weekly recaps
+import threading
+import unittest
+
+from src.recap_speculator import RecapSpeculator, fingerprint_entries
+from src.chatbot import RecapResult
+
+class CountingGenerator:
+    """Stand-in recap generator that records how often it ran"""
+
+    def __init__(self, source='ai'):
+        self.calls = 0
+        self.source = source
+        self.lock = threading.Lock()
+
+    def __call__(self, entries):
+        with self.lock:
+            self.calls += 1
+        return RecapResult(f"Recap of {len(entries)} entries", self.source)
+
+class TestRecapSpeculator(unittest.TestCase):
+    """Test cases for the RecapSpeculator class"""
+
+    def setUp(self):
+        self.generate = CountingGenerator()
+        self.speculator = RecapSpeculator(self.generate, max_wasted=2)
+        self.entries = [{'entry_count': 1}, {'mood': 'Good', 'content': 'A nice walk'}]
+
+    def tearDown(self):
+        self.speculator.shutdown()
+
+    def test_fingerprint_changes_with_entries(self):
+        """Test that a new entry changes the fingerprint"""
+        longer = self.entries + [{'mood': 'Low'}]
+        self.assertEqual(fingerprint_entries(self.entries), fingerprint_entries(list(self.entries)))
+        self.assertNotEqual(fingerprint_entries(self.entries), fingerprint_entries(longer))
+
+    def test_take_returns_speculative_recap(self):
+        """Test that a matching recap is returned without a second call"""
+        self.assertTrue(self.speculator.schedule("Dee", self.entries))
+        recap = self.speculator.take("Dee", self.entries, timeout=5)
+
+        self.assertEqual(recap, RecapResult("Recap of 2 entries", 'ai'))
+        self.assertEqual(self.generate.calls, 1)
+        self.assertEqual(self.speculator.stats()['used'], 1)
+
+    def test_take_ignores_stale_recap(self):
+        """Test that a recap computed from older entries is not served"""
+        self.speculator.schedule("Dee", self.entries)
+        newer = self.entries + [{'mood': 'Low'}]
+        self.assertIsNone(self.speculator.take("Dee", newer, timeout=5))
+
+    def test_take_discards_fallback_recap(self):
+        """Test that a recap whose AI call failed is not served in place of a retry"""
+        self.generate.source = 'fallback'
+        self.speculator.schedule("Dee", self.entries)
+        self.assertIsNone(self.speculator.take("Dee", self.entries, timeout=5))
+        stats = self.speculator.stats()
+        self.assertEqual((stats['used'], stats['wasted'], stats['pending']), (0, 1, 0))
+
+    def test_same_entries_not_rescheduled(self):
+        """Test that scheduling identical entries twice starts one job"""
+        self.assertTrue(self.speculator.schedule("Dee", self.entries))
+        self.assertFalse(self.speculator.schedule("Dee", list(self.entries)))
+        self.assertEqual(self.speculator.stats()['started'], 1)
+
+    def test_wasted_cap_stops_speculation(self):
+        """Test that speculation stops once max_wasted results were discarded"""
+        for i in range(2):
+            entries = self.entries + [{'content': f'entry {i}'}]
+            self.assertTrue(self.speculator.schedule("Dee", entries))
+            # Let the job finish so superseding it counts as wasted
+            self.speculator._jobs["Dee"].future.result(timeout=5)
+
+        # Superseding the second job reaches the cap, so nothing new starts
+        entries = self.entries + [{'content': 'final'}]
+        self.assertFalse(self.speculator.schedule("Dee", entries))
+        stats = self.speculator.stats()
+        self.assertEqual(stats['wasted'], 2)
+        self.assertFalse(stats['enabled'])
+
+    def test_invalidate(self):
+        """Test that invalidate drops the pending recap"""
+        self.speculator.schedule("Dee", self.entries)
+        self.speculator.invalidate("Dee")
+        self.assertIsNone(self.speculator.take("Dee", self.entries))
+        self.assertEqual(self.speculator.stats()['pending'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+# test_response_cache.py - Unit tests for the LLM response cache
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.response_cache import ResponseCache
+from src.chatbot import UnifiedChatbot
+from test.helpers import FakeClock
+
+def make_fake_client(text="Cached reply"):
+    """Build a stand-in OpenAI client that returns a fixed completion"""
+    client = MagicMock()
+    response = MagicMock()
+    response.choices[0].message.content = f"  {text}  "
+    client.chat.completions.create.return_value = response
+    return client
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the ResponseCache class"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_entries=2, ttl_seconds=60, clock=self.clock)
+
+    def test_make_key_normalizes_messages(self):
+        """Test that whitespace and role case do not change the key"""
+        key_a = ResponseCache.make_key([{"role": "user", "content": "hi  there"}], "m", 0.7, 150)
+        key_b = ResponseCache.make_key([{"role": "USER", "content": " hi there "}], "m", 0.7, 150)
+        self.assertEqual(key_a, key_b)
+
+    def test_make_key_includes_parameters(self):
+        """Test that model, temperature and max_tokens are part of the key"""
+        messages = [{"role": "user", "content": "hello"}]
+        base = ResponseCache.make_key(messages, "m", 0.7, 150)
+        self.assertNotEqual(base, ResponseCache.make_key(messages, "other", 0.7, 150))
+        self.assertNotEqual(base, ResponseCache.make_key(messages, "m", 0.2, 150))
+        self.assertNotEqual(base, ResponseCache.make_key(messages, "m", 0.7, 400))
+
+    def test_hit_and_miss_counters(self):
+        """Test hit/miss metrics"""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", "value")
+        self.assertEqual(self.cache.get("a"), "value")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertAlmostEqual(stats['hit_rate'], 0.5)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted at the size cap"""
+        self.cache.set("a", "1")
+        self.cache.set("b", "2")
+        self.cache.get("a")          # a is now most recent
+        self.cache.set("c", "3")
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), "1")
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        self.cache.set("a", "1")
+        self.clock.now += 61
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_disk_tier_persists(self):
+        """Test that the sqlite tier survives a new cache instance"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite")
+            first = ResponseCache(db_path=path, clock=self.clock)
+            first.set("a", "persisted")
+            first.close()
+
+            second = ResponseCache(db_path=path, clock=self.clock)
+            self.assertEqual(second.get("a"), "persisted")
+            self.assertEqual(second.stats()['disk_hits'], 1)
+            second.close()
+
+    def test_disk_size_cap(self):
+        """Test that the disk tier keeps at most max_disk_entries rows"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(db_path=os.path.join(tmp, "cache.sqlite"),
+                                  max_disk_entries=3, clock=self.clock)
+            for i in range(5):
+                self.clock.now += 1
+                cache.set(f"k{i}", str(i))
+            self.assertEqual(cache.stats()['disk_size'], 3)
+            cache.close()
+
+class TestChatbotResponseCache(unittest.TestCase):
+    """Integration tests for caching in UnifiedChatbot"""
+
+    def test_identical_requests_hit_cache(self):
+        """Test that an identical request does not call the API twice"""
+        chatbot = UnifiedChatbot(ai_enabled=False, response_cache=ResponseCache())
+        chatbot.openai_client = make_fake_client()
+        messages = [{"role": "user", "content": "Hello"}]
+
+        first = chatbot._create_completion(messages, max_tokens=150)
+        second = chatbot._create_completion(messages, max_tokens=150)
+
+        self.assertEqual(first, "Cached reply")
+        self.assertEqual(second, "Cached reply")
+        self.assertEqual(chatbot.openai_client.chat.completions.create.call_count, 1)
+        self.assertEqual(chatbot.cache_stats()['hits'], 1)
+
+    def test_cache_opt_out(self):
+        """Test that use_cache=False always calls the API"""
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False)
+        chatbot.openai_client = make_fake_client()
+        messages = [{"role": "user", "content": "Hello"}]
+
+        chatbot._create_completion(messages, max_tokens=150)
+        chatbot._create_completion(messages, max_tokens=150)
+
+        self.assertIsNone(chatbot.response_cache)
+        self.assertEqual(chatbot.openai_client.chat.completions.create.call_count, 2)
+        self.assertEqual(chatbot.cache_stats(), {})
+
+if __name__ == "__main__":
+    unittest.main()
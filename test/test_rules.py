@@ -228,10 +228,12 @@ class TestCLIFunctions(unittest.TestCase):
         mock_args = MagicMock()
         mock_args.version = True
         mock_args.show_scale = False
+        mock_args.usage_report = False
         mock_args.test = False
         mock_args.chat = False
         mock_args.mood = None
         mock_args.name = None
+        mock_args.no_prewarm = False
         
         result = process_cli_args(mock_args)
         
@@ -245,10 +247,12 @@ class TestCLIFunctions(unittest.TestCase):
         mock_args = MagicMock()
         mock_args.version = False
         mock_args.show_scale = True
+        mock_args.usage_report = False
         mock_args.test = False
         mock_args.chat = False
         mock_args.mood = None
         mock_args.name = None
+        mock_args.no_prewarm = False
         
         result = process_cli_args(mock_args)
         
@@ -259,24 +263,44 @@ class TestCLIFunctions(unittest.TestCase):
         mock_args = MagicMock()
         mock_args.version = False
         mock_args.show_scale = False
+        mock_args.usage_report = False
         mock_args.test = True
         mock_args.chat = False
         mock_args.mood = None
         mock_args.name = None
+        mock_args.no_prewarm = False
         
         result = process_cli_args(mock_args)
         
         self.assertEqual(result['action'], 'test')
     
+    def test_process_cli_args_usage_report(self):
+        """Test process_cli_args with usage report flag"""
+        mock_args = MagicMock()
+        mock_args.version = False
+        mock_args.show_scale = False
+        mock_args.usage_report = True
+        mock_args.test = False
+        mock_args.chat = False
+        mock_args.mood = None
+        mock_args.name = None
+        mock_args.no_prewarm = False
+        
+        result = process_cli_args(mock_args)
+        
+        self.assertEqual(result['action'], 'usage_report')
+    
     def test_process_cli_args_chat(self):
         """Test process_cli_args with chat flag (NEW)"""
         mock_args = MagicMock()
         mock_args.version = False
         mock_args.show_scale = False
+        mock_args.usage_report = False
         mock_args.test = False
         mock_args.chat = True
         mock_args.mood = None
         mock_args.name = None
+        mock_args.no_prewarm = False
         
         result = process_cli_args(mock_args)
         
@@ -288,10 +312,12 @@ class TestCLIFunctions(unittest.TestCase):
         mock_args = MagicMock()
         mock_args.version = False
         mock_args.show_scale = False
+        mock_args.usage_report = False
         mock_args.test = False
         mock_args.chat = False
         mock_args.mood = '3'
         mock_args.name = None
+        mock_args.no_prewarm = False
         
         # Mock assess_mood to return a test result
         with patch('rules.assess_mood') as mock_assess:
@@ -308,10 +334,12 @@ class TestCLIFunctions(unittest.TestCase):
         mock_args = MagicMock()
         mock_args.version = False
         mock_args.show_scale = False
+        mock_args.usage_report = False
         mock_args.test = False
         mock_args.chat = False
         mock_args.mood = 'invalid'
         mock_args.name = None
+        mock_args.no_prewarm = False
         
         # Mock assess_mood to return None
         with patch('rules.assess_mood') as mock_assess:
@@ -327,10 +355,12 @@ class TestCLIFunctions(unittest.TestCase):
         mock_args = MagicMock()
         mock_args.version = False
         mock_args.show_scale = False
+        mock_args.usage_report = False
         mock_args.test = False
         mock_args.chat = False
         mock_args.mood = None
         mock_args.name = 'TestUser'
+        mock_args.no_prewarm = False
         
         result = process_cli_args(mock_args)
         
@@ -342,10 +372,12 @@ class TestCLIFunctions(unittest.TestCase):
         mock_args = MagicMock()
         mock_args.version = False
         mock_args.show_scale = False
+        mock_args.usage_report = False
         mock_args.test = False
         mock_args.chat = False
         mock_args.mood = None
         mock_args.name = None
+        mock_args.no_prewarm = False
         
         result = process_cli_args(mock_args)
         
@@ -353,6 +385,10 @@ class TestCLIFunctions(unittest.TestCase):
         self.assertFalse(result['chat_mode'])
         self.assertIsNone(result['mood'])
         self.assertIsNone(result['user_name'])
+        self.assertTrue(result['prewarm'])
+        
+        mock_args.no_prewarm = True
+        self.assertFalse(process_cli_args(mock_args)['prewarm'])
 
 class TestRulesIntegration(unittest.TestCase):
     """Integration tests for rules module"""
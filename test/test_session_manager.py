@@ -0,0 +1,127 @@
+# test_session_manager.py - Unit tests for multi-session hosting
+import os
+import tempfile
+import threading
+import unittest
+
+from src.chatbot import ChatSession, UnifiedChatbot
+from src.session_manager import SessionManager, decode_session, encode_session
+from test.helpers import FakeClock
+
+class TestSessionSnapshots(unittest.TestCase):
+    """Test cases for session snapshot encoding"""
+
+    def test_round_trip(self):
+        """Test that history, moods and context survive a snapshot"""
+        session = ChatSession(user_context={'current_mood': {'level': 2, 'description': 'Low'}})
+        session.conversation_history.add_user("I feel low", mood=2)
+        session.conversation_history.add_assistant("I'm here with you.", mood=2)
+
+        restored = decode_session(encode_session(session))
+
+        self.assertEqual(list(restored.conversation_history), list(session.conversation_history))
+        self.assertEqual(restored.user_context, session.user_context)
+        self.assertEqual(restored.conversation_history.max_turns,
+                         session.conversation_history.max_turns)
+
+class TestSessionManager(unittest.TestCase):
+    """Test cases for the SessionManager class"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False)
+        self.manager = SessionManager(self.chatbot, max_active=2, clock=self.clock)
+
+    def tearDown(self):
+        self.manager.close()
+
+    def test_sessions_are_separate(self):
+        """Test that each user keeps their own history"""
+        self.manager.chat("dee", "hi there")
+        self.manager.chat("dee", "I feel sad")
+        self.manager.chat("sam", "hello")
+
+        self.assertEqual(len(self.manager.get_session("dee").conversation_history), 4)
+        self.assertEqual(len(self.manager.get_session("sam").conversation_history), 2)
+        self.assertEqual(len(self.chatbot.conversation_history), 0)
+
+    def test_lru_spill_and_rehydrate(self):
+        """Test that the least recently used session spills and comes back intact"""
+        self.manager.chat("dee", "I need help")
+        self.manager.chat("sam", "hello")
+        self.manager.chat("kim", "hi")  # Over max_active, so dee spills
+
+        self.assertEqual(self.manager.active_users(), ["sam", "kim"])
+        self.assertEqual(self.manager.stats()['spilled'], 1)
+
+        session = self.manager.get_session("dee")
+        self.assertEqual(session.conversation_history[0].text, "I need help")
+        self.assertEqual(self.manager.stats()['rehydrated'], 1)
+
+    def test_evict_idle(self):
+        """Test that idle sessions spill while recent ones stay in memory"""
+        self.manager.chat("dee", "hi")
+        self.clock.now += 600
+        self.manager.chat("sam", "hi")
+
+        self.assertEqual(self.manager.evict_idle(300), 1)
+        self.assertEqual(self.manager.active_users(), ["sam"])
+        self.assertEqual(self.manager.evict_idle(0), 0)
+
+    def test_session_in_use_is_not_spilled(self):
+        """Test that a slow turn keeps its session pinned and the turn is not lost"""
+        started, finish = threading.Event(), threading.Event()
+        reply = self.chatbot._get_rule_based_chat_response
+
+        def slow_reply(message, mood_context=None):
+            if message == "slow":
+                started.set()
+                finish.wait(5)
+            return reply(message, mood_context)
+
+        self.chatbot._get_rule_based_chat_response = slow_reply  # Copied into bound chatbots
+        worker = threading.Thread(target=self.manager.chat, args=("dee", "slow"))
+        worker.start()
+        self.assertTrue(started.wait(5))
+
+        # LRU and idle eviction both pass over the pinned session
+        self.clock.now += 600
+        self.manager.chat("sam", "hi")
+        self.manager.chat("kim", "hi")
+        self.assertEqual(self.manager.evict_idle(300), 0)
+        self.assertIn("dee", self.manager.active_users())
+
+        finish.set()
+        worker.join(5)
+        # The finished turn is stamped as the latest use, and the cap applies again
+        self.assertEqual(self.manager.active_users(), ["kim", "dee"])
+        self.manager.get_session("sam")
+        history = self.manager.get_session("dee").conversation_history
+        self.assertEqual([turn.text for turn in history][0], "slow")
+        self.assertEqual(len(history), 2)
+
+    def test_snapshots_persist_across_managers(self):
+        """Test that a file backed manager restores sessions after restart"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sessions.db")
+            manager = SessionManager(self.chatbot, db_path=path)
+            manager.chat("dee", "I wrote in my journal")
+            manager.close()
+
+            restarted = SessionManager(self.chatbot, db_path=path)
+            history = restarted.get_session("dee").conversation_history
+            restarted.close()
+
+        self.assertEqual(history[0].text, "I wrote in my journal")
+
+    def test_for_session_shares_settings(self):
+        """Test that bound chatbots share the template's cache and flags"""
+        session = ChatSession()
+        bound = self.chatbot.for_session(session)
+
+        self.assertIs(bound.session, session)
+        self.assertIs(bound.response_cache, self.chatbot.response_cache)
+        self.assertIsNot(self.chatbot.session, session)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+# test_single_flight.py - Unit tests for in-flight request coalescing
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.single_flight import SingleFlight
+from src.chatbot import UnifiedChatbot
+
+def run_concurrently(count, target):
+    """Start count threads running target and wait for them"""
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(index):
+        try:
+            results[index] = target()
+        except Exception as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for the SingleFlight class"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent calls run the function once"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "shared result"
+
+        threads, results, errors = run_concurrently(5, lambda: flight.do("key", slow))
+        # Wait until every follower has joined the in-flight call
+        deadline = time.time() + 5
+        while flight.stats()['calls'] < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["shared result"] * 5)
+        stats = flight.stats()
+        self.assertEqual(stats['executed'], 1)
+        self.assertEqual(stats['deduplicated'], 4)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_different_keys_run_separately(self):
+        """Test that different keys are not coalesced"""
+        flight = SingleFlight()
+        self.assertEqual(flight.do("a", lambda: 1), 1)
+        self.assertEqual(flight.do("b", lambda: 2), 2)
+        self.assertEqual(flight.stats()['deduplicated'], 0)
+
+    def test_exception_reaches_every_caller(self):
+        """Test that an error in the shared call is raised in all waiters"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise RuntimeError("backend down")
+
+        threads, results, errors = run_concurrently(3, lambda: flight.do("key", failing))
+        deadline = time.time() + 5
+        while flight.stats()['calls'] < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertTrue(all(isinstance(e, RuntimeError) for e in errors))
+        # The key is released, so a later call runs again
+        self.assertEqual(flight.do("key", lambda: "recovered"), "recovered")
+
+class TestChatbotCoalescing(unittest.TestCase):
+    """Integration tests for coalescing in UnifiedChatbot"""
+
+    def test_duplicate_requests_make_one_api_call(self):
+        """Test that concurrent identical prompts share one API call"""
+        release = threading.Event()
+        response = MagicMock()
+        response.choices[0].message.content = "One reply"
+
+        def create(**kwargs):
+            release.wait(5)
+            return response
+
+        flight = SingleFlight()
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False, single_flight=flight)
+        chatbot.openai_client = MagicMock()
+        chatbot.openai_client.chat.completions.create.side_effect = create
+        messages = [{"role": "user", "content": "Recap my week"}]
+
+        threads, results, errors = run_concurrently(
+            3, lambda: chatbot._create_completion(messages, max_tokens=400))
+        deadline = time.time() + 5
+        while flight.stats()['calls'] < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, ["One reply"] * 3)
+        self.assertEqual(chatbot.openai_client.chat.completions.create.call_count, 1)
+        self.assertEqual(chatbot.coalescing_stats()['deduplicated'], 2)
+
+    def test_coalescing_can_be_disabled(self):
+        """Test that coalesce=False turns off deduplication"""
+        chatbot = UnifiedChatbot(ai_enabled=False, coalesce=False)
+        self.assertIsNone(chatbot.single_flight)
+        self.assertEqual(chatbot.coalescing_stats(), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+# test_usage_ledger.py - Unit tests for the model call usage ledger
+import datetime
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.usage_ledger import (DEFAULT_LEDGER_PATH, UsageLedger, format_usage_report,
+                              ledger_from_env, usage_report)
+from src.rate_limiter import RateLimiter
+from src.chatbot import UnifiedChatbot
+from src.llm_backend import Completion
+
+def fixed_clock(day):
+    """Clock returning noon UTC on the given day of December 2025"""
+    return lambda: datetime.datetime(2025, 12, day, 12, 0, tzinfo=datetime.timezone.utc)
+
+def completion(text, prompt_tokens, completion_tokens):
+    """Fake chat completion response with usage"""
+    response = MagicMock()
+    response.choices[0].message.content = text
+    response.usage.prompt_tokens = prompt_tokens
+    response.usage.completion_tokens = completion_tokens
+    response.usage.total_tokens = prompt_tokens + completion_tokens
+    return response
+
+class TestUsageLedger(unittest.TestCase):
+    """Test cases for the UsageLedger class"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "usage.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_records_are_appended(self):
+        """Test that each call adds one line and reads back in order"""
+        ledger = UsageLedger(self.path, clock=fixed_clock(1))
+        ledger.record('chat', 'gpt-4o-mini', 100, 20, 0.5, user='Ana')
+        ledger.record('recap', 'gpt-4o-mini', outcome='error')
+
+        # A second ledger on the same file appends rather than truncating
+        UsageLedger(self.path, clock=fixed_clock(2)).record('chat', 'gpt-4o-mini', 10, 5)
+        records = list(ledger)
+        self.assertEqual([r['call_type'] for r in records], ['chat', 'recap', 'chat'])
+        self.assertEqual(records[0]['prompt_tokens'], 100)
+        self.assertEqual(records[0]['user'], 'Ana')
+        self.assertEqual(records[1]['outcome'], 'error')
+        self.assertEqual(records[2]['ts'][:10], '2025-12-02')
+
+    def test_record_response_reads_token_counts(self):
+        """Test token counts from an OpenAI response and from a backend Completion"""
+        ledger = UsageLedger(self.path)
+        ledger.record_response('chat', 'gpt-4o-mini', completion("Hi", 12, 3), 0.2, user='Ana')
+        ledger.record_response('recap', 'local', Completion("Hi", 'local', 'http', 40, 8), 0.4,
+                               outcome='cached')
+        records = list(ledger)
+        self.assertEqual([(r['prompt_tokens'], r['completion_tokens']) for r in records],
+                         [(12, 3), (40, 8)])
+        self.assertEqual([r['outcome'] for r in records], ['ok', 'cached'])
+
+    def test_recording_is_opt_in(self):
+        """Test that the ledger is off unless JOURNAL_USAGE_LEDGER turns it on"""
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(ledger_from_env())
+        with patch.dict(os.environ, {'JOURNAL_USAGE_LEDGER': 'on'}):
+            self.assertEqual(ledger_from_env().path, DEFAULT_LEDGER_PATH)
+        with patch.dict(os.environ, {'JOURNAL_USAGE_LEDGER': self.path}):
+            self.assertEqual(ledger_from_env().path, self.path)
+        with patch.dict(os.environ, {'JOURNAL_USAGE_LEDGER': 'off'}):
+            self.assertIsNone(ledger_from_env())
+
+    def test_unreadable_lines_are_skipped(self):
+        """Test that a torn line does not break reading"""
+        ledger = UsageLedger(self.path)
+        ledger.record('chat', 'gpt-4o-mini', 1, 1)
+        with open(self.path, "a") as file:
+            file.write('{"call_type": "ch')
+        self.assertEqual(len(list(ledger)), 1)
+
+    def test_missing_file_reads_empty(self):
+        """Test that a ledger without a file has no records"""
+        ledger = UsageLedger(self.path)
+        self.assertEqual(list(ledger), [])
+        self.assertEqual(usage_report(ledger), {})
+        self.assertIn("No model calls", format_usage_report(ledger))
+
+    def test_report_aggregates_per_dimension(self):
+        """Test per user, day and call type totals"""
+        ledger = UsageLedger(self.path, clock=fixed_clock(1))
+        ledger.record('chat', 'gpt-4o-mini', 1000, 100, 0.4, user='Ana')
+        ledger.record('chat', 'gpt-4o-mini', 500, 50, 0.6, user='Ben')
+        ledger.record('chat', 'gpt-4o-mini', outcome='cached', user='Ana')
+        ledger._clock = fixed_clock(2)
+        ledger.record('recap', 'gpt-4o-mini', 2000, 400, 2.0, user='Ana')
+        ledger.record('recap', 'gpt-4o-mini', outcome='rate_limited', user='Ana')
+
+        report = usage_report(ledger)
+        by_user = report['user']
+        self.assertEqual(by_user.loc['Ana', 'calls'], 4)
+        self.assertEqual(by_user.loc['Ana', 'total_tokens'], 3500)
+        self.assertEqual(by_user.loc['Ana', 'cached'], 1)
+        self.assertEqual(by_user.loc['Ana', 'failed'], 1)
+        self.assertEqual(list(report['day'].index), ['2025-12-02', '2025-12-01'])
+
+        by_type = report['call_type']
+        self.assertAlmostEqual(by_type.loc['chat', 'mean_latency'], 0.5)
+        # 2000 prompt and 400 completion tokens at gpt-4o-mini prices
+        self.assertAlmostEqual(by_type.loc['recap', 'cost_usd'], 0.00054)
+        self.assertIn("By call type", format_usage_report(ledger))
+
+class TestChatbotUsageLedger(unittest.TestCase):
+    """Integration tests for usage recording in UnifiedChatbot"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.ledger = UsageLedger(os.path.join(self.tmpdir.name, "usage.jsonl"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_api_calls_and_cache_hits_are_recorded(self):
+        """Test that completions log usage and cache hits log as cached"""
+        chatbot = UnifiedChatbot(ai_enabled=False, coalesce=False, rate_limit=False,
+                                 usage_ledger=self.ledger)
+        chatbot.user_context['user_id'] = 'Ana'
+        chatbot.openai_client = MagicMock()
+        chatbot.openai_client.chat.completions.create.return_value = completion("Hi", 120, 30)
+        messages = [{"role": "user", "content": "Hello"}]
+
+        chatbot._create_completion(messages, 150, call_type='chat')
+        chatbot._create_completion(messages, 150, call_type='chat')
+
+        records = list(self.ledger)
+        self.assertEqual([r['outcome'] for r in records], ['ok', 'cached'])
+        self.assertEqual(records[0]['prompt_tokens'], 120)
+        self.assertEqual(records[0]['completion_tokens'], 30)
+        self.assertEqual(records[0]['user'], 'Ana')
+        self.assertEqual(records[0]['call_type'], 'chat')
+
+    def test_failures_are_recorded(self):
+        """Test that API errors and rate limit rejections are logged"""
+        limiter = RateLimiter(requests_per_minute=1, timeout=0)
+        chatbot = UnifiedChatbot(ai_enabled=False, use_cache=False, coalesce=False,
+                                 rate_limiter=limiter, usage_ledger=self.ledger)
+        chatbot.openai_client = MagicMock()
+        chatbot.openai_client.chat.completions.create.side_effect = RuntimeError("down")
+        messages = [{"role": "user", "content": "Hello"}]
+
+        with self.assertRaises(RuntimeError):
+            chatbot._create_completion(messages, 150)
+        with self.assertRaises(Exception):
+            chatbot._create_completion(messages, 150)
+        self.assertEqual([r['outcome'] for r in self.ledger], ['error', 'rate_limited'])
+
+    def test_no_ledger_records_nothing(self):
+        """Test that chatbots without a ledger do not write one"""
+        chatbot = UnifiedChatbot(ai_enabled=False)
+        self.assertIsNone(chatbot.usage_ledger)
+
+if __name__ == "__main__":
+    unittest.main()